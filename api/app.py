@@ -6,46 +6,67 @@ import os
 import sys
 import json
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 # Adiciona o diretório api ao path para imports funcionarem na Vercel
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from supabase_client import create_supabase_client
-except ImportError as e:
-    print(f"❌ Erro ao importar supabase_client: {e}")
-    # Fallback: tenta importar diretamente
-    import supabase_client
-    create_supabase_client = supabase_client.create_supabase_client
+from snapshot import load_snapshot, write_snapshot_async
+from delta import VersionHistory
+from jobs import RefreshJobs
+from instrumentation import init_app as init_instrumentation, phase, record_cache, record_rows
+from payload import (
+    SECTIONS, assemble_sections, build_chamados_payload, fetch_sections, parse_fields, parse_sections,
+    project_payload, section_key
+)
+from formats import FORMATS, JSON, negotiate
+from fingerprint import FINGERPRINT_COLUMN, FINGERPRINT_ORDER, FingerprintMemo, dataset_fingerprint
+
+
+def create_supabase_client():
+    """
+    Cria o cliente Supabase (SupabaseIntegration)
+    O módulo supabase_client (pandas + supabase) só é importado aqui, no
+    primeiro caminho que precisa dele - não no carregamento da aplicação.
+    """
+    from supabase_client import create_supabase_client as _create_supabase_client
+    return _create_supabase_client()
 
 
 # Carrega variáveis de ambiente (produção usa variáveis da Vercel, desenvolvimento usa .env)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'config', '.env'))
 
-# Diagnóstico inicial
-print(f"🔍 Diagnóstico do ambiente:")
-print(f"  - Python: {sys.version}")
-print(f"  - BASE_DIR: {BASE_DIR}")
-print(f"  - ENV_PATH: {ENV_PATH}")
-print(f"  - ENV_PATH existe: {os.path.exists(ENV_PATH)}")
-
 # Só tenta carregar .env se o arquivo existir (desenvolvimento local)
 if os.path.exists(ENV_PATH):
-    print(f"🔧 Carregando .env de: {ENV_PATH}")
     load_dotenv(dotenv_path=ENV_PATH, override=True)
-else:
-    print(f"📦 Ambiente de produção - usando variáveis de ambiente do sistema")
 
-# Verifica variáveis críticas (sem expor valores)
-print(f"🔑 Variáveis de ambiente:")
-print(f"  - SUPABASE_URL: {'✅' if os.getenv('SUPABASE_URL') else '❌'}")
-print(f"  - SUPABASE_KEY: {'✅' if os.getenv('SUPABASE_KEY') else '❌'}")
-print(f"  - DATA_SOURCE: {os.getenv('DATA_SOURCE', 'não definido')}")
-print(f"  - FLASK_ENV: {os.getenv('FLASK_ENV', 'não definido')}")
+
+def print_startup_diagnostics():
+    """Imprime o diagnóstico do ambiente (sem expor valores das variáveis)"""
+    print(f"🔍 Diagnóstico do ambiente:")
+    print(f"  - Python: {sys.version}")
+    print(f"  - BASE_DIR: {BASE_DIR}")
+    print(f"  - ENV_PATH: {ENV_PATH}")
+    print(f"  - ENV_PATH existe: {os.path.exists(ENV_PATH)}")
+    if os.path.exists(ENV_PATH):
+        print(f"🔧 .env carregado de: {ENV_PATH}")
+    else:
+        print(f"📦 Ambiente de produção - usando variáveis de ambiente do sistema")
+
+    # Verifica variáveis críticas (sem expor valores)
+    print(f"🔑 Variáveis de ambiente:")
+    print(f"  - SUPABASE_URL: {'✅' if os.getenv('SUPABASE_URL') else '❌'}")
+    print(f"  - SUPABASE_KEY: {'✅' if os.getenv('SUPABASE_KEY') else '❌'}")
+    print(f"  - DATA_SOURCE: {os.getenv('DATA_SOURCE', 'não definido')}")
+    print(f"  - FLASK_ENV: {os.getenv('FLASK_ENV', 'não definido')}")
+
+
+# Diagnóstico no carregamento apenas se pedido (o __main__ sempre imprime)
+if os.getenv('STARTUP_DIAGNOSTICS', 'false').lower() == 'true':
+    print_startup_diagnostics()
 
 # Configuração da aplicação Flask
 app = Flask(__name__)
@@ -54,26 +75,225 @@ app = Flask(__name__)
 cors_origins = os.getenv('CORS_ORIGINS', '*').split(',')
 CORS(app, origins=cors_origins, resources={r"/api/*": {"origins": "*"}})
 
+# Server-Timing por resposta e métricas Prometheus em /api/metrics
+init_instrumentation(app, service='app')
+
 # Cache simples em memória (para evitar muitas chamadas à API do Google)
 cache = {
     'data': None,
     'timestamp': None,
+    'fingerprint': None,  # impressão do dataset (total + max(updated_at)) na busca
     'timeout': int(os.getenv('CACHE_TIMEOUT', 300))  # 5 minutos
 }
 
 
+# Snapshot em disco é lido uma única vez por processo
+_snapshot_state = {'restored': False}
+
+# Últimas versões do payload (respostas incrementais com ?since=)
+versions = VersionHistory()
+
+# Artefatos derivados (ranking, cubo, seções de ?sections=) memoizados pela impressão do
+# dataset: conferida a cada timeout, só recalculados quando ela muda
+memo = FingerprintMemo()
+
+# Horário de cálculo do ranking e do cubo ('atualizado_em' das respostas)
+_ranking_state = {'timestamp': None}
+_cube_state = {'timestamp': None}
+
+# Jobs de atualização (POST /api/chamados/refresh): um por vez, pedidos simultâneos se juntam
+refresh_jobs = RefreshJobs()
+
+
 def is_cache_valid():
     """Verifica se o cache ainda é válido"""
     if cache['data'] is None or cache['timestamp'] is None:
         return False
     
-    return (datetime.now() - cache['timestamp']).seconds < cache['timeout']
+    return (datetime.now() - cache['timestamp']).total_seconds() < cache['timeout']
 
 
-def update_cache(data):
-    """Atualiza o cache com novos dados"""
+def update_cache(data, dataset=None, fingerprint=None):
+    """Atualiza o cache com novos dados (numerados em 'versao'); o snapshot é gravado em segundo plano"""
+    versions.record(data)
     cache['data'] = data
     cache['timestamp'] = datetime.now()
+    cache['fingerprint'] = fingerprint
+    memo.revalidate(fingerprint)
+    write_snapshot_async(data, dataset, fingerprint=fingerprint)
+
+
+def current_fingerprint(client=None):
+    """Impressão atual do dataset numa consulta de uma linha (None se indisponível)"""
+    try:
+        if client is None:
+            from supabase import create_client as supabase_create_client
+            client = supabase_create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+        # order() recebe 'updated_at.desc.nullslast' inteiro (o cliente só gera nullsfirst)
+        response = (client.table('chamados').select(FINGERPRINT_COLUMN, count='exact')
+                    .order(FINGERPRINT_ORDER).limit(1).execute())
+    except Exception as e:
+        print(f"⚠️ Impressão do dataset indisponível ({str(e)}); cache só pelo timeout")
+        return None
+    return dataset_fingerprint(response.count, response.data)
+
+
+def check_fingerprint(client=None):
+    """
+    Consulta a impressão; igual à do cache → cache renovado sem buscar as linhas
+    Artefatos memoizados de outra versão dos dados são descartados.
+    """
+    with phase('fingerprint_check'):
+        fingerprint = current_fingerprint(client)
+    memo.revalidate(fingerprint)
+    if fingerprint is not None and fingerprint == cache['fingerprint'] and cache['data'] is not None:
+        cache['timestamp'] = datetime.now()
+    return fingerprint
+
+
+def revalidate_cache():
+    """Cache válido ou, vencido, com a impressão do dataset inalterada"""
+    if is_cache_valid():
+        return True
+    if cache['data'] is None or cache['fingerprint'] is None:
+        return False
+    return check_fingerprint() == cache['fingerprint']
+
+
+def restore_cache_from_snapshot():
+    """
+    Preenche o cache com o último snapshot (processo novo, cache vazio)
+    O timestamp do cache é o do snapshot: se estiver expirado, a próxima
+    requisição reconstrói os dados, mas o snapshot continua servindo de
+    fallback se o Supabase falhar.
+    """
+    if _snapshot_state['restored']:
+        return
+    _snapshot_state['restored'] = True
+
+    if cache['data'] is not None:
+        return
+
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        cache['data'] = snapshot.payload
+        versions.record(cache['data'])
+        cache['timestamp'] = snapshot.created_at_datetime
+        cache['fingerprint'] = snapshot.fingerprint
+        print(f"💾 Cache restaurado do snapshot ({snapshot.age:.0f}s atrás)")
+
+
+def versioned_response(data):
+    """Payload completo ou, com ?since=<versao>, só o que mudou desde essa versão"""
+    since = request.args.get('since')
+    if since is None or versions.current is None:
+        return data
+    return versions.since(since)
+
+
+def negotiated_format():
+    """Formato pedido (?format= ou Accept); ValueError se indisponível (responder 406)"""
+    return negotiate(request.headers.get('Accept'), request.args.get('format'))
+
+
+def data_response(data, response_format=JSON, dataset=None):
+    """
+    Resposta no formato negociado: JSON (padrão), MessagePack ou Arrow IPC
+
+    Com `dataset` (DataFrame), o corpo Arrow sai direto das colunas e `data`
+    vai nos metadados do schema.
+    """
+    name = next(key for key, mime in FORMATS.items() if mime == response_format)
+    with phase(f'{name}_encode'):
+        if response_format == JSON:
+            response = jsonify(data)
+        else:
+            from formats import encode
+            response = Response(encode(data, response_format, dataset), mimetype=response_format)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+def get_sections(supabase_url, supabase_key, sections, fields):
+    """
+    Seções pedidas em ?sections= (ou todas, com só ?fields=) sem montar o payload completo
+
+    Cada seção fica memoizada pela impressão do dataset (conferida a cada timeout);
+    as que faltam são calculadas de uma consulta só com as colunas que elas leem, e a
+    tabela de uma consulta limitada aos campos de ?fields=.
+
+    Raises:
+        ValueError: campo inexistente em ?fields=
+    """
+    from supabase import create_client as supabase_create_client
+
+    client = supabase_create_client(supabase_url, supabase_key)
+    if memo.expired(cache['timeout']):
+        check_fingerprint(client)
+    token = memo.token
+    values, missing = {}, []
+    for section in sections:
+        value = memo.get(f'secao:{section_key(section, fields)}')
+        if value is not None:
+            values[section] = value
+        else:
+            missing.append(section)
+    record_cache(not missing)
+    if not missing:
+        return assemble_sections(values, sections, 'Supabase (modo simplificado)')
+
+    computed = fetch_sections(client, missing, fields, table_limit=50)
+    for section, value in computed.items():
+        memo.put(f'secao:{section_key(section, fields)}', value, token)
+    values.update(computed)
+    return assemble_sections(values, sections, 'Supabase (modo simplificado)')
+
+
+def load_chamados_dataframe():
+    """
+    DataFrame normalizado dos chamados
+    Busca no Supabase; se falhar, usa o dataset do último snapshot em disco.
+    """
+    try:
+        return create_supabase_client().get_normalized_dataframe()
+    except Exception as e:
+        snapshot = load_snapshot(max_age=sys.maxsize)
+        if snapshot is None:
+            raise
+        print(f"⚠️ Supabase indisponível ({str(e)}); usando dataset do snapshot")
+        return snapshot.dataframe()
+
+
+def get_ranking_engine():
+    """Motor de ranking de técnicos (reaproveitado enquanto a impressão do dataset não mudar)"""
+    if memo.expired(cache['timeout']):
+        check_fingerprint()
+    engine = memo.get('ranking')
+    if engine is None:
+        from ranking import RankingEngine
+        token = memo.token
+        df = load_chamados_dataframe()
+        with phase('ranking_build'):
+            engine = RankingEngine(df)
+        memo.put('ranking', engine, token)
+        _ranking_state['timestamp'] = datetime.now()
+    return engine
+
+
+def get_cube():
+    """Cubo OLAP dos chamados (reaproveitado enquanto a impressão do dataset não mudar)"""
+    if memo.expired(cache['timeout']):
+        check_fingerprint()
+    cube = memo.get('cube')
+    if cube is None:
+        from cube import ChamadosCube
+        token = memo.token
+        df = load_chamados_dataframe()
+        with phase('cube_build'):
+            cube = ChamadosCube(df)
+        memo.put('cube', cube, token)
+        _cube_state['timestamp'] = datetime.now()
+    return cube
 
 
 @app.route('/')
@@ -85,8 +305,12 @@ def home():
         'status': 'online',
         'endpoints': [
             'GET /api/test - Teste de diagnóstico completo',
-            'GET /api/chamados - Retorna dados dos chamados',
-            'GET /api/health - Verifica status da API'
+            'GET /api/chamados - Retorna dados dos chamados (JSON, MessagePack ou Arrow por Accept/?format=)',
+            'GET /api/chamados/export - Dataset normalizado completo, colunar (JSON, MessagePack ou Arrow)',
+            'GET /api/chamados/cube - Cubo OLAP: chamados por técnico, categoria, status, origem e mês',
+            'GET /api/tecnicos/ranking - Top-k de técnicos por volume, satisfação e eficiência',
+            'GET /api/health - Verifica status da API',
+            'GET /api/metrics - Métricas no formato Prometheus'
         ],
         'timestamp': datetime.now().isoformat()
     })
@@ -205,6 +429,8 @@ def health_check():
         # Testa conexão com Supabase
         supabase_client = create_supabase_client()
         
+        restore_cache_from_snapshot()
+        
         return jsonify({
             'status': 'healthy',
             'supabase': 'connected',
@@ -226,11 +452,25 @@ def get_chamados():
     """
     Endpoint principal que retorna dados processados dos chamados
     Utiliza cache para otimizar performance
+    ?sections=kpis,tabela e ?fields=id_chamado,status: só as seções/campos pedidos
     """
     print(f"\n{'='*60}")
     print(f"🔵 Requisição /api/chamados iniciada")
     print(f"{'='*60}")
     
+    try:
+        response_format = negotiated_format()
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 406
+    
+    try:
+        sections = parse_sections(request.args.get('sections'))
+        fields = parse_fields(request.args.get('fields'))
+        if (sections or fields) and request.args.get('since') is not None:
+            raise ValueError("'since' não pode ser combinado com 'sections' ou 'fields'")
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
+    
     try:
         # Verifica variáveis de ambiente críticas
         supabase_url = os.getenv('SUPABASE_URL')
@@ -250,74 +490,54 @@ def get_chamados():
                 'hint': 'Configure SUPABASE_URL e SUPABASE_KEY nas variáveis de ambiente da Vercel'
             }), 500
         
-        # Verifica se pode usar cache
-        if is_cache_valid():
+        # Verifica se pode usar cache (processo novo começa pelo snapshot em disco)
+        restore_cache_from_snapshot()
+        if revalidate_cache():
             print("📋 Dados servidos do cache")
-            return jsonify(cache['data'])
+            record_cache(True)
+            if sections or fields:
+                return data_response(project_payload(cache['data'], sections, fields), response_format)
+            return data_response(versioned_response(cache['data']), response_format)
         
+        if sections or fields:
+            # Só ?fields=: todas as seções, com a tabela limitada aos campos pedidos
+            sections = sections or list(SECTIONS)
+            print(f"🔄 Buscando do Supabase só as seções {', '.join(sections)}...")
+            try:
+                return data_response(get_sections(supabase_url, supabase_key, sections, fields), response_format)
+            except ValueError as e:
+                return jsonify({'error': True, 'message': str(e)}), 400
+        
+        record_cache(False)
         print("🔄 Buscando dados do Supabase...")
         
         # MODO SIMPLIFICADO: Conecta direto sem usar supabase_client.py
         try:
-            from supabase import create_client as supabase_create_client
-            print("✅ Módulo supabase importado")
-            
-            client = supabase_create_client(supabase_url, supabase_key)
-            print("✅ Cliente Supabase criado")
-            
-            # Query simples
-            response = client.table('chamados').select('*').execute()
+            with phase('supabase_fetch'):
+                from supabase import create_client as supabase_create_client
+                print("✅ Módulo supabase importado")
+                
+                client = supabase_create_client(supabase_url, supabase_key)
+                print("✅ Cliente Supabase criado")
+                
+                # Impressão antes das linhas: o que mudar durante a busca aparece na próxima conferência
+                fingerprint = current_fingerprint(client)
+                
+                # Query simples
+                response = client.table('chamados').select('*').execute()
             print(f"✅ Query executada: {len(response.data)} registros")
+            record_rows(len(response.data), source='supabase')
             
-            # Processamento MÍNIMO - apenas contar dados
-            total = len(response.data)
-            
-            # Conta status (simples, sem pandas)
-            status_counts = {}
-            for row in response.data:
-                status = str(row.get('status', 'desconhecido')).lower()
-                status_counts[status] = status_counts.get(status, 0) + 1
+            with phase('compute_metrics'):
+                # Processamento MÍNIMO - apenas contar dados (Python puro, sem pandas)
+                data = build_chamados_payload(response.data, table_limit=50)
             
-            abertos = status_counts.get('aberto', 0) + status_counts.get('em andamento', 0) + status_counts.get('pendente', 0)
-            fechados = status_counts.get('fechado', 0) + status_counts.get('resolvido', 0) + status_counts.get('concluído', 0)
-            
-            # Conta técnicos (simples)
-            tecnico_counts = {}
-            for row in response.data:
-                tecnico = row.get('tecnico', 'N/A')
-                tecnico_counts[tecnico] = tecnico_counts.get(tecnico, 0) + 1
-            
-            # Conta categorias (simples)
-            categoria_counts = {}
-            for row in response.data:
-                categoria = row.get('categoria', 'N/A')
-                categoria_counts[categoria] = categoria_counts.get(categoria, 0) + 1
-            
-            # Monta resposta simples
-            data = {
-                'total_chamados': total,
-                'total_abertos': abertos,
-                'total_fechados': fechados,
-                'tempo_medio_resolucao': 'N/A',
-                'chamados_por_tecnico': tecnico_counts,
-                'categorias': categoria_counts,
-                'tabela': response.data[:50],  # Primeiros 50
-                'insights': {
-                    'melhor_tecnico': f"🏆 {max(tecnico_counts.items(), key=lambda x: x[1])[0] if tecnico_counts else 'N/A'}",
-                    'categoria_predominante': f"📊 {max(categoria_counts.items(), key=lambda x: x[1])[0] if categoria_counts else 'N/A'}",
-                    'tendencia_satisfacao': 'Dados sendo processados...'
-                },
-                'ultima_atualizacao': datetime.now().strftime('%d/%m/%Y %H:%M'),
-                'fonte': 'Supabase (modo simplificado)',
-                'debug_mode': True
-            }
-            
-            # Atualiza cache
-            update_cache(data)
+            # Atualiza cache (e snapshot)
+            update_cache(data, response.data, fingerprint)
             
             print("✅ Dados processados e retornados com sucesso")
             print(f"{'='*60}\n")
-            return jsonify(data)
+            return data_response(versioned_response(data), response_format)
             
         except Exception as e:
             print(f"❌ Erro no modo simplificado: {str(e)}")
@@ -336,7 +556,7 @@ def get_chamados():
         # Retorna dados do cache se disponível, mesmo que expirado
         if cache['data'] is not None:
             print("⚠️ Retornando dados do cache (podem estar desatualizados)")
-            cache_data = cache['data'].copy()
+            cache_data = project_payload(cache['data'], sections, fields) if sections or fields else cache['data'].copy()
             cache_data['warning'] = 'Dados podem estar desatualizados devido a erro na atualização'
             return jsonify(cache_data)
         
@@ -354,40 +574,172 @@ def get_chamados():
         }), 500
 
 
+def run_refresh_job(progress):
+    """
+    Reconstrói o payload em segundo plano (job de /api/chamados/refresh)
+    O cache antigo continua valendo até update_cache trocar pelo novo.
+    """
+    progress('buscando_dados')
+    supabase_client = create_supabase_client()
+    fingerprint = current_fingerprint()
+    data = supabase_client.process_chamados_data()
+    
+    progress('publicando')
+    # Impressão diferente descarta ranking, cubo e seções; igual, continuam valendo
+    update_cache(data, supabase_client.last_dataframe, fingerprint)
+    return {'versao': data.get('versao'), 'total_chamados': data.get('total_chamados')}
+
+
 @app.route('/api/chamados/refresh', methods=['POST'])
 def refresh_chamados():
     """
-    Endpoint para forçar atualização dos dados
-    Limpa o cache e busca dados atualizados
+    Inicia a atualização dos dados em segundo plano e retorna o id do job (202)
+    Pedidos durante uma atualização em andamento entram no mesmo job.
+    Acompanhar em GET /api/chamados/refresh/<job_id>.
     """
+    job, created = refresh_jobs.submit(run_refresh_job)
+    print(f"🔄 Atualização {'iniciada' if created else 'já em andamento'}: job {job['id']}")
+    return jsonify({
+        'success': True,
+        'message': 'Atualização iniciada' if created else 'Atualização já em andamento',
+        'job_id': job['id'],
+        'status_url': f"/api/chamados/refresh/{job['id']}",
+        'job': job,
+        'timestamp': datetime.now().isoformat()
+    }), 202
+
+
+@app.route('/api/chamados/refresh/<job_id>')
+def refresh_status(job_id):
+    """Estado de um job de atualização: status, etapa, fases (ms), resultado ou erro"""
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': True, 'message': f"Job não encontrado: '{job_id}'"}), 404
+    return jsonify(job)
+
+
+@app.route('/api/chamados/export')
+def export_chamados():
+    """
+    Dataset normalizado completo (consumidores de relatório)
+    JSON/MessagePack: {'total', 'colunas', 'dados': {coluna: valores}}; Arrow IPC: as
+    colunas do DataFrame. ?colunas=a,b limita as colunas; formato por Accept ou ?format=.
+    """
+    from formats import export_payload, select_columns
+
     try:
-        print("🔄 Forçando atualização dos dados...")
-        
-        # Limpa cache
-        cache['data'] = None
-        cache['timestamp'] = None
-        
-        # Busca dados atualizados
-        supabase_client = create_supabase_client()
-        data = supabase_client.process_chamados_data()
-        
-        # Atualiza cache
-        update_cache(data)
-        
+        response_format = negotiated_format()
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 406
+
+    try:
+        df = select_columns(load_chamados_dataframe(), request.args.get('colunas'))
+    except ValueError as e:
+        return jsonify({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}), 400
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/chamados/export: {str(e)}")
         return jsonify({
-            'success': True,
-            'message': 'Dados atualizados com sucesso',
-            'timestamp': datetime.now().isoformat(),
-            'data': data
-        })
+            'error': True,
+            'message': 'Falha ao exportar os chamados',
+            'details': str(e)
+        }), 500
+
+    with phase('export_columns'):
+        data, dataset = export_payload(df, response_format)
+    return data_response(data, response_format, dataset)
+
+
+@app.route('/api/chamados/cube')
+def chamados_cube():
+    """
+    Cubo OLAP: medidas dos chamados por qualquer combinação de dimensões
+    Dimensões: tecnico, categoria, status, origem, mes
+    
+    Query params:
+        rows: dimensões das linhas (ex.: tecnico; tecnico,categoria para drill-down)
+        cols: dimensões das colunas (ex.: status); vazio = uma coluna
+        filter: cortes no formato dimensao:v1,v2;outra:v3 (ex.: mes:2024-03;status:Aberto)
+        measures: chamados (padrão), tma_soma, tma_medio, satisfacao_soma, satisfacao_media, avaliacoes
+        membros: true para incluir os valores de cada dimensão
+    """
+    from cube import parse_dimensions, parse_filters, parse_measures
+    
+    try:
+        rows = parse_dimensions(request.args.get('rows', 'tecnico'))
+        cols = parse_dimensions(request.args.get('cols'))
+        filters = parse_filters(request.args.get('filter'))
+        measures = parse_measures(request.args.get('measures'))
+    except ValueError as e:
+        return jsonify({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}), 400
     
+    try:
+        cube = get_cube()
+        with phase('cube_query'):
+            result = cube.query(rows, cols, filters, measures)
+    except ValueError as e:
+        return jsonify({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}), 400
     except Exception as e:
+        print(f"❌ Erro no endpoint /api/chamados/cube: {str(e)}")
         return jsonify({
-            'success': False,
-            'message': 'Erro ao atualizar dados',
-            'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'error': True,
+            'message': 'Falha ao consultar o cubo de chamados',
+            'details': str(e)
+        }), 500
+    
+    if request.args.get('membros', 'false').lower() == 'true':
+        result['membros'] = cube.members()
+    result['atualizado_em'] = _cube_state['timestamp'].isoformat()
+    return jsonify(result)
+
+
+@app.route('/api/tecnicos/ranking')
+def tecnicos_ranking():
+    """
+    Ranking de técnicos por volume, satisfação e eficiência
+    
+    Query params:
+        metrica: volume | satisfacao | eficiencia | all (padrão: all)
+        k: quantidade de técnicos por ranking (padrão: 5)
+        periodo: AAAA-MM (mês) ou AAAA-QN (trimestre); vazio = todo o histórico
+        min_avaliacoes: notas mínimas para o ranking de satisfação (padrão: 1)
+    """
+    from ranking import METRICS, parse_periodo
+    
+    metrica = request.args.get('metrica', 'all')
+    periodo = request.args.get('periodo') or None
+    try:
+        k = int(request.args.get('k', 5))
+        min_avaliacoes = int(request.args.get('min_avaliacoes', 1))
+        if periodo:
+            parse_periodo(periodo)
+    except ValueError as e:
+        return jsonify({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}), 400
+    
+    if metrica != 'all' and metrica not in METRICS:
+        return jsonify({
+            'error': True,
+            'message': f"Métrica inválida: '{metrica}'",
+            'metricas': list(METRICS) + ['all']
+        }), 400
+    
+    try:
+        engine = get_ranking_engine()
+        with phase('ranking_query'):
+            result = engine.ranking(metrica, k=max(k, 0), periodo=periodo, min_avaliacoes=min_avaliacoes)
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/tecnicos/ranking: {str(e)}")
+        return jsonify({
+            'error': True,
+            'message': 'Falha ao calcular ranking de técnicos',
+            'details': str(e)
         }), 500
+    
+    result['periodos_disponiveis'] = {
+        'mes': engine.periods('mes'),
+        'trimestre': engine.periods('trimestre')
+    }
+    result['atualizado_em'] = _ranking_state['timestamp'].isoformat()
+    return jsonify(result)
 
 
 @app.route('/api/config')
@@ -442,7 +794,12 @@ def not_found(error):
             'GET /api/health',
             'GET /api/chamados',
             'POST /api/chamados/refresh',
-            'GET /api/config'
+            'GET /api/chamados/refresh/<job_id>',
+            'GET /api/chamados/export',
+            'GET /api/chamados/cube',
+            'GET /api/tecnicos/ranking',
+            'GET /api/config',
+            'GET /api/metrics'
         ]
     }), 404
 
@@ -462,6 +819,7 @@ if __name__ == '__main__':
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     port = int(os.getenv('PORT', 5000))
     
+    print_startup_diagnostics()
     print("🚀 Iniciando TechHelp Dashboard API...")
     print(f"📊 Fonte de dados: Supabase")
     print(f"🔗 Supabase URL: {os.getenv('SUPABASE_URL', 'não configurado')[:40]}...")
@@ -0,0 +1,913 @@
+"""
+TechHelp Dashboard - API ASGI (Starlette)
+Mesmas rotas de app.py, servidas em um event loop:
+ - Leitura do Supabase via PostgREST assíncrono (páginas buscadas em paralelo)
+ - /api/test e /api/diagnostics rodam as verificações ao mesmo tempo
+ - Uma única reconstrução por vez: requisições simultâneas com cache vencido
+   aguardam a mesma busca em vez de disparar uma cada
+ - Trabalho de CPU (pandas, ranking, snapshot) roda no pool de threads
+ - /api/chamados/stream (SSE): um produtor por processo consulta o Supabase a
+   cada STREAM_POLL_INTERVAL enquanto houver assinantes e envia o payload a
+   todos só quando ele muda
+ - Change log (chamados_changelog): entre recargas completas, aplica só as
+   linhas alteradas na tabela (consulta a cada CHANGELOG_POLL_INTERVAL; só aqui,
+   Flask/Vercel seguem o CACHE_TIMEOUT)
+ - /api/chamados?sections=&fields=: sem o payload completo em cache, busca só
+   as colunas das seções pedidas (cache por seção)
+ - Impressão do dataset (total + max(updated_at)): cache vencido com a mesma
+   impressão é renovado sem buscar as linhas; ranking, cubo, DataFrame e seções
+   ficam memoizados contra ela
+
+O app Flask (app.py / index.py) continua disponível.
+
+Uso:
+ - uvicorn asgi:app --app-dir api --port 5000
+ - gunicorn -k uvicorn.workers.UvicornWorker --chdir api asgi:app
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from instrumentation import InstrumentationMiddleware, phase, record_cache, record_rows, render_prometheus
+from changelog import (
+    CHANGELOG_MAX_ROWS, CHANGELOG_POLL_INTERVAL, CHANGELOG_TABLE, ResidentDataset, fetch_batches, tail_query
+)
+from snapshot import load_snapshot, write_snapshot_async
+from delta import VersionHistory
+from fingerprint import FINGERPRINT_COLUMN, FINGERPRINT_ORDER, FingerprintMemo, dataset_fingerprint
+from formats import FORMATS, JSON, negotiate
+from payload import (
+    SECTIONS, assemble_sections, build_sections, parse_fields, parse_sections, project_payload,
+    section_columns, section_key, table_section
+)
+from jobs import RefreshJobs
+from stream import PayloadBroadcaster
+
+# Desenvolvimento local: mesmo .env de app.py
+ENV_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', '.env'))
+if os.path.exists(ENV_PATH):
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_PATH, override=True)
+
+CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 300))
+# SSE: intervalo entre consultas do produtor e heartbeat das conexões (segundos)
+STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', 30))
+STREAM_HEARTBEAT = float(os.getenv('STREAM_HEARTBEAT', 15))
+TABLE = 'chamados'
+# Ordem estável entre páginas
+TABLE_ORDER = 'fonte.asc,id_chamado.asc'
+
+ENDPOINTS = [
+    'GET /',
+    'GET /api/health',
+    'GET /api/test',
+    'GET /api/chamados',
+    'GET /api/chamados/stream',
+    'POST /api/chamados/refresh',
+    'GET /api/chamados/refresh/{job_id}',
+    'GET /api/chamados/export',
+    'GET /api/chamados/cube',
+    'GET /api/tecnicos/ranking',
+    'GET /api/config',
+    'GET /api/diagnostics',
+    'GET /api/metrics'
+]
+
+# Payload e linhas da última busca (as linhas alimentam o ranking); dataset = linhas + agregados
+# mantidos pelo change log; fingerprint = impressão do dataset na busca
+cache: Dict[str, Any] = {
+    'data': None, 'rows': None, 'dataset': None, 'timestamp': None, 'fingerprint': None, 'snapshot_restored': False
+}
+# Artefatos derivados (ranking, cubo, DataFrame, seções de ?sections=) memoizados pela impressão
+memo = FingerprintMemo()
+_ranking_state: Dict[str, Any] = {'timestamp': None}
+_cube_state: Dict[str, Any] = {'timestamp': None}
+_state: Dict[str, Any] = {
+    'postgrest': None, 'rebuild': None, 'producer': None, 'tail': None, 'tail_checked': None, 'fingerprint': None
+}
+broadcaster = PayloadBroadcaster(heartbeat=STREAM_HEARTBEAT)
+# Jobs de atualização (POST /api/chamados/refresh)
+refresh_jobs = RefreshJobs()
+# Últimas versões do payload (?since=<versao> responde só o que mudou)
+versions = VersionHistory()
+
+
+def _supabase_config():
+    return os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY')
+
+
+def get_postgrest():
+    """Cliente PostgREST assíncrono do processo (criado no primeiro uso)"""
+    if _state['postgrest'] is None:
+        url, key = _supabase_config()
+        if not url or not key:
+            raise Exception(f"SUPABASE_URL e SUPABASE_KEY devem estar configurados. URL: {bool(url)}, KEY: {bool(key)}")
+        from postgrest_async import AsyncPostgrest
+        _state['postgrest'] = AsyncPostgrest(url, key)
+    return _state['postgrest']
+
+
+def is_cache_valid() -> bool:
+    if cache['data'] is None or cache['timestamp'] is None:
+        return False
+    return (datetime.now() - cache['timestamp']).total_seconds() < CACHE_TIMEOUT
+
+
+def restore_cache_from_snapshot():
+    """Processo novo: serve o último snapshot em disco até a primeira reconstrução"""
+    if cache['snapshot_restored']:
+        return
+    cache['snapshot_restored'] = True
+    if cache['data'] is None:
+        snapshot = load_snapshot()
+        if snapshot is not None:
+            cache['data'] = snapshot.payload
+            versions.record(cache['data'])
+            cache['timestamp'] = snapshot.created_at_datetime
+            # Snapshot vencido com a impressão igual à atual é renovado sem recarregar
+            cache['fingerprint'] = snapshot.fingerprint
+            print(f"💾 Cache restaurado do snapshot ({snapshot.age:.0f}s atrás)")
+
+
+async def fetch_rows() -> List[Dict[str, Any]]:
+    """Todos os chamados (páginas em paralelo)"""
+    with phase('supabase_fetch'):
+        rows = await get_postgrest().select_all(TABLE, order=TABLE_ORDER)
+    record_rows(len(rows), source='supabase')
+    return rows
+
+
+async def changelog_cursor() -> Optional[int]:
+    """Maior seq do change log (0 se vazio; None se a tabela não existir: sem deltas)"""
+    from postgrest_async import PostgrestError
+
+    try:
+        entries = await get_postgrest().select(CHANGELOG_TABLE, {'select': 'seq', 'order': 'seq.desc', 'limit': '1'})
+    except PostgrestError as e:
+        print(f"⚠️ Change log indisponível ({str(e)}); atualização só pelo CACHE_TIMEOUT")
+        return None
+    return entries[0]['seq'] if entries else 0
+
+
+async def current_fingerprint() -> Optional[str]:
+    """Impressão atual do dataset numa consulta de uma linha (None se indisponível)"""
+    try:
+        rows, total = await get_postgrest().select_page(TABLE, 0, 0, select=FINGERPRINT_COLUMN,
+                                                        order=FINGERPRINT_ORDER, count=True)
+    except Exception as e:
+        print(f"⚠️ Impressão do dataset indisponível ({str(e)}); cache só pelo CACHE_TIMEOUT")
+        return None
+    return dataset_fingerprint(total, rows)
+
+
+async def _check_fingerprint() -> Optional[str]:
+    with phase('fingerprint_check'):
+        fingerprint = await current_fingerprint()
+    memo.revalidate(fingerprint)
+    if fingerprint is not None and fingerprint == cache['fingerprint'] and cache['data'] is not None:
+        # Dados iguais aos do cache: renova sem buscar as linhas nem recalcular
+        cache['timestamp'] = datetime.now()
+    return fingerprint
+
+
+async def check_fingerprint() -> Optional[str]:
+    """
+    Consulta a impressão; mesma do cache → cache renovado; artefatos de outra versão descartados
+
+    Chamadas simultâneas aguardam a mesma consulta.
+    """
+    task = _state['fingerprint']
+    if task is None:
+        task = asyncio.ensure_future(_check_fingerprint())
+        _state['fingerprint'] = task
+        task.add_done_callback(lambda _: _state.update(fingerprint=None))
+    return await asyncio.shield(task)
+
+
+async def revalidate_cache(max_age: float = CACHE_TIMEOUT) -> bool:
+    """Cache dentro de max_age ou, vencido, com a impressão do dataset inalterada"""
+    if cache['data'] is None or cache['timestamp'] is None:
+        return False
+    if (datetime.now() - cache['timestamp']).total_seconds() < max_age:
+        return True
+    if cache['fingerprint'] is None:
+        return False
+    return await check_fingerprint() == cache['fingerprint']
+
+
+async def _rebuild() -> Dict[str, Any]:
+    # Cursor e impressão antes das linhas: o que mudar durante a busca aparece na próxima
+    # consulta ao log (reaplicado, idempotente) ou na próxima impressão (recarga)
+    cursor, fingerprint = await asyncio.gather(changelog_cursor(), current_fingerprint())
+    rows = await fetch_rows()
+    if not rows:
+        raise Exception("Nenhum dado encontrado na tabela chamados")
+    with phase('compute_metrics'):
+        dataset = await run_in_threadpool(ResidentDataset, rows, cursor)
+        data = dataset.payload('Supabase (ASGI)', 50)
+    versions.record(data)
+    cache.update(data=data, rows=dataset.rows, dataset=dataset, timestamp=datetime.now(), fingerprint=fingerprint)
+    _state['tail_checked'] = time.monotonic()
+    # Mesma impressão (ex.: refresh manual sem alterações): ranking, cubo e seções continuam valendo
+    memo.revalidate(fingerprint)
+    await broadcaster.publish(data)
+    # Normalizado e gravado em segundo plano (a reconstrução não espera o disco)
+    write_snapshot_async(data, rows, fingerprint=fingerprint)
+    return data
+
+
+async def rebuild_payload() -> Dict[str, Any]:
+    """
+    Reconstrói o payload; chamadas simultâneas aguardam a mesma reconstrução
+    """
+    task = _state['rebuild']
+    if task is None:
+        task = asyncio.ensure_future(_rebuild())
+        _state['rebuild'] = task
+        task.add_done_callback(lambda _: _state.update(rebuild=None))
+    # shield: uma requisição cancelada não cancela a busca das outras
+    return await asyncio.shield(task)
+
+
+async def _apply_changelog() -> Optional[Dict[str, int]]:
+    dataset = cache['dataset']
+    postgrest = get_postgrest()
+    with phase('changelog_fetch'):
+        entries = dataset.pending(await postgrest.select(CHANGELOG_TABLE, tail_query(dataset.cursor)))
+    if not entries:
+        return None
+
+    plan = dataset.plan(entries)
+    if sum(len(ids) for ids in plan['fetch'].values()) > CHANGELOG_MAX_ROWS:
+        # Alteração grande (ex.: primeira execução do sync): sai mais barato recarregar tudo
+        await rebuild_payload()
+        return {'recarga_completa': True}
+
+    with phase('changelog_rows'):
+        batches = await asyncio.gather(*(postgrest.select(TABLE, query) for query in fetch_batches(plan['fetch'])))
+    if cache['dataset'] is not dataset:
+        # Uma recarga completa trocou o dataset durante a busca
+        return None
+    with phase('changelog_apply'):
+        summary = await run_in_threadpool(dataset.apply, entries, [row for batch in batches for row in batch])
+        data = dataset.payload('Supabase (ASGI)', 50)
+    if cache['dataset'] is not dataset:
+        return None
+
+    versions.record(data)
+    # timestamp mantido: a recarga completa do CACHE_TIMEOUT cobre quem grava sem passar pelo log
+    cache.update(data=data, rows=dataset.rows)
+    memo.invalidate()
+    await broadcaster.publish(data)
+    print(f"📝 Change log até seq {dataset.cursor}: {summary['inseridos']} novos, "
+          f"{summary['atualizados']} alterados, {summary['removidos']} removidos")
+    return summary
+
+
+async def refresh_from_changelog():
+    """
+    Aplica o change log ao cache (no máximo uma consulta a cada CHANGELOG_POLL_INTERVAL)
+
+    Chamadas simultâneas aguardam a mesma aplicação; falhas só são registradas
+    (o cache atual continua sendo servido).
+    """
+    if not changelog_active():
+        return
+    task = _state['tail']
+    if task is None:
+        checked = _state['tail_checked']
+        if checked is not None and time.monotonic() - checked < CHANGELOG_POLL_INTERVAL:
+            return
+        _state['tail_checked'] = time.monotonic()
+        task = asyncio.ensure_future(_apply_changelog())
+        _state['tail'] = task
+        task.add_done_callback(lambda _: _state.update(tail=None))
+    try:
+        await asyncio.shield(task)
+    except Exception as e:
+        print(f"⚠️ Falha ao aplicar o change log ({str(e)})")
+
+
+def changelog_active() -> bool:
+    """Cache válido com dataset ligado ao change log (atualizável por deltas)"""
+    dataset = cache['dataset']
+    return is_cache_valid() and dataset is not None and dataset.cursor is not None
+
+
+async def _stream_producer():
+    """Consulta o Supabase periodicamente enquanto houver assinantes SSE"""
+    try:
+        while broadcaster.subscribers > 0:
+            age = (datetime.now() - cache['timestamp']).total_seconds() if cache['timestamp'] else None
+            try:
+                if changelog_active():
+                    # Só as linhas alteradas pelo sync (publica se mudou)
+                    await refresh_from_changelog()
+                elif age is None or age >= STREAM_POLL_INTERVAL:
+                    # Impressão igual: nada mudou; senão rebuild_payload publica a nova versão
+                    if not await revalidate_cache(STREAM_POLL_INTERVAL):
+                        await rebuild_payload()
+            except Exception as e:
+                print(f"⚠️ Produtor SSE: falha ao atualizar ({str(e)})")
+            # Com o change log, o intervalo é o dele (consulta barata)
+            await asyncio.sleep(max(CHANGELOG_POLL_INTERVAL, 1) if changelog_active() else STREAM_POLL_INTERVAL)
+    finally:
+        _state['producer'] = None
+
+
+def ensure_stream_producer():
+    if _state['producer'] is None:
+        _state['producer'] = asyncio.ensure_future(_stream_producer())
+
+
+def versioned_response(request: Request, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload completo ou, com ?since=<versao>, só o que mudou desde essa versão"""
+    since = request.query_params.get('since')
+    if since is None or versions.current is None:
+        return data
+    return versions.since(since)
+
+
+def negotiated_format(request: Request) -> str:
+    """Formato pedido (?format= ou Accept); ValueError se indisponível (responder 406)"""
+    return negotiate(request.headers.get('accept'), request.query_params.get('format'))
+
+
+async def data_response(data: Dict[str, Any], response_format: str = JSON, dataset=None) -> Response:
+    """Resposta no formato negociado; MessagePack/Arrow são codificados no pool de threads"""
+    name = next(key for key, mime in FORMATS.items() if mime == response_format)
+    with phase(f'{name}_encode'):
+        if response_format == JSON:
+            response = JSONResponse(data)
+        else:
+            from formats import encode
+            body = await run_in_threadpool(encode, data, response_format, dataset)
+            response = Response(body, media_type=response_format)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+async def get_sections(sections: List[str], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Seções pedidas sem montar o payload completo
+
+    Cada seção fica memoizada pela impressão do dataset (conferida a cada CACHE_TIMEOUT);
+    as que faltam são calculadas de uma busca só com as colunas que elas leem, e a tabela
+    de uma página com os campos pedidos.
+
+    Raises:
+        ValueError: campo inexistente em ?fields= (PostgREST 400)
+    """
+    from postgrest_async import PostgrestError
+
+    if memo.expired(CACHE_TIMEOUT):
+        await check_fingerprint()
+    token = memo.token
+    values, missing = {}, []
+    for section in sections:
+        value = memo.get(f'secao:{section_key(section, fields)}')
+        if value is not None:
+            values[section] = value
+        else:
+            missing.append(section)
+    record_cache(not missing)
+    if not missing:
+        return assemble_sections(values, sections, 'Supabase (ASGI)')
+
+    aggregates = [s for s in missing if s != 'tabela']
+
+    async def fetch_aggregates():
+        if not aggregates:
+            return None
+        rows = await get_postgrest().select_all(TABLE, select=','.join(section_columns(aggregates)), order=TABLE_ORDER)
+        record_rows(len(rows), source='supabase')
+        return rows
+
+    async def fetch_table():
+        if 'tabela' not in missing:
+            return None
+        return await get_postgrest().select(TABLE, {
+            'select': ','.join(fields) if fields else '*', 'order': TABLE_ORDER, 'limit': '50'
+        })
+
+    try:
+        with phase('supabase_fetch'):
+            rows, table_rows = await asyncio.gather(fetch_aggregates(), fetch_table())
+    except PostgrestError as e:
+        if e.status_code == 400:
+            raise ValueError(f"Campo inválido em fields: {str(e)}")
+        raise
+
+    with phase('compute_metrics'):
+        computed = build_sections(rows, aggregates) if aggregates else {}
+        if table_rows is not None:
+            computed['tabela'] = table_section(table_rows, fields)
+    for section, value in computed.items():
+        memo.put(f'secao:{section_key(section, fields)}', value, token)
+    values.update(computed)
+    return assemble_sections(values, sections, 'Supabase (ASGI)')
+
+
+async def load_chamados_dataframe():
+    """DataFrame normalizado (linhas do cache, do Supabase ou do snapshot)"""
+    from column_schema import apply_column_schema
+    from normalization import normalize_chamados
+
+    if await revalidate_cache() and cache['rows'] is not None:
+        df = memo.get('dataframe')
+        if df is not None:
+            return df
+        rows = cache['rows']
+    else:
+        try:
+            await rebuild_payload()
+            rows = cache['rows']
+        except Exception as e:
+            snapshot = await run_in_threadpool(load_snapshot, max_age=sys.maxsize)
+            if snapshot is None:
+                raise
+            print(f"⚠️ Supabase indisponível ({str(e)}); usando dataset do snapshot")
+            return await run_in_threadpool(snapshot.dataframe)
+
+    def build():
+        import pandas as pd
+        return normalize_chamados(apply_column_schema(pd.DataFrame(rows)))
+
+    token = memo.token
+    with phase('normalize'):
+        df = await run_in_threadpool(build)
+    memo.put('dataframe', df, token)
+    return df
+
+
+async def get_ranking_engine():
+    """Motor de ranking (reaproveitado enquanto a impressão do dataset não mudar)"""
+    await refresh_from_changelog()
+    await revalidate_cache()
+    engine = memo.get('ranking')
+    if engine is None:
+        from ranking import RankingEngine
+        df = await load_chamados_dataframe()
+        token = memo.token
+        with phase('ranking_build'):
+            engine = await run_in_threadpool(RankingEngine, df)
+        memo.put('ranking', engine, token)
+        _ranking_state['timestamp'] = datetime.now()
+    return engine
+
+
+async def get_cube():
+    """Cubo OLAP (reaproveitado enquanto a impressão do dataset não mudar)"""
+    await refresh_from_changelog()
+    await revalidate_cache()
+    cube = memo.get('cube')
+    if cube is None:
+        from cube import ChamadosCube
+        df = await load_chamados_dataframe()
+        token = memo.token
+        with phase('cube_build'):
+            cube = await run_in_threadpool(ChamadosCube, df)
+        memo.put('cube', cube, token)
+        _cube_state['timestamp'] = datetime.now()
+    return cube
+
+
+# ---------------------------------------------------------------------- rotas
+async def home(request: Request):
+    """Endpoint raiz com informações da API"""
+    return JSONResponse({
+        'message': 'TechHelp Dashboard API (ASGI)',
+        'version': '2.0.0',
+        'status': 'online',
+        'endpoints': [
+            'GET /api/test - Teste de diagnóstico completo',
+            'GET /api/chamados - Retorna dados dos chamados',
+            'GET /api/chamados/stream - Payload por Server-Sent Events (só quando muda)',
+            'GET /api/chamados/cube - Cubo OLAP: chamados por técnico, categoria, status, origem e mês',
+            'GET /api/tecnicos/ranking - Top-k de técnicos por volume, satisfação e eficiência',
+            'GET /api/health - Verifica status da API',
+            'GET /api/metrics - Métricas no formato Prometheus'
+        ],
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+async def health_check(request: Request):
+    """Endpoint de verificação de saúde da API"""
+    try:
+        get_postgrest()
+        restore_cache_from_snapshot()
+        return JSONResponse({
+            'status': 'healthy',
+            'supabase': 'connected',
+            'cache_valid': is_cache_valid(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return JSONResponse({
+            'status': 'unhealthy',
+            'error': str(e),
+            'supabase': 'disconnected',
+            'timestamp': datetime.now().isoformat()
+        }, status_code=500)
+
+
+async def _check(coroutine) -> Dict[str, Any]:
+    """Executa uma verificação e devolve PASS/FAIL com a mensagem"""
+    try:
+        return {'status': 'PASS', **(await coroutine)}
+    except Exception as e:
+        return {'status': 'FAIL', 'message': str(e)}
+
+
+async def test_supabase(request: Request):
+    """Diagnóstico de conexão e dependências (verificações simultâneas)"""
+    url, key = _supabase_config()
+    diagnostics = {
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'SUPABASE_URL': url[:50] + '...' if url else 'NOT SET',
+            'SUPABASE_KEY_LENGTH': len(key) if key else 0,
+            'DATA_SOURCE': os.getenv('DATA_SOURCE', 'NOT SET'),
+            'PYTHON_VERSION': sys.version.split()[0]
+        },
+        'tests': {
+            '1_env_vars': {
+                'status': 'PASS' if (url and key) else 'FAIL',
+                'message': f"URL: {'✅' if url else '❌'}, KEY: {'✅' if key else '❌'}"
+            }
+        }
+    }
+    if not url or not key:
+        diagnostics['overall'] = 'FAIL: Variáveis de ambiente não configuradas'
+        return JSONResponse(diagnostics, status_code=500)
+
+    postgrest = get_postgrest()
+
+    async def query_table():
+        rows, _ = await postgrest.select_page(TABLE, 0, 0)
+        return {
+            'message': 'Dados encontrados' if rows else 'Tabela vazia',
+            'rows': len(rows),
+            'columns': list(rows[0].keys()) if rows else []
+        }
+
+    async def count_rows():
+        return {'message': 'Contagem OK', 'row_count': await postgrest.count(TABLE)}
+
+    async def data_libs():
+        def versions():
+            import numpy as np
+            import pandas as pd
+            return f"pandas {pd.__version__}, numpy {np.__version__}"
+        return {'message': await run_in_threadpool(versions)}
+
+    names = ['2_query_table', '3_count_rows', '4_data_libs']
+    results = await asyncio.gather(_check(query_table()), _check(count_rows()), _check(data_libs()))
+    diagnostics['tests'].update(zip(names, results))
+
+    failed = [name for name, result in zip(names, results) if result['status'] == 'FAIL']
+    diagnostics['overall'] = f"FAIL: {', '.join(failed)}" if failed else '✅ TODOS OS TESTES PASSARAM'
+    return JSONResponse(diagnostics, status_code=500 if failed else 200)
+
+
+async def get_chamados(request: Request):
+    """
+    Endpoint principal que retorna dados processados dos chamados
+    Utiliza cache; com o cache vencido, uma única busca atende todas as requisições
+    ?sections=kpis,tabela e ?fields=id_chamado,status: só as seções/campos pedidos
+    """
+    try:
+        response_format = negotiated_format(request)
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': str(e)}, status_code=406)
+    try:
+        sections = parse_sections(request.query_params.get('sections'))
+        fields = parse_fields(request.query_params.get('fields'))
+        if (sections or fields) and request.query_params.get('since') is not None:
+            raise ValueError("'since' não pode ser combinado com 'sections' ou 'fields'")
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': str(e)}, status_code=400)
+
+    url, key = _supabase_config()
+    if not url or not key:
+        return JSONResponse({
+            'error': True,
+            'message': 'Configuração incompleta',
+            'details': f"Variáveis de ambiente faltando - URL: {bool(url)}, KEY: {bool(key)}"
+        }, status_code=500)
+
+    restore_cache_from_snapshot()
+    await refresh_from_changelog()
+    if await revalidate_cache():
+        record_cache(True)
+        if sections or fields:
+            return await data_response(project_payload(cache['data'], sections, fields), response_format)
+        return await data_response(versioned_response(request, cache['data']), response_format)
+
+    try:
+        if sections or fields:
+            # Só ?fields=: todas as seções, com a tabela limitada aos campos pedidos
+            return await data_response(await get_sections(sections or list(SECTIONS), fields), response_format)
+        record_cache(False)
+        data = await rebuild_payload()
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': str(e)}, status_code=400)
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/chamados: {str(e)}")
+        if cache['data'] is not None:
+            stale = project_payload(cache['data'], sections, fields) if sections or fields else dict(cache['data'])
+            stale['warning'] = 'Dados podem estar desatualizados devido a erro na atualização'
+            return JSONResponse(stale)
+        return JSONResponse({
+            'error': True,
+            'message': 'Falha ao obter dados dos chamados',
+            'details': str(e)
+        }, status_code=500)
+
+    return await data_response(versioned_response(request, data), response_format)
+
+
+async def chamados_stream(request: Request):
+    """
+    Payload dos chamados por Server-Sent Events
+
+    Envia a versão atual ao conectar (exceto se Last-Event-ID já for ela) e cada
+    nova versão quando os dados mudam; heartbeat a cada STREAM_HEARTBEAT segundos.
+    """
+    restore_cache_from_snapshot()
+    if broadcaster.fingerprint is None and cache['data'] is not None:
+        await broadcaster.publish(cache['data'])
+
+    last_event_id = request.headers.get('last-event-id') or request.query_params.get('last_event_id')
+    events = broadcaster.subscribe(last_event_id)
+    # Primeiro evento antes de iniciar o produtor: a assinatura já está contada
+    first = await events.__anext__()
+    ensure_stream_producer()
+
+    async def body():
+        try:
+            yield first
+            async for chunk in events:
+                yield chunk
+        finally:
+            # Desconexão: libera a assinatura na hora (o produtor para sem assinantes)
+            await events.aclose()
+
+    return StreamingResponse(body(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+async def run_refresh_job(progress) -> Dict[str, Any]:
+    """Job de /api/chamados/refresh: reconstrói o payload (o cache antigo segue valendo até a troca)"""
+    progress('buscando_dados')
+    data = await rebuild_payload()
+    return {'versao': data.get('versao'), 'total_chamados': data.get('total_chamados')}
+
+
+async def refresh_chamados(request: Request):
+    """Inicia a atualização em segundo plano (202 + id do job); pedidos simultâneos se juntam"""
+    job, created = refresh_jobs.submit_async(run_refresh_job)
+    return JSONResponse({
+        'success': True,
+        'message': 'Atualização iniciada' if created else 'Atualização já em andamento',
+        'job_id': job['id'],
+        'status_url': f"/api/chamados/refresh/{job['id']}",
+        'job': job,
+        'timestamp': datetime.now().isoformat()
+    }, status_code=202)
+
+
+async def refresh_status(request: Request):
+    """Estado de um job de atualização: status, etapa, fases (ms), resultado ou erro"""
+    job_id = request.path_params['job_id']
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({'error': True, 'message': f"Job não encontrado: '{job_id}'"}, status_code=404)
+    return JSONResponse(job)
+
+
+async def export_chamados(request: Request):
+    """Dataset normalizado completo (mesmos parâmetros e formatos de app.py: colunas, format)"""
+    from formats import export_payload, select_columns
+
+    try:
+        response_format = negotiated_format(request)
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': str(e)}, status_code=406)
+
+    try:
+        df = select_columns(await load_chamados_dataframe(), request.query_params.get('colunas'))
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}, status_code=400)
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/chamados/export: {str(e)}")
+        return JSONResponse({
+            'error': True,
+            'message': 'Falha ao exportar os chamados',
+            'details': str(e)
+        }, status_code=500)
+
+    with phase('export_columns'):
+        data, dataset = await run_in_threadpool(export_payload, df, response_format)
+    return await data_response(data, response_format, dataset)
+
+
+async def chamados_cube(request: Request):
+    """Cubo OLAP (mesmos parâmetros de app.py: rows, cols, filter, measures, membros)"""
+    from cube import parse_dimensions, parse_filters, parse_measures
+
+    params = request.query_params
+    try:
+        rows = parse_dimensions(params.get('rows', 'tecnico'))
+        cols = parse_dimensions(params.get('cols'))
+        filters = parse_filters(params.get('filter'))
+        measures = parse_measures(params.get('measures'))
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}, status_code=400)
+
+    try:
+        cube = await get_cube()
+        with phase('cube_query'):
+            result = cube.query(rows, cols, filters, measures)
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}, status_code=400)
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/chamados/cube: {str(e)}")
+        return JSONResponse({
+            'error': True,
+            'message': 'Falha ao consultar o cubo de chamados',
+            'details': str(e)
+        }, status_code=500)
+
+    if params.get('membros', 'false').lower() == 'true':
+        result['membros'] = cube.members()
+    result['atualizado_em'] = _cube_state['timestamp'].isoformat()
+    return JSONResponse(result)
+
+
+async def tecnicos_ranking(request: Request):
+    """Ranking de técnicos (mesmos parâmetros de app.py)"""
+    from ranking import METRICS, parse_periodo
+
+    params = request.query_params
+    metrica = params.get('metrica', 'all')
+    periodo = params.get('periodo') or None
+    try:
+        k = int(params.get('k', 5))
+        min_avaliacoes = int(params.get('min_avaliacoes', 1))
+        if periodo:
+            parse_periodo(periodo)
+    except ValueError as e:
+        return JSONResponse({'error': True, 'message': f'Parâmetro inválido: {str(e)}'}, status_code=400)
+
+    if metrica != 'all' and metrica not in METRICS:
+        return JSONResponse({
+            'error': True,
+            'message': f"Métrica inválida: '{metrica}'",
+            'metricas': list(METRICS) + ['all']
+        }, status_code=400)
+
+    try:
+        engine = await get_ranking_engine()
+        with phase('ranking_query'):
+            result = engine.ranking(metrica, k=max(k, 0), periodo=periodo, min_avaliacoes=min_avaliacoes)
+    except Exception as e:
+        print(f"❌ Erro no endpoint /api/tecnicos/ranking: {str(e)}")
+        return JSONResponse({
+            'error': True,
+            'message': 'Falha ao calcular ranking de técnicos',
+            'details': str(e)
+        }, status_code=500)
+
+    result['periodos_disponiveis'] = {
+        'mes': engine.periods('mes'),
+        'trimestre': engine.periods('trimestre')
+    }
+    result['atualizado_em'] = _ranking_state['timestamp'].isoformat()
+    return JSONResponse(result)
+
+
+async def get_config(request: Request):
+    """Configurações públicas da aplicação"""
+    url, _ = _supabase_config()
+    return JSONResponse({
+        'supabase_url': url[:30] + '...' if url else 'não configurado',
+        'cache_timeout': CACHE_TIMEOUT,
+        'environment': os.getenv('FLASK_ENV', 'production'),
+        'server': 'asgi',
+        'data_source': 'Supabase'
+    })
+
+
+async def diagnostics(request: Request):
+    """Diagnóstico da integração com Supabase (contagem e colunas ao mesmo tempo)"""
+    url, key = _supabase_config()
+    diag: Dict[str, Any] = {'url': url, 'connected': False, 'table_exists': False, 'row_count': 0, 'columns': []}
+    try:
+        postgrest = get_postgrest()
+        row_count, (sample, _) = await asyncio.gather(postgrest.count(TABLE), postgrest.select_page(TABLE, 0, 0))
+        diag.update(connected=True, table_exists=True, row_count=row_count,
+                    columns=list(sample[0].keys()) if sample else [])
+    except Exception as e:
+        diag['error'] = str(e)
+        diag['hint'] = 'Verifique se a tabela "chamados" existe no Supabase e se as credenciais estão corretas.'
+
+    return JSONResponse({
+        'status': 'ok' if diag['connected'] and diag['table_exists'] else 'partial',
+        'env': {
+            'supabase_url_set': url is not None,
+            'supabase_key_set': key is not None,
+        },
+        'diagnostics': diag,
+        'hint': diag.get('hint') if not diag['connected'] else None
+    })
+
+
+async def metrics(request: Request):
+    """Métricas da API no formato Prometheus"""
+    return PlainTextResponse(render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+async def not_found(request: Request, exc: HTTPException):
+    if exc.status_code != 404:
+        return JSONResponse({'error': True, 'message': exc.detail}, status_code=exc.status_code)
+    return JSONResponse({
+        'error': True,
+        'message': 'Endpoint não encontrado',
+        'available_endpoints': ENDPOINTS
+    }, status_code=404)
+
+
+async def internal_error(request: Request, exc: Exception):
+    return JSONResponse({
+        'error': True,
+        'message': 'Erro interno do servidor',
+        'details': str(exc)
+    }, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    if _state['producer'] is not None:
+        _state['producer'].cancel()
+    postgrest: Optional[Any] = _state['postgrest']
+    if postgrest is not None:
+        await postgrest.aclose()
+        _state['postgrest'] = None
+
+
+routes = [
+    Route('/', home),
+    Route('/api', home),
+    Route('/api/health', health_check),
+    Route('/api/test', test_supabase),
+    Route('/api/chamados', get_chamados),
+    Route('/api/chamados/stream', chamados_stream),
+    Route('/api/chamados/refresh', refresh_chamados, methods=['POST']),
+    Route('/api/chamados/refresh/{job_id}', refresh_status),
+    Route('/api/chamados/export', export_chamados),
+    Route('/api/chamados/cube', chamados_cube),
+    Route('/api/tecnicos/ranking', tecnicos_ranking),
+    Route('/api/config', get_config),
+    Route('/api/diagnostics', diagnostics),
+    Route('/api/metrics', metrics),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['GET', 'POST'], allow_headers=['*']),
+        Middleware(InstrumentationMiddleware, service='asgi'),
+    ],
+    exception_handlers={HTTPException: not_found, Exception: internal_error},
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('PORT', 5000))
+    print("🚀 Iniciando TechHelp Dashboard API (ASGI)...")
+    print(f"🌐 Porta: {port}")
+    print(f"⏱️ Cache timeout: {CACHE_TIMEOUT}s")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,214 @@
+"""
+Change log dos chamados (tabela chamados_changelog) aplicado ao dataset residente da API
+Responsável por:
+ - Ler as entradas novas do log, gravadas pelos triggers da tabela chamados
+   (seq, fonte, operação, ids)
+ - Planejar a atualização: quais linhas buscar de novo e quais remover
+ - Aplicar as linhas alteradas ao dataset em memória e ajustar os agregados
+   (status, técnicos, categorias) sem recontar tudo
+ - Montar o payload de /api/chamados a partir dos agregados mantidos
+
+O log é a fonte de "o que mudou"; o conteúdo vem sempre da tabela chamados.
+Aplicar uma entrada é idempotente (a linha é buscada de novo ou removida), então
+reaplicar entradas é seguro. Entradas com seq menor que o cursor podem aparecer
+depois (transações concorrentes confirmadas fora de ordem): a leitura volta
+CHANGELOG_LOOKBACK posições e ignora as já aplicadas.
+
+Sem pandas (Python puro), como payload.py.
+"""
+import bisect
+import os
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from payload import payload_from_counts
+from status_map import STATUS_CATEGORIES, status_code
+
+
+CHANGELOG_TABLE = 'chamados_changelog'
+# Intervalo mínimo (s) entre consultas ao log; 0 = consulta a cada requisição
+CHANGELOG_POLL_INTERVAL = float(os.getenv('CHANGELOG_POLL_INTERVAL', 5))
+# Entradas anteriores ao cursor relidas a cada consulta (commits fora de ordem)
+CHANGELOG_LOOKBACK = int(os.getenv('CHANGELOG_LOOKBACK', 20))
+# Acima de tantas linhas alteradas, a API recarrega a tabela inteira em vez de aplicar o delta
+CHANGELOG_MAX_ROWS = int(os.getenv('CHANGELOG_MAX_ROWS', 5000))
+# ids por busca na tabela chamados (id_chamado=in.(...) vai na URL)
+FETCH_BATCH = 100
+# Até quantas chaves alteradas o dataset é ajustado por busca binária (acima: uma passada)
+SMALL_DELTA = 256
+
+# Operações registradas pelos triggers (delete: registros removidos da tabela)
+INSERT, UPDATE, DELETE = 'insert', 'update', 'delete'
+
+RowKey = Tuple[str, str]
+
+
+def row_key(row: Dict[str, Any]) -> RowKey:
+    """Chave (fonte, id_chamado) de uma linha, como a chave primária da tabela"""
+    return str(row.get('fonte') or ''), str(row.get('id_chamado'))
+
+
+def in_filter(values: Iterable[str]) -> str:
+    """Filtro PostgREST `in.(...)` com os valores entre aspas (ids com vírgula/parênteses)"""
+    quoted = ('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values)
+    return f"in.({','.join(quoted)})"
+
+
+def tail_query(cursor: Optional[int], lookback: int = CHANGELOG_LOOKBACK) -> Dict[str, str]:
+    """Parâmetros PostgREST das entradas a partir de cursor - lookback"""
+    params = {'select': 'seq,execucao,fonte,operacao,ids', 'order': 'seq.asc'}
+    if cursor is not None:
+        params['seq'] = f'gt.{max(cursor - lookback, 0)}'
+    return params
+
+
+def fetch_batches(plan_fetch: Dict[str, List[str]], batch: int = FETCH_BATCH) -> List[Dict[str, str]]:
+    """Filtros PostgREST (fonte + lote de ids) para buscar as linhas a atualizar"""
+    queries = []
+    for fonte, ids in plan_fetch.items():
+        for start in range(0, len(ids), batch):
+            query = {'select': '*', 'id_chamado': in_filter(ids[start:start + batch])}
+            if fonte:
+                query['fonte'] = f'eq.{fonte}'
+            queries.append(query)
+    return queries
+
+
+class ResidentDataset:
+    """
+    Linhas da tabela chamados em memória, ordenadas pela chave, com agregados do payload
+
+    Exemplo:
+        dataset = ResidentDataset(rows, cursor=cursor)
+        entries = dataset.pending(log_entries)
+        plan = dataset.plan(entries)             # {'fetch': {fonte: [ids]}, 'remove': [...]}
+        dataset.apply(entries, fetched_rows)     # {'inseridos': 1, 'atualizados': 3, 'removidos': 0}
+        dataset.payload('Supabase (ASGI)', 50)
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], cursor: Optional[int] = None,
+                 lookback: int = CHANGELOG_LOOKBACK):
+        # Linhas já vêm ordenadas por (fonte, id_chamado); sort estável é O(n) nesse caso
+        self.rows = sorted(rows, key=row_key)
+        self.keys = [row_key(row) for row in self.rows]
+        self.status = [0] * len(STATUS_CATEGORIES)
+        self.tecnicos: Counter = Counter()
+        self.categorias: Counter = Counter()
+        for row in self.rows:
+            self._count(row, 1)
+        # Maior seq aplicado e seqs recentes (para reler a janela de lookback);
+        # entradas até `floor` já estavam nas linhas da carga completa
+        self.cursor = cursor
+        self.floor = cursor if cursor is not None else 0
+        self.applied = deque(maxlen=max(lookback * 4, 64))
+        self._applied_set = set()
+
+    def _count(self, row: Dict[str, Any], sign: int):
+        self.status[status_code(row.get('status'))] += sign
+        for counter, value in ((self.tecnicos, row.get('tecnico', 'N/A')),
+                               (self.categorias, row.get('categoria', 'N/A'))):
+            counter[value] += sign
+            if counter[value] <= 0:
+                del counter[value]
+
+    def _position(self, key: RowKey) -> int:
+        i = bisect.bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def _mark_applied(self, seq: int):
+        if len(self.applied) == self.applied.maxlen:
+            self._applied_set.discard(self.applied[0])
+        self.applied.append(seq)
+        self._applied_set.add(seq)
+        self.cursor = seq if self.cursor is None else max(self.cursor, seq)
+
+    # ------------------------------------------------------------------ deltas
+    def pending(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Entradas ainda não aplicadas (a leitura com lookback repete as recentes)"""
+        return [e for e in entries if e['seq'] > self.floor and e['seq'] not in self._applied_set]
+
+    @staticmethod
+    def plan(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        O que fazer com as entradas: buscar de novo (insert/update) ou remover (delete)
+
+        Uma chave alterada várias vezes é buscada uma vez; a última operação vale.
+        """
+        last: Dict[RowKey, str] = {}
+        for entry in sorted(entries, key=lambda e: e['seq']):
+            fonte = str(entry.get('fonte') or '')
+            for id_chamado in entry.get('ids') or []:
+                last[(fonte, str(id_chamado))] = entry['operacao']
+        fetch: Dict[str, List[str]] = {}
+        remove = []
+        for key, operacao in last.items():
+            if operacao == DELETE:
+                remove.append(key)
+            else:
+                fetch.setdefault(key[0], []).append(key[1])
+        return {'fetch': fetch, 'remove': remove}
+
+    def apply(self, entries: List[Dict[str, Any]], fetched: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Aplica as entradas com as linhas buscadas de plan()['fetch']
+
+        Linha pedida e não devolvida pela tabela foi removida depois da entrada: sai do dataset.
+        As listas são trocadas (cópia), não alteradas: quem ainda lê a lista antiga
+        (ex.: DataFrame do ranking montado em outra thread) não vê a troca pela metade.
+        """
+        plan = self.plan(entries)
+        fresh = {row_key(row): row for row in fetched}
+        missing = [(fonte, i) for fonte, ids in plan['fetch'].items() for i in ids if (fonte, i) not in fresh]
+        removed = set(plan['remove']) | set(missing)
+        summary = {'inseridos': 0, 'atualizados': 0, 'removidos': 0}
+
+        rows, keys = list(self.rows), list(self.keys)
+        if len(removed) + len(fresh) <= SMALL_DELTA:
+            # Poucas chaves: busca binária e insert/del na cópia
+            for key in removed:
+                i = bisect.bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    self._count(rows[i], -1)
+                    del rows[i], keys[i]
+                    summary['removidos'] += 1
+            for key, row in fresh.items():
+                i = bisect.bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    self._count(rows[i], -1)
+                    rows[i] = row
+                    summary['atualizados'] += 1
+                else:
+                    rows.insert(i, row)
+                    keys.insert(i, key)
+                    summary['inseridos'] += 1
+                self._count(row, 1)
+        else:
+            # Muitas chaves (ex.: primeira carga de uma fonte): uma passada e reordenação
+            merged = []
+            for key, row in zip(keys, rows):
+                if key in removed or key in fresh:
+                    self._count(row, -1)
+                    if key in removed:
+                        summary['removidos'] += 1
+                        continue
+                    summary['atualizados'] += 1
+                    row = fresh[key]
+                merged.append((key, row))
+            summary['inseridos'] = len(fresh) - summary['atualizados']
+            present = set(keys)
+            merged.extend(item for item in fresh.items() if item[0] not in present)
+            merged.sort(key=lambda item: item[0])
+            keys = [key for key, _ in merged]
+            rows = [row for _, row in merged]
+            for row in fresh.values():
+                self._count(row, 1)
+        self.rows, self.keys = rows, keys
+
+        for seq in sorted(entry['seq'] for entry in entries):
+            self._mark_applied(seq)
+        return summary
+
+    def payload(self, fonte: str, table_limit: int = 50) -> Dict[str, Any]:
+        """Payload de /api/chamados a partir dos agregados mantidos"""
+        return payload_from_counts(len(self.rows), self.status, self.tecnicos, self.categorias,
+                                   self.rows[:table_limit], fonte)
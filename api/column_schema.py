@@ -0,0 +1,119 @@
+"""
+Schema de colunas dos chamados para TechHelp Dashboard
+Responsável por:
+ - Normalizar nomes de colunas (minúsculas, sem acentos, underscores)
+ - Resolver variações de nomes das planilhas para o padrão do banco
+ - Aplicar o mapeamento em um único rename por DataFrame
+
+Compartilhado por todos os caminhos de ingestão (GoogleSheetsIntegration,
+SupabaseIntegration e sync_drive_to_supabase). A Edge Function
+(supabase/functions/sync-drive-data/index.ts) replica COLUMN_ALIASES -
+mantenha as duas tabelas sincronizadas.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+
+# Padrões pré-compilados (a normalização roda para cada cabeçalho)
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_REPEATED_UNDERSCORE_RE = re.compile(r'_+')
+
+# Mapeamento de variações (já normalizadas) para nomes padrão.
+# A ordem das variações define a prioridade quando mais de uma está presente.
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'id_chamado': ('id_chamado', 'id', 'chamado_id', 'numero', 'id_do_chamado'),
+    'data_abertura': ('data_abertura', 'abertura', 'data_inicio', 'data_de_abertura'),
+    'data_fechamento': ('data_fechamento', 'fechamento', 'data_fim', 'data_de_fechamento'),
+    'tecnico': ('tecnico', 'responsavel', 'atendente', 'agente_responsavel', 'agente'),
+    'categoria': ('categoria', 'tipo', 'classificacao', 'motivo', 'motivo_categoria'),
+    'status': ('status', 'situacao', 'estado'),
+    # tma_minutos vira tempo_resolucao (conversão de unidade fica na normalização de tipos)
+    'tempo_resolucao': ('tempo_resolucao', 'tempo', 'duracao', 'tma_minutos'),
+    'frt_minutos': ('frt_minutos',),
+    'satisfacao': ('satisfacao', 'nota', 'avaliacao', 'satisfacao_do_cliente'),
+    'solicitante': ('solicitante', 'cliente', 'usuario'),
+    'departamento': ('departamento', 'area', 'setor'),
+    'prioridade': ('prioridade', 'urgencia'),
+    'solucao': ('solucao', 'resolucao', 'descricao_solucao')
+}
+
+
+@lru_cache(maxsize=2048)
+def _normalize(text: str) -> str:
+    # remove acentos/diacríticos
+    nfkd = unicodedata.normalize('NFKD', text)
+    no_accents = ''.join([c for c in nfkd if not unicodedata.category(c) == 'Mn'])
+    base = no_accents.strip().lower().replace('ç', 'c')
+    # substitui qualquer caractere não [a-z0-9] por underscore
+    cleaned = _NON_ALNUM_RE.sub('_', base)
+    # remove underscores duplicados e bordas
+    return _REPEATED_UNDERSCORE_RE.sub('_', cleaned).strip('_')
+
+
+def normalize_column_name(text: str) -> str:
+    """Normaliza nomes de colunas: minúsculas, sem acentos, underscores, sem pontuação"""
+    if not isinstance(text, str):
+        text = str(text)
+    return _normalize(text)
+
+
+@lru_cache(maxsize=256)
+def resolve_columns(headers: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Resolve os nomes finais das colunas para uma sequência de cabeçalhos
+
+    O resultado é memoizado pela tupla de cabeçalhos: uma planilha já vista
+    não paga novamente a normalização nem a busca nas variações.
+
+    Args:
+        headers: Cabeçalhos originais, na ordem da planilha
+
+    Returns:
+        Tupla com o nome final de cada coluna (mesma ordem)
+    """
+    normalized = [_normalize(h) for h in headers]
+    positions: Dict[str, int] = {}
+    for index, name in enumerate(normalized):
+        positions.setdefault(name, index)
+
+    resolved = list(normalized)
+    for standard_name, variations in COLUMN_ALIASES.items():
+        for var in variations:
+            index = positions.get(var)
+            if index is not None:
+                resolved[index] = standard_name
+                break
+
+    return tuple(resolved)
+
+
+def column_plan(columns: Iterable) -> List[str]:
+    """Retorna a lista de nomes finais para as colunas informadas"""
+    return list(resolve_columns(tuple(str(c) for c in columns)))
+
+
+def apply_column_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza e mapeia as colunas do DataFrame para o schema padrão
+
+    Aplica o plano de renomeação de uma só vez (atribuição de `columns`,
+    sem copiar os dados).
+
+    Args:
+        df: DataFrame com cabeçalhos originais
+
+    Returns:
+        O mesmo DataFrame com colunas renomeadas
+    """
+    df.columns = column_plan(df.columns)
+    return df
+
+
+def schema_cache_info() -> Dict[str, int]:
+    """Estatísticas dos caches de schema (para diagnóstico)"""
+    info = resolve_columns.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
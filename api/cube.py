@@ -0,0 +1,255 @@
+"""
+Cubo OLAP em memória dos chamados (técnico × categoria × status × origem × mês)
+Responsável por:
+ - Agregar, em uma única passada, as células do cubo: chamados, soma/quantidade
+   de tempos de resolução (TMA) e soma/quantidade de notas de satisfação
+ - Responder cortes (filtros), roll-up e drill-down em qualquer combinação de
+   dimensões somando células (bincount), sem reler o DataFrame
+
+O cubo é esparso: guarda só as combinações que existem (código de cada
+dimensão + medidas por célula). O cubo denso das cinco dimensões teria milhões
+de células quase todas vazias; o esparso tem no máximo uma célula por chamado.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from status_map import STATUS_CATEGORIES, status_codes
+
+
+DIMENSIONS = ('tecnico', 'categoria', 'status', 'origem', 'mes')
+MEASURES = ('chamados', 'tma_soma', 'tma_medio', 'satisfacao_soma', 'satisfacao_media', 'avaliacoes')
+# Rótulo dos valores ausentes em uma dimensão (sem técnico, sem data...)
+MISSING_LABEL = 'N/A'
+
+# Índices dos campos no array de medidas
+_COUNT, _TMA_SUM, _TMA_N, _SAT_SUM, _SAT_N = range(5)
+_N_FIELDS = 5
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def parse_dimensions(value: Optional[str]) -> List[str]:
+    """
+    Lista de dimensões da query string ('tecnico,status')
+
+    Raises:
+        ValueError: dimensão desconhecida ou repetida
+    """
+    dims = [d.strip() for d in (value or '').split(',') if d.strip()]
+    unknown = [d for d in dims if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Dimensão inválida: {', '.join(unknown)} (use {', '.join(DIMENSIONS)})")
+    if len(set(dims)) != len(dims):
+        raise ValueError(f"Dimensão repetida: '{value}'")
+    return dims
+
+
+def parse_measures(value: Optional[str]) -> List[str]:
+    """Medidas pedidas ('chamados,tma_medio'); vazio = só chamados"""
+    measures = [m.strip() for m in (value or 'chamados').split(',') if m.strip()]
+    unknown = [m for m in measures if m not in MEASURES]
+    if unknown:
+        raise ValueError(f"Medida inválida: {', '.join(unknown)} (use {', '.join(MEASURES)})")
+    return measures
+
+
+def parse_filters(value: Optional[str]) -> Dict[str, List[str]]:
+    """
+    Filtros da query string: 'dimensao:v1,v2;outra:v3'
+
+    Ex.: 'status:Aberto,Em Andamento;mes:2024-03'
+    """
+    filters: Dict[str, List[str]] = {}
+    for part in (value or '').split(';'):
+        if not part.strip():
+            continue
+        dim, sep, values = part.partition(':')
+        dim = dim.strip()
+        if not sep or dim not in DIMENSIONS:
+            raise ValueError(f"Filtro inválido: '{part}' (use dimensao:valor1,valor2)")
+        filters.setdefault(dim, []).extend(v.strip() for v in values.split(',') if v.strip())
+    return filters
+
+
+class ChamadosCube:
+    """
+    Cubo esparso com as medidas de cada combinação de dimensões
+
+    Exemplo:
+        cube = ChamadosCube(df)
+        cube.query(rows=['tecnico'], cols=['status'], filters={'mes': ['2024-03']})
+        cube.query(rows=['tecnico', 'categoria'])   # drill-down
+        cube.query(rows=['mes'], measures=['chamados', 'tma_medio'])   # roll-up
+    """
+
+    def __init__(self, df: pd.DataFrame, date_column: str = 'data_abertura'):
+        self.labels: Dict[str, np.ndarray] = {}
+        codes = []
+        for dim in DIMENSIONS:
+            dim_codes, labels = self._dimension(df, dim, date_column)
+            codes.append(dim_codes)
+            self.labels[dim] = labels
+        self._label_index = {dim: {label: i for i, label in enumerate(labels)}
+                             for dim, labels in self.labels.items()}
+        sizes = tuple(max(len(self.labels[dim]), 1) for dim in DIMENSIONS)
+
+        # Uma chave por chamado → células distintas (hash, sem ordenar)
+        key = np.ravel_multi_index(codes, sizes) if len(df) else np.empty(0, dtype=np.int64)
+        cell_of_row, cells = pd.factorize(key)
+        n_cells = len(cells)
+        self.coords = np.vstack(np.unravel_index(np.asarray(cells, dtype=np.int64), sizes)) \
+            if n_cells else np.empty((len(DIMENSIONS), 0), dtype=np.int64)
+
+        tma = _numeric(df, 'tempo_resolucao')
+        satisfacao = _numeric(df, 'satisfacao')
+        tma_ok = ~np.isnan(tma)
+        sat_ok = ~np.isnan(satisfacao)
+
+        self.fields = np.empty((_N_FIELDS, n_cells))
+        self.fields[_COUNT] = np.bincount(cell_of_row, minlength=n_cells)
+        self.fields[_TMA_SUM] = np.bincount(cell_of_row[tma_ok], weights=tma[tma_ok], minlength=n_cells)
+        self.fields[_TMA_N] = np.bincount(cell_of_row[tma_ok], minlength=n_cells)
+        self.fields[_SAT_SUM] = np.bincount(cell_of_row[sat_ok], weights=satisfacao[sat_ok], minlength=n_cells)
+        self.fields[_SAT_N] = np.bincount(cell_of_row[sat_ok], minlength=n_cells)
+        self.rows_count = len(df)
+
+    @staticmethod
+    def _dimension(df: pd.DataFrame, dim: str, date_column: str):
+        """Códigos (0..n-1) e rótulos de uma dimensão; ausentes viram MISSING_LABEL"""
+        if dim == 'status':
+            if 'status' not in df.columns:
+                return np.full(len(df), STATUS_CATEGORIES.index('Indefinido')), np.array(STATUS_CATEGORIES, dtype=object)
+            return status_codes(df['status']).astype(np.int64), np.array(STATUS_CATEGORIES, dtype=object)
+
+        if dim == 'mes':
+            if date_column not in df.columns:
+                return np.zeros(len(df), dtype=np.int64), np.array([MISSING_LABEL], dtype=object)
+            dates = pd.to_datetime(df[date_column], errors='coerce')
+            if getattr(dates.dt, 'tz', None) is not None:
+                dates = dates.dt.tz_localize(None)
+            codes, uniques = pd.factorize(dates.dt.to_period('M'), sort=True)
+            labels = [str(p) for p in uniques]
+        elif dim in df.columns:
+            codes, uniques = pd.factorize(df[dim], sort=True)
+            labels = [str(v) for v in uniques]
+        else:
+            return np.zeros(len(df), dtype=np.int64), np.array([MISSING_LABEL], dtype=object)
+
+        codes = np.asarray(codes, dtype=np.int64)
+        missing = codes < 0
+        if missing.any():
+            codes[missing] = len(labels)
+            labels.append(MISSING_LABEL)
+        return codes, np.array(labels, dtype=object)
+
+    # ---------------------------------------------------------------- consultas
+    def members(self) -> Dict[str, List[str]]:
+        """Valores de cada dimensão (para montar filtros no frontend)"""
+        return {dim: list(labels) for dim, labels in self.labels.items()}
+
+    def _mask(self, filters: Optional[Dict[str, Iterable[str]]]) -> np.ndarray:
+        mask = np.ones(self.coords.shape[1], dtype=bool)
+        for dim, values in (filters or {}).items():
+            index = self._label_index[dim]
+            allowed = [index[v] for v in values if v in index]
+            mask &= np.isin(self.coords[DIMENSIONS.index(dim)], allowed)
+        return mask
+
+    def _axis(self, dims: List[str], cells: np.ndarray):
+        """Posição de cada célula no eixo e rótulos do eixo (ordem dos rótulos)"""
+        if not dims:
+            return np.zeros(len(cells), dtype=np.int64), [[]]
+        positions = [DIMENSIONS.index(d) for d in dims]
+        sizes = tuple(len(self.labels[d]) for d in dims)
+        key = np.ravel_multi_index(tuple(self.coords[p, cells] for p in positions), sizes)
+        space = int(np.prod(sizes))
+        if space <= 4 * len(cells) + 1024:
+            # Espaço pequeno: presença por bincount e renumeração por cumsum (sem ordenar)
+            present = np.bincount(key, minlength=space) > 0
+            uniques = np.flatnonzero(present)
+            inverse = (np.cumsum(present) - 1)[key]
+        else:
+            uniques, inverse = np.unique(key, return_inverse=True)
+        label_codes = np.unravel_index(uniques, sizes)
+        keys = [[self.labels[d][c] for d, c in zip(dims, combo)] for combo in zip(*(lc.tolist() for lc in label_codes))]
+        return inverse.ravel(), keys
+
+    @staticmethod
+    def _measure(fields: np.ndarray, name: str) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if name == 'chamados':
+                return fields[_COUNT]
+            if name == 'tma_soma':
+                return fields[_TMA_SUM]
+            if name == 'tma_medio':
+                return np.where(fields[_TMA_N] > 0, fields[_TMA_SUM] / fields[_TMA_N], np.nan)
+            if name == 'satisfacao_soma':
+                return fields[_SAT_SUM]
+            if name == 'satisfacao_media':
+                return np.where(fields[_SAT_N] > 0, fields[_SAT_SUM] / fields[_SAT_N], np.nan)
+            if name == 'avaliacoes':
+                return fields[_SAT_N]
+        raise ValueError(f"Medida inválida: '{name}'")
+
+    @staticmethod
+    def _to_json(values: np.ndarray, name: str):
+        if name in ('chamados', 'avaliacoes'):
+            return values.astype(np.int64).tolist()
+        rounded = np.round(values, 2).astype(object)
+        rounded[np.isnan(values)] = None
+        return rounded.tolist()
+
+    def query(self, rows: List[str], cols: List[str] = None, filters: Dict[str, Iterable[str]] = None,
+              measures: List[str] = None) -> Dict[str, Any]:
+        """
+        Agrega o cubo em uma tabela linhas × colunas
+
+        Args:
+            rows: Dimensões das linhas (mais dimensões = drill-down)
+            cols: Dimensões das colunas (vazio = uma coluna)
+            filters: {dimensao: [valores]} (corte; valores desconhecidos não casam)
+            measures: Medidas de MEASURES (padrão: chamados)
+
+        Returns:
+            {'linhas': [[rótulos]], 'colunas': [[rótulos]], 'valores': {medida: matriz},
+             'totais': {medida: valor}}; só linhas/colunas com chamados
+        """
+        cols = list(cols or [])
+        measures = list(measures or ['chamados'])
+        if set(rows) & set(cols):
+            raise ValueError('Uma dimensão não pode estar nas linhas e nas colunas')
+
+        cells = np.flatnonzero(self._mask(filters))
+        row_pos, row_keys = self._axis(list(rows), cells)
+        col_pos, col_keys = self._axis(cols, cells)
+        n_rows, n_cols = len(row_keys), len(col_keys)
+
+        pair = row_pos * n_cols + col_pos
+        grid = np.empty((_N_FIELDS, n_rows * n_cols))
+        for field in range(_N_FIELDS):
+            grid[field] = np.bincount(pair, weights=self.fields[field, cells], minlength=n_rows * n_cols)
+        totals = grid.sum(axis=1, keepdims=True)
+        grid = grid.reshape(_N_FIELDS, n_rows, n_cols)
+
+        if not len(cells):
+            # Corte vazio: nenhuma linha (o eixo sem dimensões não ganha linha vazia)
+            row_keys = []
+            col_keys = col_keys if not cols else []
+            grid = np.empty((_N_FIELDS, 0, len(col_keys)))
+
+        return {
+            'rows': list(rows),
+            'cols': cols,
+            'filtros': {dim: list(values) for dim, values in (filters or {}).items()},
+            'linhas': row_keys,
+            'colunas': col_keys,
+            'valores': {m: self._to_json(self._measure(grid, m), m) for m in measures},
+            'totais': {m: self._to_json(self._measure(totals, m), m)[0] for m in measures},
+            'celulas': int(len(cells))
+        }
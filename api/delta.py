@@ -0,0 +1,165 @@
+"""
+Versões do payload do dashboard e respostas incrementais (?since=)
+Responsável por:
+ - Numerar cada payload com conteúdo novo (campo 'versao', sempre crescente)
+ - Guardar as últimas versões em um anel de tamanho fixo (DELTA_HISTORY)
+ - Calcular a diferença entre uma versão antiga e a atual: KPIs alterados,
+   entradas alteradas dos mapas de contagem e linhas da tabela inseridas/removidas
+
+A versão é um carimbo em milissegundos (maior que a anterior): continua
+crescendo entre reinícios e processos. Uma versão fora do anel (cliente muito
+atrasado ou de outro processo) recebe o payload completo.
+Python puro: usado por app.py, index.py e asgi.py.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+DELTA_HISTORY = int(os.getenv('DELTA_HISTORY', 10))
+
+VERSION_FIELD = 'versao'
+# Campos que mudam a cada reconstrução sem que os dados mudem
+VOLATILE_FIELDS = ('ultima_atualizacao', 'warning', VERSION_FIELD)
+# Mapas de contagem (diferença por chave) e tabela (diferença por linha)
+COUNT_FIELDS = ('chamados_por_tecnico', 'categorias')
+TABLE_FIELD = 'tabela'
+
+
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    """Impressão digital do conteúdo do payload (ignora VOLATILE_FIELDS)"""
+    stable = {k: v for k, v in payload.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps(stable, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def _row_key(row: Dict[str, Any]) -> str:
+    key = row.get('id_chamado', row.get('id'))
+    if key is None:
+        # Sem id: a própria linha identifica
+        return json.dumps(row, sort_keys=True, default=str)
+    # Com várias planilhas o id só é único dentro da fonte
+    return f"{row['fonte']}/{key}" if row.get('fonte') else str(key)
+
+
+def _diff_counts(old: Dict[Any, Any], new: Dict[Any, Any]) -> Optional[Dict[str, Any]]:
+    changed = {k: v for k, v in new.items() if old.get(k) != v or k not in old}
+    removed = [k for k in old if k not in new]
+    if not changed and not removed:
+        return None
+    return {'set': changed, 'removed': removed}
+
+
+def _diff_table(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Linhas inseridas (novas ou alteradas) e removidas, pela chave id_chamado/id"""
+    old_rows = OrderedDict((_row_key(r), r) for r in old)
+    new_rows = OrderedDict((_row_key(r), r) for r in new)
+    removed = [k for k, r in old_rows.items() if new_rows.get(k) != r]
+    inserted = [r for k, r in new_rows.items() if old_rows.get(k) != r]
+    if not removed and not inserted and list(old_rows) == list(new_rows):
+        return None
+
+    diff = {'inserted': inserted, 'removed': removed}
+    # Ordem final só quando não é "antigas que ficaram + inseridas no fim"
+    removed_set = set(removed)
+    implied = [k for k in old_rows if k not in removed_set] + [_row_key(r) for r in inserted]
+    if implied != list(new_rows):
+        diff['order'] = list(new_rows)
+    return diff
+
+
+def diff_payloads(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Diferença entre dois payloads (aplicada no cliente sobre o antigo)"""
+    kpis = {}
+    counts = {}
+    for field, value in new.items():
+        if field == VERSION_FIELD:
+            continue
+        if field in COUNT_FIELDS and isinstance(value, dict) and isinstance(old.get(field), dict):
+            diff = _diff_counts(old[field], value)
+            if diff:
+                counts[field] = diff
+        elif field == TABLE_FIELD and isinstance(value, list) and isinstance(old.get(field), list):
+            continue
+        elif old.get(field) != value or field not in old:
+            kpis[field] = value
+
+    delta = {'kpis': kpis, 'counts': counts, 'removed_fields': [f for f in old if f not in new]}
+    table = _diff_table(old.get(TABLE_FIELD) or [], new.get(TABLE_FIELD) or [])
+    if table:
+        delta[TABLE_FIELD] = table
+    return delta
+
+
+class VersionHistory:
+    """
+    Anel com as últimas versões do payload
+
+    Exemplo:
+        history.record(payload)        # ao reconstruir; grava payload['versao']
+        history.since(versao_cliente)  # delta, {'unchanged': True} ou payload completo
+    """
+
+    def __init__(self, size: int = DELTA_HISTORY):
+        self.size = max(size, 1)
+        self._versions: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[int]:
+        return next(reversed(self._versions)) if self._versions else None
+
+    def record(self, payload: Dict[str, Any]) -> int:
+        """
+        Registra o payload: mesmo conteúdo mantém a versão atual; conteúdo novo
+        recebe uma versão maior. Grava a versão em payload['versao'].
+        """
+        fingerprint = payload_fingerprint(payload)
+        with self._lock:
+            current = self.current
+            if fingerprint == self._fingerprint and current is not None:
+                # Guarda o payload mais recente (horário de atualização) na mesma versão
+                self._versions[current] = payload
+                payload[VERSION_FIELD] = current
+                return current
+
+            # Payload vindo de snapshot já traz a versão com que foi gerado
+            version = payload.get(VERSION_FIELD) if isinstance(payload.get(VERSION_FIELD), int) else None
+            if version is None or (current is not None and version <= current):
+                version = max(int(time.time() * 1000), (current or 0) + 1)
+            payload[VERSION_FIELD] = version
+            self._versions[version] = payload
+            self._fingerprint = fingerprint
+            while len(self._versions) > self.size:
+                self._versions.popitem(last=False)
+            return version
+
+    def since(self, version: Any) -> Dict[str, Any]:
+        """
+        Resposta para um cliente na versão `version`
+
+        Returns:
+            {'delta': True, 'unchanged': True, ...} se já está na atual;
+            {'delta': True, 'base': v, 'versao': atual, ...diferença} se v está no anel;
+            o payload completo (sem 'delta') caso contrário
+        """
+        with self._lock:
+            current = self.current
+            if current is None:
+                raise ValueError('Nenhuma versão registrada')
+            latest = self._versions[current]
+            try:
+                version = int(version)
+            except (TypeError, ValueError):
+                return latest
+            if version == current:
+                return {'delta': True, 'unchanged': True, 'base': version, VERSION_FIELD: current}
+            base = self._versions.get(version)
+        if base is None:
+            return latest
+        return {'delta': True, 'base': version, VERSION_FIELD: current, **diff_payloads(base, latest)}
@@ -0,0 +1,99 @@
+"""
+Impressão digital do dataset chamados (chave dos caches derivados)
+Responsável por:
+ - Identificar a versão dos dados com uma consulta de uma linha: total de
+   registros (Prefer: count=exact) + max(updated_at), mantido pelo trigger
+   update_chamados_updated_at
+ - Memoizar os artefatos derivados (ranking, cubo, seções) contra a impressão:
+   com o cache vencido e a impressão igual, nada é buscado nem recalculado
+
+Inserção e atualização movem max(updated_at); remoção muda o total. Sem a coluna
+(ou com a consulta falhando) a impressão é None e vale só o CACHE_TIMEOUT.
+
+Sem pandas (Python puro), como payload.py.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+FINGERPRINT_COLUMN = 'updated_at'
+# Consulta: select=updated_at, esta ordem, uma linha, com o total (Prefer: count=exact)
+FINGERPRINT_ORDER = f'{FINGERPRINT_COLUMN}.desc.nullslast'
+
+
+def dataset_fingerprint(total: Optional[int], rows: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Impressão a partir da resposta da consulta (FINGERPRINT_ORDER, uma linha)
+
+    Args:
+        total: Total de registros (Content-Range); None se o servidor não informou
+        rows: Linha devolvida (a de maior updated_at) ou lista vazia
+    """
+    if total is None:
+        return None
+    last_update = rows[0].get(FINGERPRINT_COLUMN) if rows else None
+    if total and last_update is None:
+        # Tabela sem updated_at preenchido: não há como saber se mudou
+        return None
+    return f"{total}:{last_update or '-'}"
+
+
+class FingerprintMemo:
+    """
+    Artefatos derivados do dataset, válidos enquanto a impressão não mudar
+
+    Exemplo:
+        memo = FingerprintMemo()
+        if memo.expired(CACHE_TIMEOUT):
+            memo.revalidate(fingerprint)     # mesma impressão: mantém tudo; outra: descarta
+        engine = memo.get('ranking')         # None se ainda não calculado para esta versão
+        token = memo.token
+        memo.put('ranking', build(), token)  # descartado se os dados mudaram durante o cálculo
+    """
+
+    def __init__(self):
+        self.fingerprint: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._values: Dict[str, Any] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def token(self) -> int:
+        """Geração atual (capturar antes de calcular um artefato)"""
+        return self._generation
+
+    def expired(self, max_age: float) -> bool:
+        """Impressão conferida há mais de max_age segundos (ou nunca)"""
+        return self.checked_at is None or time.monotonic() - self.checked_at >= max_age
+
+    def revalidate(self, fingerprint: Optional[str]) -> bool:
+        """
+        Registra a impressão atual; retorna True se os artefatos foram mantidos
+
+        Impressão None (desconhecida) sempre descarta: vale só o tempo, como antes.
+        """
+        with self._lock:
+            self.checked_at = time.monotonic()
+            if fingerprint is not None and fingerprint == self.fingerprint:
+                return True
+            self.fingerprint = fingerprint
+            self._values.clear()
+            self._generation += 1
+            return False
+
+    def invalidate(self):
+        """Dados alterados sem impressão nova (ex.: delta do change log)"""
+        with self._lock:
+            self.fingerprint = None
+            self._values.clear()
+            self._generation += 1
+
+    def get(self, name: str) -> Any:
+        return self._values.get(name)
+
+    def put(self, name: str, value: Any, token: int):
+        with self._lock:
+            if token == self._generation:
+                self._values[name] = value
@@ -0,0 +1,240 @@
+"""
+Formatos de resposta dos endpoints de dados (negociação de conteúdo)
+Responsável por:
+ - Escolher o formato pelo parâmetro ?format= ou pelo cabeçalho Accept
+   (JSON continua sendo o padrão)
+ - MessagePack: o payload como está, com escalares numpy/datas convertidos
+ - Arrow IPC (stream): as linhas tabulares como record batches, montadas
+   direto das colunas (DataFrame) ou da lista de registros; o restante do
+   payload vai nos metadados do schema (techhelp.payload, JSON)
+ - Exportação colunar ({coluna: valores}) para JSON/MessagePack, sem um dict por linha
+
+msgpack e pyarrow são opcionais: sem eles, o formato não é oferecido
+(Accept cai para JSON; ?format= explícito responde 406).
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+# ?format=<nome>
+FORMATS = {'json': JSON, 'msgpack': MSGPACK, 'arrow': ARROW}
+# Outros nomes usados para os mesmos formatos no Accept
+_ALIASES = {'application/x-msgpack': MSGPACK, 'application/vnd.msgpack': MSGPACK}
+
+_META_PAYLOAD = b'techhelp.payload'
+
+
+def import_pyarrow():
+    """Importa pyarrow sob demanda (dependência opcional)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        return pa
+    except ImportError:
+        return None
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def available(mime: str) -> bool:
+    """Formato disponível neste ambiente (bibliotecas opcionais instaladas)"""
+    if mime == MSGPACK:
+        return _import_msgpack() is not None
+    if mime == ARROW:
+        return import_pyarrow() is not None
+    return mime == JSON
+
+
+def json_default(value: Any) -> Any:
+    """Serializa tipos numpy/pandas/datetime presentes no payload"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # numpy scalar (ex.: value_counts().to_dict() devolve numpy.int64)
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def negotiate(accept: Optional[str], format_param: Optional[str] = None) -> str:
+    """
+    Formato da resposta
+
+    Args:
+        accept: Cabeçalho Accept (ex.: 'application/msgpack, application/json;q=0.5')
+        format_param: ?format= (json, msgpack, arrow); tem precedência sobre o Accept
+
+    Raises:
+        ValueError: ?format= desconhecido ou indisponível neste servidor (responder 406)
+    """
+    if format_param:
+        mime = FORMATS.get(format_param.strip().lower())
+        if mime is None:
+            raise ValueError(f"Formato inválido: '{format_param}' (use {', '.join(FORMATS)})")
+        if not available(mime):
+            raise ValueError(f"Formato indisponível neste servidor: '{format_param}'")
+        return mime
+
+    best, best_q = JSON, 0.0
+    for part in (accept or '').split(','):
+        media, *params = [p.strip() for p in part.split(';')]
+        media = _ALIASES.get(media.lower(), media.lower())
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # JSON vence empates e curingas (*/*, application/*)
+        if media in (MSGPACK, ARROW) and q > best_q and available(media):
+            best, best_q = media, q
+        elif media in (JSON, '*/*', 'application/*') and q >= best_q:
+            best, best_q = JSON, q
+    return best
+
+
+# ------------------------------------------------------------------- colunas
+def _iso_strings(series) -> List[Optional[str]]:
+    """Datas em ISO (segundos); datetime_as_string é vetorizado, dt.strftime formata linha a linha"""
+    import numpy as np
+
+    if getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_convert(None)
+    text = np.datetime_as_string(series.to_numpy(dtype='datetime64[s]'), unit='s').astype(object)
+    text[series.isna().to_numpy()] = None
+    return text.tolist()
+
+
+def dataframe_columns(df) -> Dict[str, List[Any]]:
+    """{coluna: valores} de um DataFrame (datas em ISO, ausentes como None)"""
+    import pandas as pd
+
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            columns[str(name)] = _iso_strings(series)
+        else:
+            columns[str(name)] = series.astype(object).where(series.notna(), None).tolist()
+    return columns
+
+
+def row_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """{coluna: valores} de uma lista de registros (colunas na ordem de aparição)"""
+    names: Dict[str, None] = {}
+    for row in rows:
+        for name in row:
+            names.setdefault(name)
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def select_columns(df, spec: Optional[str]):
+    """Colunas pedidas em ?colunas=a,b (todas se vazio)"""
+    if not spec:
+        return df
+    names = [name.strip() for name in spec.split(',') if name.strip()]
+    unknown = [name for name in names if name not in df.columns]
+    if unknown:
+        raise ValueError(f"Coluna inválida: {', '.join(unknown)}")
+    return df[names]
+
+
+def export_payload(df, response_format: str) -> Tuple[Dict[str, Any], Any]:
+    """
+    (corpo, dataset) da exportação do DataFrame
+
+    JSON/MessagePack: {'total', 'colunas', 'exportado_em', 'dados': {coluna: valores}};
+    Arrow: o DataFrame é o corpo e o restante vai nos metadados.
+    """
+    meta = {'total': len(df), 'colunas': [str(c) for c in df.columns], 'exportado_em': datetime.now().isoformat()}
+    if response_format == ARROW:
+        return meta, df
+    return dict(meta, dados=dataframe_columns(df)), None
+
+
+def to_arrow_table(pa, dataset: Any):
+    """Converte DataFrame ou lista de dicts em tabela Arrow"""
+    if dataset is None:
+        return pa.table({})
+
+    if isinstance(dataset, list):
+        try:
+            return pa.Table.from_pylist(dataset)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Coluna com tipos mistos (ex.: id numérico e texto): essa coluna vira texto
+            arrays = {}
+            for name, values in row_columns(dataset).items():
+                try:
+                    arrays[name] = pa.array(values)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    arrays[name] = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+            return pa.table(arrays)
+
+    try:
+        return pa.Table.from_pandas(dataset, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Colunas object com tipos mistos: grava como texto
+        df = dataset.copy()
+        for col in df.select_dtypes(include=['object']).columns:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# ------------------------------------------------------------------- encoders
+def _arrow_stream(table, metadata: Dict[str, Any] = None) -> bytes:
+    pa = import_pyarrow()
+    if metadata:
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[_META_PAYLOAD] = json.dumps(metadata, default=json_default, ensure_ascii=False).encode('utf-8')
+        table = table.replace_schema_metadata(schema_metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _split_table(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """(linhas tabulares, restante) de um payload ou delta (?since=)"""
+    rest = dict(data)
+    tabela = rest.pop('tabela', None)
+    if isinstance(tabela, dict):
+        # Delta: as linhas inseridas vão no corpo; removidas e ordem nos metadados
+        rest['tabela'] = {k: v for k, v in tabela.items() if k != 'inserted'}
+        return tabela.get('inserted') or [], rest
+    return tabela or [], rest
+
+
+def encode(data: Any, mime: str, dataset: Any = None) -> bytes:
+    """
+    Codifica a resposta em MessagePack ou Arrow IPC
+
+    Args:
+        data: Payload (dict)
+        mime: MSGPACK ou ARROW
+        dataset: Para ARROW, DataFrame/lista de registros do corpo; sem ele, usa data['tabela']
+                 e o restante de `data` vai nos metadados
+    """
+    if mime == MSGPACK:
+        msgpack = _import_msgpack()
+        return msgpack.packb(data, default=json_default, use_bin_type=True)
+    if mime == ARROW:
+        pa = import_pyarrow()
+        if dataset is None:
+            rows, metadata = _split_table(data)
+            return _arrow_stream(to_arrow_table(pa, rows), metadata)
+        return _arrow_stream(to_arrow_table(pa, dataset), data)
+    raise ValueError(f"Formato sem codificador binário: '{mime}'")
@@ -4,18 +4,261 @@ Responsável por autenticar e buscar dados da planilha de chamados
 Suporta:
  - Google Sheets (nativo) via gspread
  - Arquivos Excel (.xlsx/.xls) armazenados no Google Drive via Drive API
+ - Pastas de trabalho com várias abas (ex.: uma por mês): get_workbook_data lê
+   todas as abas (ou as que casam com um padrão) e, no Excel, interpreta e
+   normaliza cada aba em um pool de processos
 """
 import os
+import fnmatch
+import tempfile
 import json
-import gspread
+import numpy as np
 import pandas as pd
 import io
+import time
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from google.oauth2.service_account import Credentials
-from typing import Dict, Any, List
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import unicodedata
+from typing import Dict, Any, List, Optional, Tuple
+from column_schema import apply_column_schema, normalize_column_name
+from normalization import normalize_chamados, normalize_duracao
+from instrumentation import phase, record_rows
+from status_map import status_counts, status_kpis
+
+
+# MIME types tratados como planilha
+GOOGLE_SHEETS_MIME = 'application/vnd.google-apps.spreadsheet'
+EXCEL_MIME_TYPES = [
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel'
+]
+
+# Campos pedidos ao Drive (modifiedTime/md5Checksum identificam a versão do arquivo)
+DRIVE_METADATA_FIELDS = 'id, name, mimeType, modifiedTime, md5Checksum, size'
+
+# Escopo necessário para ler planilhas
+GOOGLE_SCOPES = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive.readonly'
+]
+
+# Renova o token de acesso quando faltar menos que isso para expirar (segundos)
+TOKEN_REFRESH_MARGIN = int(os.getenv('GOOGLE_TOKEN_REFRESH_MARGIN', 300))
+
+# Sessões autenticadas compartilhadas pelo processo: {chave das credenciais: _GoogleSession}
+_SESSIONS: Dict[str, '_GoogleSession'] = {}
+_SESSIONS_LOCK = threading.Lock()
+_SESSION_STATS = {
+    'sessions_created': 0,
+    'session_cache_hits': 0,
+    'last_session_init_ms': None,
+    'last_client_init_ms': None
+}
+
+# Colunas de data convertidas nas planilhas
+SHEET_DATE_COLUMNS = ['data_abertura', 'data_fechamento']
+
+# Processos para interpretar abas do Excel (padrão: núcleos disponíveis; 1 = sem pool)
+WORKSHEET_WORKERS = int(os.getenv('WORKSHEET_WORKERS', 0)) or os.cpu_count() or 1
+
+# Documento de discovery do Drive v3 (carregado uma única vez por processo)
+_DRIVE_DISCOVERY_DOC: Optional[Dict[str, Any]] = None
+
+
+def _load_drive_discovery_document() -> Optional[Dict[str, Any]]:
+    """
+    Carrega o discovery document estático do Drive v3 distribuído com o
+    google-api-python-client, sem acesso à rede. Retorna None se a versão
+    instalada não trouxer os documentos estáticos.
+    """
+    global _DRIVE_DISCOVERY_DOC
+    if _DRIVE_DISCOVERY_DOC is None:
+        try:
+            from googleapiclient.discovery_cache import get_static_doc
+            content = get_static_doc('drive', 'v3')
+        except ImportError:
+            content = None
+        if content:
+            _DRIVE_DISCOVERY_DOC = json.loads(content)
+    return _DRIVE_DISCOVERY_DOC
+
+
+class _GoogleSession:
+    """
+    Credenciais e clientes Google compartilhados por todas as integrações do processo
+
+    Os clientes (gspread e Drive) são criados somente no primeiro uso. O serviço
+    do Drive é mantido por thread, pois o httplib2 não é thread-safe.
+    As bibliotecas Google (gspread, googleapiclient) também só são importadas
+    no primeiro uso.
+    """
+
+    def __init__(self, creds):
+        self.creds = creds
+        self._gc = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def ensure_fresh_token(self):
+        """Renova o token de acesso antes de expirar (evita 401 no meio de uma leitura)"""
+        expiry = self.creds.expiry
+        if self.creds.token and expiry is not None:
+            if (expiry - datetime.utcnow()).total_seconds() > TOKEN_REFRESH_MARGIN:
+                return
+
+        with self._lock:
+            expiry = self.creds.expiry
+            if self.creds.token and expiry is not None and \
+                    (expiry - datetime.utcnow()).total_seconds() > TOKEN_REFRESH_MARGIN:
+                return
+            from google.auth.transport.requests import Request
+            self.creds.refresh(Request())
+
+    @property
+    def gc(self):
+        """Cliente gspread (criado no primeiro uso)"""
+        if self._gc is None:
+            with self._lock:
+                if self._gc is None:
+                    import gspread
+                    self._gc = gspread.authorize(self.creds)
+        return self._gc
+
+    @property
+    def drive_service(self):
+        """Serviço do Google Drive da thread atual (criado no primeiro uso)"""
+        service = getattr(self._local, 'drive_service', None)
+        if service is None:
+            from googleapiclient.discovery import build, build_from_document
+
+            start = time.perf_counter()
+            document = _load_drive_discovery_document()
+            if document is not None:
+                service = build_from_document(document, credentials=self.creds)
+            else:
+                service = build('drive', 'v3', credentials=self.creds, cache_discovery=False)
+            self._local.drive_service = service
+            _SESSION_STATS['last_client_init_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return service
+
+
+def _credentials_cache_key(credentials_path: str) -> str:
+    """Identifica as credenciais (arquivo + data de modificação, ou hash do JSON do ambiente)"""
+    if credentials_path and os.path.exists(credentials_path):
+        return f"file:{os.path.abspath(credentials_path)}:{os.path.getmtime(credentials_path)}"
+    creds_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_JSON', '')
+    return f"env:{hashlib.sha256(creds_json.encode('utf-8')).hexdigest()}"
+
+
+def _load_credentials(credentials_path: str):
+    """Carrega as credenciais da Service Account (arquivo JSON ou variável de ambiente)"""
+    from google.oauth2.service_account import Credentials
+
+    # Carrega credenciais do arquivo JSON
+    if credentials_path and os.path.exists(credentials_path):
+        return Credentials.from_service_account_file(credentials_path, scopes=GOOGLE_SCOPES)
+
+    # Para deploy, tenta carregar de variável de ambiente
+    creds_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_JSON')
+    if creds_json:
+        return Credentials.from_service_account_info(json.loads(creds_json), scopes=GOOGLE_SCOPES)
+
+    raise Exception("Credenciais do Google não encontradas")
+
+
+def get_google_session(credentials_path: str) -> _GoogleSession:
+    """Retorna a sessão Google do processo para as credenciais, criando-a se necessário"""
+    key = _credentials_cache_key(credentials_path)
+    session = _SESSIONS.get(key)
+    if session is not None:
+        _SESSION_STATS['session_cache_hits'] += 1
+        return session
+
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            start = time.perf_counter()
+            session = _GoogleSession(_load_credentials(credentials_path))
+            _SESSIONS[key] = session
+            _SESSION_STATS['sessions_created'] += 1
+            _SESSION_STATS['last_session_init_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return session
+
+
+def get_session_stats() -> Dict[str, Any]:
+    """Estatísticas do cache de sessões Google (para diagnóstico)"""
+    return dict(_SESSION_STATS, sessions_cached=len(_SESSIONS))
+
+
+def clear_google_sessions():
+    """Descarta as sessões em cache (ex.: após rotação das credenciais)"""
+    with _SESSIONS_LOCK:
+        _SESSIONS.clear()
+
+
+def select_worksheets(names: List[str], pattern: str = None) -> List[str]:
+    """
+    Abas que casam com `pattern` (glob, vários separados por vírgula), na ordem do arquivo
+
+    Ex.: '*' ou None = todas; '2024-*'; 'Jan*,Fev*'
+    """
+    patterns = [p.strip() for p in (pattern or '*').split(',') if p.strip()] or ['*']
+    return [name for name in names if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+
+
+def normalize_worksheet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Schema padrão e tipos de uma aba (mesma conversão de _convert_data_types)
+
+    A unidade do TMA (minutos ou horas) não é decidida aqui: uma aba sozinha pode
+    ter mediana abaixo do limite. concat_worksheets detecta uma vez no conjunto.
+    """
+    df = apply_column_schema(df.dropna(how='all'))
+    # Coluna vinda da planilha (não derivada de tma_minutos, que já sai em horas)
+    native_tempo = 'tempo_resolucao' in df.columns
+    df = normalize_chamados(df, date_columns=SHEET_DATE_COLUMNS, detect_minutes=False)
+    df.attrs['tempo_resolucao_planilha'] = native_tempo
+    return df
+
+
+def _parse_excel_worksheet(path: str, sheet_name: str) -> pd.DataFrame:
+    """Lê e normaliza uma aba do Excel (executado nos processos do pool)"""
+    return normalize_worksheet(pd.read_excel(path, sheet_name=sheet_name, engine='openpyxl'))
+
+
+def concat_worksheets(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena abas já normalizadas mantendo os tipos
+
+    Colunas ausentes em uma aba viram nulos; colunas categóricas que o pandas
+    converteria para object voltam a categóricas, com a união das categorias de
+    todas as abas. O TMA em minutos é detectado uma vez, na coluna concatenada
+    (mesma regra de normalize_duracao), e convertido para horas em todas as abas.
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    categories: Dict[str, set] = {}
+    for frame in frames:
+        for col, dtype in frame.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories.setdefault(col, set()).update(dtype.categories)
+    native_tempo = np.concatenate([
+        np.full(len(frame), frame.attrs.get('tempo_resolucao_planilha', False)) for frame in frames
+    ])
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    df.attrs = {}
+    for col, values in categories.items():
+        dtype = pd.CategoricalDtype(sorted(values))
+        if df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    if 'tempo_resolucao' in df.columns and native_tempo.any():
+        df.loc[native_tempo, 'tempo_resolucao'] = normalize_duracao(
+            df.loc[native_tempo, 'tempo_resolucao'], detect_minutes=True
+        )
+    return df
 
 
 class GoogleSheetsIntegration:
@@ -31,69 +274,69 @@ class GoogleSheetsIntegration:
         """
         self.sheets_id = sheets_id
         self.credentials_path = credentials_path
-        self.gc = None
-        self.drive_service = None
-        self.creds = None
+        self._session: Optional[_GoogleSession] = None
         self.worksheet = None
+        # Cache de metadados do Drive: {file_id: (timestamp, metadados)}
+        self.metadata_ttl = int(os.getenv('DRIVE_METADATA_TTL', 300))
+        self._metadata_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Último arquivo baixado: (file_id, versão, bytes) - evita baixar o mesmo Excel duas vezes
+        self._download_cache: Optional[Tuple[str, str, bytes]] = None
+
+        start = time.perf_counter()
         self._authenticate()
+        # Tempo de construção (com sessão em cache deve ficar abaixo de 1 ms)
+        self.init_ms = round((time.perf_counter() - start) * 1000, 3)
     
     def _authenticate(self):
-        """Autentica com Google APIs (Sheets e Drive) usando Service Account"""
+        """
+        Obtém a sessão autenticada (Service Account) compartilhada pelo processo
+
+        Credenciais são carregadas uma vez por processo; os clientes gspread e
+        Drive só são criados no primeiro uso (propriedades `gc` e `drive_service`).
+        """
         try:
-            # Escopo necessário para ler planilhas
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive.readonly'
-            ]
-            
-            # Carrega credenciais do arquivo JSON
-            if os.path.exists(self.credentials_path):
-                creds = Credentials.from_service_account_file(
-                    self.credentials_path, 
-                    scopes=scope
-                )
-            else:
-                # Para deploy, tenta carregar de variável de ambiente
-                creds_json = os.getenv('GOOGLE_APPLICATION_CREDENTIALS_JSON')
-                if creds_json:
-                    creds_info = json.loads(creds_json)
-                    creds = Credentials.from_service_account_info(
-                        creds_info, 
-                        scopes=scope
-                    )
-                else:
-                    raise Exception("Credenciais do Google não encontradas")
-            
-            # Autoriza cliente gspread
-            self.creds = creds
-            self.gc = gspread.authorize(creds)
-            # Cria serviço do Google Drive para baixar arquivos Excel
-            self.drive_service = build('drive', 'v3', credentials=creds)
-            print("✅ Autenticação com Google APIs (Sheets/Drive) realizada com sucesso")
-            
+            self._session = get_google_session(self.credentials_path)
         except Exception as e:
             print(f"❌ Erro na autenticação: {str(e)}")
             raise
+
+    @property
+    def creds(self):
+        """Credenciais da Service Account"""
+        return self._session.creds if self._session else None
+
+    @property
+    def gc(self):
+        """Cliente gspread com token válido"""
+        self._session.ensure_fresh_token()
+        return self._session.gc
+
+    @property
+    def drive_service(self):
+        """Serviço do Google Drive com token válido"""
+        self._session.ensure_fresh_token()
+        return self._session.drive_service
     
-    def get_spreadsheet_data(self, worksheet_name: str = None) -> pd.DataFrame:
+    def get_spreadsheet_data(self, worksheet_name: str = None, file_id: str = None) -> pd.DataFrame:
         """
         Busca dados da planilha e retorna como DataFrame
         
         Args:
             worksheet_name: Nome da aba (se None, usa a primeira aba)
+            file_id: Outro arquivo do Drive lido com a mesma sessão (padrão: sheets_id)
             
         Returns:
             DataFrame com os dados da planilha
         """
+        file_id = file_id or self.sheets_id
         try:
             # Identifica o tipo do arquivo no Drive
-            file_meta = self._get_drive_file_metadata(self.sheets_id)
+            file_meta = self._get_drive_file_metadata(file_id)
             mime_type = file_meta.get('mimeType', '')
-            file_name = file_meta.get('name', self.sheets_id)
 
             # Se for um Google Sheets (mime type do Google Sheets), usa gspread
-            if mime_type == 'application/vnd.google-apps.spreadsheet':
-                spreadsheet = self.gc.open_by_key(self.sheets_id)
+            if mime_type == GOOGLE_SHEETS_MIME:
+                spreadsheet = self.gc.open_by_key(file_id)
                 # Seleciona a primeira aba se não especificada
                 if worksheet_name:
                     worksheet = spreadsheet.worksheet(worksheet_name)
@@ -101,7 +344,8 @@ class GoogleSheetsIntegration:
                     worksheet = spreadsheet.sheet1
 
                 # Obtém todos os valores
-                data = worksheet.get_all_values()
+                with phase('sheets_fetch'):
+                    data = worksheet.get_all_values()
 
                 if not data:
                     raise Exception("Planilha vazia ou não encontrada")
@@ -110,17 +354,17 @@ class GoogleSheetsIntegration:
                 df = pd.DataFrame(data[1:], columns=data[0])
                 # Remove linhas vazias
                 df = df.dropna(how='all')
+                record_rows(len(df), source='google_sheets')
                 print(f"✅ Dados (Google Sheets) carregados: {len(df)} registros encontrados")
                 return df
 
             # Caso contrário, tenta baixar como Excel via Drive API
-            if mime_type in [
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'application/vnd.ms-excel'
-            ] or file_name.lower().endswith(('.xlsx', '.xls')):
-                bytes_io = self._download_drive_file(self.sheets_id)
+            if self._is_excel(file_meta):
+                with phase('drive_download'):
+                    bytes_io = self._download_drive_file_cached(file_id, file_meta)
                 # Lê a primeira aba (ou específica) com pandas
-                df = pd.read_excel(bytes_io, sheet_name=worksheet_name if worksheet_name else 0, engine='openpyxl')
+                with phase('excel_parse'):
+                    df = pd.read_excel(bytes_io, sheet_name=worksheet_name if worksheet_name else 0, engine='openpyxl')
 
                 # Se o arquivo tiver múltiplas abas e pandas retornar dict, pega a primeira
                 if isinstance(df, dict):
@@ -129,11 +373,12 @@ class GoogleSheetsIntegration:
 
                 # Remove linhas totalmente vazias
                 df = df.dropna(how='all')
+                record_rows(len(df), source='drive_excel')
                 print(f"✅ Dados (Excel via Drive) carregados: {len(df)} registros encontrados")
                 return df
 
             # Se tipo desconhecido, tenta fallback para Google Sheets por gspread
-            spreadsheet = self.gc.open_by_key(self.sheets_id)
+            spreadsheet = self.gc.open_by_key(file_id)
             worksheet = spreadsheet.sheet1
             data = worksheet.get_all_values()
             if not data:
@@ -147,23 +392,164 @@ class GoogleSheetsIntegration:
             print(f"❌ Erro ao carregar dados: {str(e)}")
             raise
 
-    def _get_drive_file_metadata(self, file_id: str) -> Dict[str, Any]:
-        """Obtém metadados (mimeType, name) de um arquivo no Drive"""
+    def get_workbook_data(self, pattern: str = None, file_id: str = None,
+                          max_workers: int = None) -> pd.DataFrame:
+        """
+        Lê várias abas e retorna um único DataFrame já mapeado e normalizado
+
+        No Excel, cada aba é interpretada (openpyxl), mapeada e convertida em um
+        processo do pool; no Google Sheets as abas vêm em uma única chamada
+        (values_batch_get) e são normalizadas aqui. O DataFrame retornado não deve
+        passar de novo por _convert_data_types.
+
+        Args:
+            pattern: Abas a ler (ver select_worksheets; None = todas)
+            file_id: Arquivo do Drive (padrão: sheets_id)
+            max_workers: Processos do pool (padrão: WORKSHEET_WORKERS)
+
+        Returns:
+            DataFrame com as abas concatenadas; attrs['abas'] = {aba: registros}
+        """
+        file_id = file_id or self.sheets_id
+        file_meta = self._get_drive_file_metadata(file_id)
+
+        if file_meta.get('mimeType', '') == GOOGLE_SHEETS_MIME:
+            spreadsheet = self.gc.open_by_key(file_id)
+            names = select_worksheets([ws.title for ws in spreadsheet.worksheets()], pattern)
+            if not names:
+                raise Exception(f"Nenhuma aba corresponde a '{pattern}'")
+            with phase('sheets_fetch'):
+                ranges = [f"'{name}'" for name in names]
+                value_ranges = spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+            with phase('normalize'):
+                frames = []
+                for value_range in value_ranges:
+                    values = value_range.get('values', [])
+                    frames.append(normalize_worksheet(pd.DataFrame(values[1:], columns=values[0])) if values else pd.DataFrame())
+            record_rows(sum(len(f) for f in frames), source='google_sheets')
+        elif self._is_excel(file_meta):
+            with phase('drive_download'):
+                content = self._download_drive_file_cached(file_id, file_meta).getvalue()
+            names, frames = self._parse_excel_workbook(content, pattern, max_workers)
+            record_rows(sum(len(f) for f in frames), source='drive_excel')
+        else:
+            raise Exception(f"Arquivo não suportado para leitura de várias abas: {file_meta.get('mimeType')}")
+
+        df = concat_worksheets(frames)
+        df.attrs['abas'] = {name: len(frame) for name, frame in zip(names, frames)}
+        print(f"✅ {len(names)} abas carregadas: {len(df)} registros encontrados")
+        return df
+
+    @staticmethod
+    def _parse_excel_workbook(content: bytes, pattern: str = None,
+                              max_workers: int = None) -> Tuple[List[str], List[pd.DataFrame]]:
+        """Interpreta as abas selecionadas do Excel em paralelo (um processo por aba)"""
+        from openpyxl import load_workbook
+
+        # Os processos leem o arquivo do disco (evita copiar os bytes para cada aba)
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp:
+            tmp.write(content)
+            path = tmp.name
         try:
-            if not self.drive_service:
+            workbook = load_workbook(path, read_only=True)
+            try:
+                names = select_worksheets(workbook.sheetnames, pattern)
+            finally:
+                workbook.close()
+            if not names:
+                raise Exception(f"Nenhuma aba corresponde a '{pattern}'")
+
+            workers = min(max_workers or WORKSHEET_WORKERS, len(names))
+            with phase('excel_parse'):
+                if workers <= 1:
+                    frames = [_parse_excel_worksheet(path, name) for name in names]
+                else:
+                    # spawn: seguro mesmo chamado de threads (sync multi-fonte, servidor)
+                    context = multiprocessing.get_context('spawn')
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                        frames = list(pool.map(_parse_excel_worksheet, [path] * len(names), names))
+        finally:
+            os.unlink(path)
+        return names, frames
+
+    def _get_drive_file_metadata(self, file_id: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Obtém metadados (mimeType, name, modifiedTime, md5Checksum) de um arquivo no Drive
+
+        Os metadados ficam em cache por `metadata_ttl` segundos (DRIVE_METADATA_TTL),
+        para que diagnóstico e leitura não repitam a mesma chamada ao Drive.
+
+        Args:
+            file_id: ID do arquivo no Drive
+            use_cache: Se False, ignora o cache e consulta o Drive
+        """
+        if use_cache:
+            cached = self._metadata_cache.get(file_id)
+            if cached and (time.monotonic() - cached[0]) < self.metadata_ttl:
+                return cached[1]
+
+        try:
+            if not self._session:
                 raise Exception("Serviço do Google Drive não inicializado")
-            meta = self.drive_service.files().get(fileId=file_id, fields='id, name, mimeType').execute()
+            with phase('drive_metadata'):
+                meta = self.drive_service.files().get(fileId=file_id, fields=DRIVE_METADATA_FIELDS).execute()
+            self._metadata_cache[file_id] = (time.monotonic(), meta)
             return meta
         except Exception as e:
             print(f"⚠️ Não foi possível obter metadados do arquivo Drive: {str(e)}")
             # Continua com tentativa de leitura via gspread como fallback
             return {}
 
+    def get_file_version(self, file_id: str = None) -> Optional[str]:
+        """
+        Versão atual do arquivo no Drive (md5Checksum ou modifiedTime), sem cache
+
+        Uma chamada leve de metadados: permite saber se a planilha mudou sem
+        baixá-la. None se o Drive não informar (ou falhar).
+        """
+        meta = self._get_drive_file_metadata(file_id or self.sheets_id, use_cache=False)
+        return meta.get('md5Checksum') or meta.get('modifiedTime')
+
+    def invalidate_metadata_cache(self, file_id: str = None):
+        """Descarta metadados em cache (de um arquivo ou de todos)"""
+        if file_id is None:
+            self._metadata_cache.clear()
+        else:
+            self._metadata_cache.pop(file_id, None)
+
+    @staticmethod
+    def _is_excel(file_meta: Dict[str, Any]) -> bool:
+        """Indica se os metadados correspondem a um arquivo Excel"""
+        return (
+            file_meta.get('mimeType', '') in EXCEL_MIME_TYPES
+            or (file_meta.get('name') or '').lower().endswith(('.xlsx', '.xls'))
+        )
+
+    def _download_drive_file_cached(self, file_id: str, file_meta: Dict[str, Any]) -> io.BytesIO:
+        """
+        Baixa um arquivo do Drive reaproveitando o último download se o arquivo não mudou
+
+        A versão é identificada por md5Checksum (ou modifiedTime); sem essas
+        informações o arquivo é sempre baixado novamente.
+        """
+        version = file_meta.get('md5Checksum') or file_meta.get('modifiedTime')
+        if version and self._download_cache:
+            cached_id, cached_version, content = self._download_cache
+            if cached_id == file_id and cached_version == version:
+                return io.BytesIO(content)
+
+        bytes_io = self._download_drive_file(file_id)
+        if version:
+            self._download_cache = (file_id, version, bytes_io.getvalue())
+        return bytes_io
+
     def _download_drive_file(self, file_id: str) -> io.BytesIO:
         """Baixa um arquivo do Google Drive e retorna como BytesIO"""
         try:
-            if not self.drive_service:
+            if not self._session:
                 raise Exception("Serviço do Google Drive não inicializado")
+            from googleapiclient.http import MediaIoBaseDownload
+
             request = self.drive_service.files().get_media(fileId=file_id)
             fh = io.BytesIO()
             downloader = MediaIoBaseDownload(fh, request)
@@ -189,51 +575,17 @@ class GoogleSheetsIntegration:
             # Carrega dados da planilha
             df = self.get_spreadsheet_data()
             
-            # Normaliza nomes das colunas: minúsculas, sem acentos, underscores
-            df.columns = [self._normalize_column_name(col) for col in df.columns]
-            
-            # Mapeia possíveis variações de nomes de colunas (já normalizados)
-            # Ex.: "Agente Responsável" -> agente_responsavel; "Satisfação do Cliente" -> satisfacao_do_cliente
-            column_mapping = {
-                'id_chamado': [
-                    'id_chamado', 'id', 'chamado_id', 'numero', 'id_do_chamado'
-                ],
-                'data_abertura': [
-                    'data_abertura', 'abertura', 'data_inicio', 'data_de_abertura'
-                ],
-                'data_fechamento': [
-                    'data_fechamento', 'fechamento', 'data_fim', 'data_de_fechamento'
-                ],
-                'tecnico': [
-                    'tecnico', 'responsavel', 'atendente', 'agente_responsavel'
-                ],
-                'categoria': [
-                    'categoria', 'tipo', 'classificacao', 'motivo'
-                ],
-                'status': [
-                    'status', 'situacao', 'estado'
-                ],
-                # tempo_resolucao será derivado de 'tma_minutos' se existir
-                'tempo_resolucao': [
-                    'tempo_resolucao', 'tempo', 'duracao', 'tma_minutos'
-                ],
-                'satisfacao': [
-                    'satisfacao', 'nota', 'avaliacao', 'satisfacao_do_cliente'
-                ]
-            }
-            
-            # Renomeia colunas para padrão
-            for standard_name, variations in column_mapping.items():
-                for var in variations:
-                    if var in df.columns:
-                        df = df.rename(columns={var: standard_name})
-                        break
-            
-            # Converte dados para tipos apropriados
-            df = self._convert_data_types(df)
+            # Normaliza e mapeia colunas para o padrão (schema compartilhado)
+            # Ex.: "Agente Responsável" -> tecnico; "Satisfação do Cliente" -> satisfacao
+            with phase('normalize'):
+                df = apply_column_schema(df)
+                
+                # Converte dados para tipos apropriados
+                df = self._convert_data_types(df)
             
             # Calcula métricas
-            metrics = self._calculate_metrics(df)
+            with phase('compute_metrics'):
+                metrics = self._calculate_metrics(df)
             
             return metrics
             
@@ -248,12 +600,15 @@ class GoogleSheetsIntegration:
             'credentials_path': self.credentials_path,
             'credentials_exists': os.path.exists(self.credentials_path) if self.credentials_path else False,
             'service_account_email': getattr(self.creds, 'service_account_email', None),
+            'client_init_ms': getattr(self, 'init_ms', None),
+            'session_cache': get_session_stats(),
             'drive_access': {'ok': False},
             'file': {},
             'headers': [],
             'sample_rows': 0
         }
 
+        meta: Dict[str, Any] = {}
         try:
             meta = self._get_drive_file_metadata(self.sheets_id)
             if meta:
@@ -263,67 +618,78 @@ class GoogleSheetsIntegration:
         except Exception as e:
             diag['file_error'] = str(e)
 
-        # Tenta ler somente cabeçalhos sem processar tudo
+        # Lê somente os cabeçalhos e as primeiras linhas, sem processar tudo
         try:
-            file_meta = diag.get('file', {})
-            mime = file_meta.get('mimeType') or ''
-            # Excel no Drive
-            if mime in [
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'application/vnd.ms-excel'
-            ] or (file_meta.get('name') or '').lower().endswith(('.xlsx', '.xls')):
-                bytes_io = self._download_drive_file(self.sheets_id)
-                excel = pd.read_excel(bytes_io, sheet_name=0, nrows=5, engine='openpyxl')
-                excel.columns = [self._normalize_column_name(c) for c in excel.columns]
-                diag['headers'] = list(excel.columns)
-                diag['sample_rows'] = len(excel)
-                diag['drive_access']['ok'] = True
-            else:
-                # Tenta como Google Sheets
-                ss = self.gc.open_by_key(self.sheets_id)
-                ws = ss.sheet1
-                values = ws.get_all_values()
-                if values:
-                    headers = [self._normalize_column_name(h) for h in values[0]]
-                    diag['headers'] = headers
-                    diag['sample_rows'] = min(5, max(0, len(values) - 1))
-                diag['drive_access']['ok'] = True
+            probe = self.get_header_probe(n_rows=5, file_meta=meta if meta else {})
+            diag['headers'] = [self._normalize_column_name(h) for h in probe['headers']]
+            diag['sample_rows'] = len(probe['rows'])
+            diag['drive_access']['ok'] = True
         except Exception as e:
             diag['drive_access'] = {'ok': False, 'error': str(e)}
 
         return diag
     
+    def get_header_probe(self, n_rows: int = 5, file_meta: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Lê apenas o cabeçalho e as primeiras linhas da planilha
+
+        - Google Sheets: leitura por intervalo (linhas 1..n_rows+1), sem baixar a aba inteira
+        - Excel: leitura em streaming (openpyxl read_only) que para após n_rows linhas
+
+        Args:
+            n_rows: Quantidade de linhas de dados após o cabeçalho
+            file_meta: Metadados já obtidos (se None, usa o cache de metadados)
+
+        Returns:
+            Dicionário com 'headers' (brutos), 'rows' e 'source'
+        """
+        if file_meta is None:
+            file_meta = self._get_drive_file_metadata(self.sheets_id)
+
+        if self._is_excel(file_meta):
+            bytes_io = self._download_drive_file_cached(self.sheets_id, file_meta)
+            values = self._read_excel_head(bytes_io, n_rows + 1)
+            source = 'excel'
+        else:
+            worksheet = self.gc.open_by_key(self.sheets_id).sheet1
+            values = worksheet.get_values(f'1:{n_rows + 1}')
+            source = 'sheets'
+
+        if not values:
+            return {'headers': [], 'rows': [], 'source': source}
+
+        return {'headers': list(values[0]), 'rows': values[1:], 'source': source}
+
+    @staticmethod
+    def _read_excel_head(bytes_io: io.BytesIO, max_rows: int) -> List[List[Any]]:
+        """Lê as primeiras `max_rows` linhas da primeira aba de um Excel sem carregar a aba inteira"""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(bytes_io, read_only=True, data_only=True)
+        try:
+            worksheet = workbook.worksheets[0]
+            rows = [
+                ['' if value is None else value for value in row]
+                for row in worksheet.iter_rows(max_row=max_rows, values_only=True)
+            ]
+        finally:
+            workbook.close()
+
+        # Descarta linhas totalmente vazias no fim da amostra
+        while rows and all(value == '' for value in rows[-1]):
+            rows.pop()
+        return rows
+
     def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Converte colunas para tipos de dados apropriados"""
         try:
-            # Converte datas
-            if 'data_abertura' in df.columns:
-                df['data_abertura'] = pd.to_datetime(df['data_abertura'], errors='coerce')
-            
-            if 'data_fechamento' in df.columns:
-                df['data_fechamento'] = pd.to_datetime(df['data_fechamento'], errors='coerce')
-            
-            # Converte satisfação para numérico se for possível
-            if 'satisfacao' in df.columns:
-                # Tenta mapear classificações textuais para escala 1-5
-                satisf_map = {
-                    'ruim': 1, 'regular': 2, 'medio': 3, 'médio': 3,
-                    'bom': 4, 'otimo': 5, 'ótimo': 5, 'excelente': 5
-                }
-                df['satisfacao'] = df['satisfacao'].apply(lambda x: satisf_map.get(str(x).strip().lower(), x))
-                df['satisfacao'] = pd.to_numeric(df['satisfacao'], errors='coerce')
-            
-            # Converte tempo de resolução (se vier em minutos por TMA)
-            if 'tempo_resolucao' in df.columns:
-                df['tempo_resolucao'] = pd.to_numeric(df['tempo_resolucao'], errors='coerce')
-            else:
-                # Se existir TMA em minutos (normalizado como tma_minutos)
-                if 'tma_minutos' in df.columns:
-                    df['tma_minutos'] = pd.to_numeric(df['tma_minutos'], errors='coerce')
-                    # Deriva tempo_resolucao em horas a partir de minutos
-                    df['tempo_resolucao'] = df['tma_minutos'] / 60.0
-            
-            return df
+            # Datas, satisfação, status e tempo de resolução (normalizados por valor distinto).
+            # Planilhas costumam trazer TMA em minutos: detecta e converte para horas.
+            return normalize_chamados(
+                df,
+                date_columns=SHEET_DATE_COLUMNS,
+                detect_minutes=True
+            )
             
         except Exception as e:
             print(f"⚠️ Aviso na conversão de tipos: {str(e)}")
@@ -335,11 +701,11 @@ class GoogleSheetsIntegration:
             # KPIs básicos
             total_chamados = len(df)
             
-            # Filtra por status se a coluna existir
+            # Abertos/fechados: contagem por código de status canônico
             if 'status' in df.columns:
-                df['status'] = df['status'].str.lower().str.strip()
-                total_abertos = len(df[df['status'].isin(['aberto', 'em andamento', 'pendente'])])
-                total_fechados = len(df[df['status'].isin(['fechado', 'resolvido', 'concluido'])])
+                status_totals = status_kpis(status_counts(df['status']))
+                total_abertos = status_totals['total_abertos']
+                total_fechados = status_totals['total_fechados']
             else:
                 total_abertos = total_chamados // 3  # Estimativa se não houver coluna status
                 total_fechados = total_chamados - total_abertos
@@ -462,19 +828,7 @@ class GoogleSheetsIntegration:
 
     def _normalize_column_name(self, text: str) -> str:
         """Normaliza nomes de colunas: minúsculas, sem acentos, underscores, sem pontuação"""
-        if not isinstance(text, str):
-            text = str(text)
-        # remove acentos/diacríticos
-        nfkd = unicodedata.normalize('NFKD', text)
-        no_accents = ''.join([c for c in nfkd if not unicodedata.category(c) == 'Mn'])
-        # para segurança, remove caracteres não alfanuméricos (exceto underscore)
-        base = no_accents.strip().lower().replace('ç', 'c')
-        # substitui qualquer caractere não [a-z0-9] por underscore
-        import re
-        cleaned = re.sub(r'[^a-z0-9]+', '_', base)
-        # remove underscores duplicados e bordas
-        cleaned = re.sub(r'_+', '_', cleaned).strip('_')
-        return cleaned
+        return normalize_column_name(text)
 
 
 def create_google_sheets_client():
@@ -1,16 +1,133 @@
 """
 TechHelp Dashboard API - Versão Serverless para Vercel
 """
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from snapshot import load_snapshot, write_snapshot_async
+from delta import VersionHistory
+from instrumentation import init_app as init_instrumentation, phase, record_cache, record_rows
+from status_map import count_status, status_kpis
+from fingerprint import FINGERPRINT_COLUMN, FINGERPRINT_ORDER, dataset_fingerprint
+from formats import FORMATS, JSON, negotiate
+from payload import SECTIONS, assemble_sections, fetch_sections, parse_fields, parse_sections, project_payload, section_key
+
 app = Flask(__name__)
 CORS(app)
+init_instrumentation(app, service='index')
+
+# Cache simples (CACHE_TIMEOUT=0 desativa)
+CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 300))
+# fp: impressão do dataset (total + max(updated_at)); vencido com a mesma impressão, o cache é renovado
+_cache = {'data': None, 'ts': None, 'fp': None, 'snapshot_restored': False}
+# Seções de ?sections=/?fields= calculadas sem o payload completo, válidas para a impressão 'fp'
+_sections = {'valores': {}, 'ts': None, 'fp': None}
+# Reconexão do stream SSE (ms): cada conexão responde uma vez e o navegador volta após esse tempo
+STREAM_RETRY_MS = int(os.getenv('STREAM_RETRY_MS', 30000))
+# Últimas versões do payload (?since=<versao> responde só o que mudou)
+_versions = VersionHistory()
+
+
+def _restore_from_snapshot():
+    """Instância nova: serve o último snapshot em disco até a primeira reconstrução"""
+    if _cache['snapshot_restored']:
+        return
+    _cache['snapshot_restored'] = True
+    if _cache['data'] is None:
+        snapshot = load_snapshot()
+        if snapshot is not None:
+            _cache['data'] = snapshot.payload
+            _versions.record(_cache['data'])
+            _cache['ts'] = snapshot.created_at_datetime
+            _cache['fp'] = snapshot.fingerprint
+
+
+def _fingerprint(client):
+    """Impressão atual do dataset numa consulta de uma linha (None se indisponível)"""
+    try:
+        res = client.table('chamados').select(FINGERPRINT_COLUMN, count='exact').order(FINGERPRINT_ORDER).limit(1).execute()
+    except Exception:
+        return None
+    return dataset_fingerprint(res.count, res.data)
+
+
+def _versioned(data):
+    since = request.args.get('since')
+    if since is None or _versions.current is None:
+        return data
+    return _versions.since(since)
+
 
-# Cache simples
-_cache = {'data': None, 'ts': None}
+def _cache_fresh(now):
+    """Payload em cache dentro do CACHE_TIMEOUT (processo novo começa pelo snapshot em disco)"""
+    _restore_from_snapshot()
+    return bool(_cache['data'] and _cache['ts']) and (now - _cache['ts']).total_seconds() < CACHE_TIMEOUT
+
+
+def _get_sections(url, key, sections, fields):
+    """
+    Seções pedidas sem o payload completo (como get_sections em app.py)
+
+    Com a impressão igual à do payload em cache, recorta dele; senão calcula só as
+    seções que faltam, buscando só as colunas que elas leem (payload.fetch_sections).
+
+    Raises:
+        ValueError: campo inexistente em ?fields=
+    """
+    from supabase import create_client
+    client = create_client(url, key)
+    now = datetime.now()
+    if not _sections['ts'] or (now - _sections['ts']).total_seconds() >= CACHE_TIMEOUT:
+        with phase('fingerprint_check'):
+            fingerprint = _fingerprint(client)
+        if CACHE_TIMEOUT > 0 and fingerprint is not None and fingerprint == _cache['fp'] and _cache['data']:
+            # Dados iguais aos do cache: renova sem buscar as linhas
+            _cache['ts'] = now
+            record_cache(True)
+            return project_payload(_cache['data'], sections, fields)
+        if fingerprint is None or fingerprint != _sections['fp']:
+            _sections['valores'] = {}
+        _sections.update(ts=now if fingerprint is not None and CACHE_TIMEOUT > 0 else None, fp=fingerprint)
+    values, missing = {}, []
+    for section in sections:
+        value = _sections['valores'].get(section_key(section, fields))
+        if value is not None:
+            values[section] = value
+        else:
+            missing.append(section)
+    record_cache(not missing)
+    if missing:
+        computed = fetch_sections(client, missing, fields, table_limit=100)
+        if _sections['ts']:
+            _sections['valores'].update((section_key(s, fields), value) for s, value in computed.items())
+        values.update(computed)
+    return assemble_sections(values, sections, 'Supabase')
+
+
+def _requested(data, sections, fields):
+    """Seções/campos de ?sections=/?fields= recortados do payload completo, ou o payload versionado"""
+    if sections or fields:
+        return project_payload(data, sections, fields)
+    return _versioned(data)
+
+
+def _data_response(data, response_format=JSON):
+    """Resposta no formato negociado (JSON, MessagePack ou Arrow IPC), como data_response em app.py"""
+    name = next(key for key, mime in FORMATS.items() if mime == response_format)
+    with phase(f'{name}_encode'):
+        if response_format == JSON:
+            response = jsonify(data)
+        else:
+            # msgpack/pyarrow só são importados quando pedidos (cold start)
+            from formats import encode
+            response = Response(encode(data, response_format), mimetype=response_format)
+    response.headers['Vary'] = 'Accept'
+    return response
 
 
 @app.route('/')
@@ -20,7 +137,7 @@ def home():
         'name': 'TechHelp Dashboard API',
         'version': '2.0',
         'status': 'online',
-        'endpoints': ['/api/health', '/api/test', '/api/chamados']
+        'endpoints': ['/api/health', '/api/test', '/api/chamados', '/api/chamados/stream', '/api/metrics']
     })
 
 
@@ -75,62 +192,67 @@ def test():
     return jsonify(result)
 
 
-@app.route('/api/chamados')
-def get_chamados():
-    """Dados dos chamados"""
+def _load_payload(url, key):
+    """
+    Payload completo: cache válido, cache renovado pela impressão do dataset ou
+    reconstruído do Supabase
+
+    Returns:
+        (payload, aviso): com o Supabase indisponível, o último payload em cache e
+        o aviso de dados desatualizados; payload None se a tabela estiver vazia
+    """
+    # Cache (5min)
+    now = datetime.now()
+    if _cache_fresh(now):
+        record_cache(True)
+        return _cache['data'], None
+    
+    # Busca dados
     try:
-        # Verifica env
-        url = os.getenv('SUPABASE_URL')
-        key = os.getenv('SUPABASE_KEY')
-        
-        if not url or not key:
-            return jsonify({
-                'error': True,
-                'message': 'Variáveis não configuradas'
-            }), 500
-        
-        # Cache (5min)
-        now = datetime.now()
-        if _cache['data'] and _cache['ts']:
-            if (now - _cache['ts']).seconds < 300:
-                return jsonify(_cache['data'])
-        
-        # Busca dados
         from supabase import create_client
         client = create_client(url, key)
-        response = client.table('chamados').select('*').execute()
+        with phase('fingerprint_check'):
+            fingerprint = _fingerprint(client)
+        if CACHE_TIMEOUT > 0 and fingerprint is not None and fingerprint == _cache['fp'] and _cache['data']:
+            # Dados iguais aos do cache: renova sem buscar as linhas
+            _cache['ts'] = now
+            record_cache(True)
+            return _cache['data'], None
+        record_cache(False)
+        with phase('supabase_fetch'):
+            response = client.table('chamados').select('*').execute()
         data = response.data
-        
-        if not data:
-            return jsonify({
-                'error': True,
-                'message': 'Nenhum dado encontrado na tabela'
-            }), 404
-        
+        record_rows(len(data), source='supabase')
+    except Exception:
+        # Supabase indisponível: serve o último payload (cache ou snapshot)
+        if _cache['data']:
+            return _cache['data'], 'Dados podem estar desatualizados devido a erro na atualização'
+        raise
+    
+    if not data:
+        return None, None
+    
+    with phase('compute_metrics'):
         # Processa
         total = len(data)
-        
-        # Status
-        status = {}
-        for r in data:
-            s = str(r.get('status', '')).lower().strip()
-            status[s] = status.get(s, 0) + 1
-        
-        abertos = sum(status.get(k, 0) for k in ['aberto', 'em andamento', 'pendente'])
-        fechados = sum(status.get(k, 0) for k in ['fechado', 'resolvido', 'concluído', 'concluido'])
-        
+    
+        # Status (canônico, contado por valor distinto)
+        status = status_kpis(count_status(r.get('status') for r in data))
+        abertos = status['total_abertos']
+        fechados = status['total_fechados']
+    
         # Técnicos
         tecnicos = {}
         for r in data:
             t = r.get('tecnico') or 'N/A'
             tecnicos[t] = tecnicos.get(t, 0) + 1
-        
+    
         # Categorias
         cats = {}
         for r in data:
             c = r.get('categoria') or 'N/A'
             cats[c] = cats.get(c, 0) + 1
-        
+    
         # Resultado
         result = {
             'total_chamados': total,
@@ -148,12 +270,69 @@ def get_chamados():
             'ultima_atualizacao': now.strftime('%d/%m/%Y %H:%M'),
             'fonte': 'Supabase'
         }
+    
+    # Cache (e snapshot para instâncias novas, normalizado e gravado fora da requisição)
+    _versions.record(result)
+    _cache['data'] = result
+    _cache['ts'] = now
+    _cache['fp'] = fingerprint
+    write_snapshot_async(result, data, fingerprint=fingerprint)
+    return result, None
+
+
+@app.route('/api/chamados')
+def get_chamados():
+    """Dados dos chamados (?format=json|msgpack|arrow ou Accept; ?sections=, ?fields=)"""
+    try:
+        response_format = negotiate(request.headers.get('Accept'), request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 406
+    
+    try:
+        sections = parse_sections(request.args.get('sections'))
+        fields = parse_fields(request.args.get('fields'))
+        if (sections or fields) and request.args.get('since') is not None:
+            raise ValueError("'since' não pode ser combinado com 'sections' ou 'fields'")
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
+    
+    try:
+        # Verifica env
+        url = os.getenv('SUPABASE_URL')
+        key = os.getenv('SUPABASE_KEY')
         
-        # Cache
-        _cache['data'] = result
-        _cache['ts'] = now
+        if not url or not key:
+            return jsonify({
+                'error': True,
+                'message': 'Variáveis não configuradas'
+            }), 500
         
-        return jsonify(result)
+        if (sections or fields) and not _cache_fresh(datetime.now()):
+            # Só ?fields=: todas as seções, com a tabela limitada aos campos pedidos
+            try:
+                return _data_response(_get_sections(url, key, sections or list(SECTIONS), fields), response_format)
+            except ValueError as e:
+                return jsonify({'error': True, 'message': str(e)}), 400
+            except Exception:
+                # Supabase indisponível: recorta o último payload (cache ou snapshot)
+                if not _cache['data']:
+                    raise
+                stale = _requested(_cache['data'], sections, fields)
+                stale['warning'] = 'Dados podem estar desatualizados devido a erro na atualização'
+                return _data_response(stale, response_format)
+        
+        data, warning = _load_payload(url, key)
+        if data is None:
+            return jsonify({
+                'error': True,
+                'message': 'Nenhum dado encontrado na tabela'
+            }), 404
+        if warning:
+            stale = _requested(data, sections, fields) if sections or fields else dict(data)
+            stale['warning'] = warning
+            return _data_response(stale, response_format)
+        
+        return _data_response(_requested(data, sections, fields), response_format)
         
     except Exception as e:
         import traceback
@@ -162,3 +341,32 @@ def get_chamados():
             'message': str(e),
             'traceback': traceback.format_exc()
         }), 500
+
+
+@app.route('/api/chamados/stream')
+def chamados_stream():
+    """
+    Payload dos chamados por Server-Sent Events (conexão curta, própria da função serverless)
+
+    Responde a versão atual, se o Last-Event-ID ainda não for ela, e encerra com
+    'retry': o navegador reconecta sozinho após STREAM_RETRY_MS reenviando o id,
+    então só recebe o payload de novo quando os dados mudam.
+    """
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_KEY')
+    if not url or not key:
+        return jsonify({'error': True, 'message': 'Variáveis não configuradas'}), 500
+    
+    try:
+        data, _ = _load_payload(url, key)
+    except Exception as e:
+        # Sem payload: o EventSource fecha e o dashboard volta ao polling
+        return jsonify({'error': True, 'message': str(e)}), 503
+    
+    # stream (asyncio) só é importado quando pedido (cold start)
+    from stream import snapshot_events
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(snapshot_events(data, last_event_id, STREAM_RETRY_MS), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
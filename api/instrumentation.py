@@ -0,0 +1,276 @@
+"""
+Instrumentação leve da API TechHelp Dashboard
+Responsável por:
+ - Medir fases de cada requisição (busca no Supabase, conversão, métricas, JSON)
+ - Enviar as fases no cabeçalho Server-Timing de cada resposta
+ - Manter contadores e histogramas expostos em /api/metrics (formato Prometheus)
+
+Sem dependências externas: pode ser importado no caminho de cold start.
+init_app instrumenta o app Flask; InstrumentationMiddleware, o app ASGI.
+Fora de uma requisição (ex.: script de sync) as fases alimentam apenas os
+histogramas do processo.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Limites dos histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_PHASE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]')
+
+# Fases da requisição atual: lista de (nome, duração em segundos)
+_current_phases: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('techhelp_phases', default=None)
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_histograms: Dict[Tuple[str, Tuple], Dict] = {}
+_help: Dict[str, Tuple[str, str]] = {
+    'techhelp_requests_total': ('counter', 'Requisições atendidas'),
+    'techhelp_request_duration_seconds': ('histogram', 'Latência das requisições'),
+    'techhelp_phase_duration_seconds': ('histogram', 'Duração das fases internas'),
+    'techhelp_response_bytes': ('histogram', 'Tamanho das respostas'),
+    'techhelp_cache_requests_total': ('counter', 'Consultas ao cache de dados por resultado'),
+    'techhelp_rows_fetched_total': ('counter', 'Registros lidos das fontes de dados'),
+}
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def count(name: str, value: float = 1, **labels):
+    """Incrementa um contador"""
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+    """Registra uma observação em um histograma"""
+    key = (name, _label_key(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        index = bisect_left(hist['buckets'], value)
+        if index < len(hist['counts']):
+            hist['counts'][index] += 1
+        hist['sum'] += value
+        hist['count'] += 1
+
+
+def record_cache(hit: bool):
+    """Registra consulta ao cache de dados (hit/miss)"""
+    count('techhelp_cache_requests_total', result='hit' if hit else 'miss')
+
+
+def record_rows(rows: int, source: str):
+    """Registra quantidade de registros lidos de uma fonte"""
+    count('techhelp_rows_fetched_total', rows, source=source)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Mede uma fase (bloco with)
+
+    Exemplo:
+        with phase('supabase_fetch'):
+            response = client.table('chamados').select('*').execute()
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe('techhelp_phase_duration_seconds', elapsed, phase=name)
+        phases = _current_phases.get()
+        if phases is not None:
+            phases.append((name, elapsed))
+
+
+@contextmanager
+def collect_phases():
+    """
+    Coleta as fases medidas dentro do bloco fora de uma requisição (ex.: job em
+    segundo plano); produz a lista (nome, segundos), preenchida à medida que
+    as fases terminam
+    """
+    phases: List[Tuple[str, float]] = []
+    token = _current_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _current_phases.reset(token)
+
+
+def server_timing_header(phases: List[Tuple[str, float]], total: float) -> str:
+    """Monta o valor do cabeçalho Server-Timing (durações em ms)"""
+    parts = [f"{_PHASE_NAME_RE.sub('_', name)};dur={elapsed * 1000:.1f}" for name, elapsed in phases]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ', '.join(parts)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in items) + '}'
+
+
+def render_prometheus() -> str:
+    """Exporta contadores e histogramas no formato texto do Prometheus"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(value, counts=list(value['counts'])) for key, value in _histograms.items()}
+
+    lines: List[str] = []
+    described = set()
+
+    def describe(name: str):
+        if name not in described:
+            described.add(name)
+            kind, text = _help.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), value in sorted(counters.items()):
+        describe(name)
+        lines.append(f'{name}{_format_labels(labels)} {value:g}')
+
+    for (name, labels), hist in sorted(histograms.items(), key=lambda item: item[0]):
+        describe(name)
+        cumulative = 0
+        for bound, bucket_count in zip(hist['buckets'], hist['counts']):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", f"{bound:g}"),))} {cumulative}')
+        lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {hist["count"]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {hist["sum"]:.6f}')
+        lines.append(f'{name}_count{_format_labels(labels)} {hist["count"]}')
+
+    # Taxa de acerto do cache (derivada dos contadores)
+    hits = sum(v for (n, l), v in counters.items() if n == 'techhelp_cache_requests_total' and ('result', 'hit') in l)
+    total = sum(v for (n, l), v in counters.items() if n == 'techhelp_cache_requests_total')
+    lines.append('# HELP techhelp_cache_hit_ratio Fração das consultas ao cache atendidas pelo cache')
+    lines.append('# TYPE techhelp_cache_hit_ratio gauge')
+    lines.append(f'techhelp_cache_hit_ratio {hits / total if total else 0:.4f}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Zera contadores e histogramas (uso em benchmarks)"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def init_app(app, service: str = 'api'):
+    """
+    Instrumenta uma aplicação Flask
+
+    - Mede cada requisição e envia o cabeçalho Server-Timing
+    - Registra latência, status e tamanho da resposta
+    - Adiciona a rota GET /api/metrics (formato Prometheus)
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._techhelp_start = time.perf_counter()
+        _current_phases.set([])
+
+    @app.after_request
+    def _finish_request_timer(response):
+        start = getattr(g, '_techhelp_start', None)
+        if start is None:
+            return response
+
+        total = time.perf_counter() - start
+        phases = _current_phases.get() or []
+        response.headers['Server-Timing'] = server_timing_header(phases, total)
+
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = {'service': service, 'endpoint': endpoint, 'method': request.method}
+        observe('techhelp_request_duration_seconds', total, **labels)
+        count('techhelp_requests_total', status=response.status_code, **labels)
+        if not response.is_streamed and response.content_length is not None:
+            observe('techhelp_response_bytes', response.content_length, buckets=BYTES_BUCKETS,
+                    service=service, endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def _reset_request_phases(exc=None):
+        _current_phases.set(None)
+
+    def metrics():
+        """Métricas da API no formato Prometheus"""
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/api/metrics', 'metrics', metrics)
+    return app
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware ASGI equivalente a init_app (Server-Timing e métricas por requisição)
+
+    A rota /api/metrics do app ASGI usa render_prometheus diretamente.
+    """
+
+    def __init__(self, app, service: str = 'asgi'):
+        self.app = app
+        self.service = service
+        self._route_paths: Dict = {}
+
+    def _endpoint_label(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            routes = getattr(scope.get('app'), 'routes', [])
+            path = next((r.path for r in routes if getattr(r, 'endpoint', None) is endpoint), endpoint.__name__)
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        phases: List[Tuple[str, float]] = []
+        token = _current_phases.set(phases)
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                total = time.perf_counter() - start
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', server_timing_header(phases, total).encode('latin-1')))
+                message = dict(message, headers=headers)
+
+                endpoint = self._endpoint_label(scope)
+                labels = {'service': self.service, 'endpoint': endpoint, 'method': scope['method']}
+                observe('techhelp_request_duration_seconds', total, **labels)
+                count('techhelp_requests_total', status=message['status'], **labels)
+                length = dict(headers).get(b'content-length')
+                if length is not None:
+                    observe('techhelp_response_bytes', int(length), buckets=BYTES_BUCKETS,
+                            service=self.service, endpoint=endpoint)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_phases.reset(token)
@@ -0,0 +1,165 @@
+"""
+Jobs de atualização dos dados (POST /api/chamados/refresh)
+Responsável por:
+ - Rodar a reconstrução do payload em segundo plano e devolver o id do job na hora
+ - Deduplicar: pedidos durante um job em andamento recebem o mesmo job
+ - Registrar estado, etapa atual, fases medidas (instrumentation.phase) e resultado
+ - Guardar os últimos JOB_HISTORY jobs para consulta do status
+
+O cache antigo continua sendo servido durante o job; quem troca o payload é o
+próprio job, de uma vez, ao terminar. Funciona com threads (app Flask) e com
+tarefas asyncio (app ASGI).
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from instrumentation import collect_phases
+
+
+JOB_HISTORY = int(os.getenv('REFRESH_JOB_HISTORY', 20))
+
+# Estados de um job
+QUEUED, RUNNING, DONE, FAILED = 'na_fila', 'executando', 'concluido', 'erro'
+
+# target(progress) → resumo do resultado; progress('etapa') informa a etapa atual
+Target = Callable[[Callable[[str], None]], Dict[str, Any]]
+AsyncTarget = Callable[[Callable[[str], None]], Awaitable[Dict[str, Any]]]
+
+
+class RefreshJobs:
+    """
+    Jobs de atualização com no máximo um em execução por processo
+
+    Exemplo:
+        job, created = jobs.submit(lambda progress: rebuild(progress))
+        jobs.get(job['id'])   # status, etapa, fases_ms, resultado
+    """
+
+    def __init__(self, history: int = JOB_HISTORY):
+        self.history = max(history, 1)
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._running: Optional[str] = None
+        self._lock = threading.Lock()
+        # Referência às tarefas asyncio em andamento (o loop guarda só referência fraca)
+        self._tasks = set()
+
+    def _create(self) -> Dict[str, Any]:
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'status': QUEUED,
+            'etapa': None,
+            'criado_em': datetime.now().isoformat(),
+            'iniciado_em': None,
+            'concluido_em': None,
+            'duracao_ms': None,
+            'pedidos': 1,
+            'fases': [],
+            'resultado': None,
+            'erro': None
+        }
+        self._jobs[job['id']] = job
+        self._running = job['id']
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+        return job
+
+    def _join_or_create(self) -> Tuple[Dict[str, Any], bool]:
+        with self._lock:
+            if self._running is not None:
+                job = self._jobs[self._running]
+                job['pedidos'] += 1
+                return job, False
+            return self._create(), True
+
+    def _start(self, job: Dict[str, Any]):
+        job['status'] = RUNNING
+        job['iniciado_em'] = datetime.now().isoformat()
+
+    def _finish(self, job: Dict[str, Any], start: float, result: Dict[str, Any] = None, error: Exception = None):
+        job['duracao_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        job['concluido_em'] = datetime.now().isoformat()
+        job['etapa'] = None
+        if error is None:
+            job['status'] = DONE
+            job['resultado'] = result
+        else:
+            job['status'] = FAILED
+            job['erro'] = str(error) or type(error).__name__
+            print(f"❌ Job de atualização {job['id']} falhou: {job['erro']}")
+        with self._lock:
+            if self._running == job['id']:
+                self._running = None
+
+    def _progress(self, job: Dict[str, Any]) -> Callable[[str], None]:
+        def progress(step: str):
+            job['etapa'] = step
+        return progress
+
+    def submit(self, target: Target) -> Tuple[Dict[str, Any], bool]:
+        """Inicia o job em uma thread (ou junta-se ao job em andamento); retorna (status, criado)"""
+        job, created = self._join_or_create()
+        if created:
+            thread = threading.Thread(target=self._run, args=(job, target), name=f"refresh-{job['id']}", daemon=True)
+            thread.start()
+        return self.status(job), created
+
+    def _run(self, job: Dict[str, Any], target: Target):
+        start = time.perf_counter()
+        self._start(job)
+        with collect_phases() as phases:
+            job['fases'] = phases
+            try:
+                result = target(self._progress(job))
+            except Exception as e:
+                self._finish(job, start, error=e)
+            else:
+                self._finish(job, start, result)
+
+    def submit_async(self, target: AsyncTarget) -> Tuple[Dict[str, Any], bool]:
+        """Como submit, mas o job é uma tarefa no event loop atual (app ASGI)"""
+        job, created = self._join_or_create()
+        if created:
+            task = asyncio.ensure_future(self._run_async(job, target))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self.status(job), created
+
+    async def _run_async(self, job: Dict[str, Any], target: AsyncTarget):
+        start = time.perf_counter()
+        self._start(job)
+        with collect_phases() as phases:
+            job['fases'] = phases
+            try:
+                result = await target(self._progress(job))
+            except asyncio.CancelledError as e:
+                # Encerramento do servidor: libera o slot e propaga o cancelamento
+                self._finish(job, start, error=e)
+                raise
+            except Exception as e:
+                self._finish(job, start, error=e)
+            else:
+                self._finish(job, start, result)
+
+    def status(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Cópia do job para a resposta JSON (fases em ms)"""
+        data = dict(job)
+        data['fases_ms'] = {}
+        for name, elapsed in list(job['fases']):
+            data['fases_ms'][name] = round(data['fases_ms'].get(name, 0) + elapsed * 1000, 1)
+        del data['fases']
+        return data
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return self.status(job) if job is not None else None
+
+    @property
+    def running(self) -> Optional[Dict[str, Any]]:
+        job_id = self._running
+        return self.get(job_id) if job_id else None
@@ -0,0 +1,337 @@
+"""
+Normalização de valores dos chamados para TechHelp Dashboard
+Responsável por:
+ - Satisfação textual → numérica (escala 1-5)
+ - Status → rótulo padronizado para exibição (normalize_status); normalize_chamados
+   mantém o texto original da coluna, que só é canonicalizado nos KPIs (status_map)
+ - Datas DD/MM/YYYY ou ISO (formato detectado uma vez por coluna)
+ - Tempo de resolução em horas (detecta planilhas em minutos)
+ - Limpeza de texto (espaços nas pontas e marcadores de vazio → nulo)
+
+Colunas de chamados têm poucos valores distintos: cada função normaliza
+apenas os valores únicos (pd.factorize) e propaga o resultado para as
+linhas pelos códigos, em vez de um apply por linha.
+
+Compartilhado por GoogleSheetsIntegration, SupabaseIntegration e
+sync_drive_to_supabase.
+"""
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# STATUS_MAP e STATUS_INDEFINIDO continuam disponíveis por aqui
+from status_map import STATUS_INDEFINIDO, STATUS_MAP, status_label  # noqa: F401
+
+
+# Classificações textuais de satisfação → escala 1-5
+SATISFACAO_MAP = {
+    'pessimo': 1, 'péssimo': 1, 'ruim': 1,
+    'regular': 2,
+    'medio': 3, 'médio': 3,
+    'bom': 4,
+    'otimo': 5, 'ótimo': 5, 'excelente': 5
+}
+
+DATE_COLUMNS = ['data_abertura', 'data_fechamento', 'created_at', 'updated_at']
+
+# Formatos de data aceitos (o primeiro que interpretar a amostra é usado na coluna inteira)
+_DMY_FORMATS = ['%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S']
+_DATE_SAMPLE_SIZE = 50
+# Fração da amostra que pode ser inválida sem invalidar o formato detectado
+_DATE_MAX_INVALID_SHARE = 0.1
+
+# Textos tratados como vazio depois do strip (viram nulo)
+TEXT_NULL_MARKERS = ['', 'nan', 'NaN', 'None', 'null']
+
+# Mediana acima disso indica tempo em minutos (TMA), não em horas
+MINUTES_MEDIAN_THRESHOLD = 100
+
+
+def _factorize(series: pd.Series):
+    """Códigos por linha (-1 para nulos) e valores únicos"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, uniques
+
+
+def _broadcast(mapped, codes: np.ndarray, index: pd.Index, name: Any) -> pd.Series:
+    """Propaga os valores normalizados dos únicos para todas as linhas (nulo onde código = -1)"""
+    mapped = pd.Index(mapped)
+    values = mapped.take(codes, allow_fill=True, fill_value=mapped._na_value)
+    return pd.Series(values, index=index, name=name)
+
+
+def map_unique(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """
+    Aplica `func` uma vez por valor distinto (não nulo) e propaga para as linhas
+
+    Args:
+        series: Série original
+        func: Função escalar aplicada a cada valor único
+
+    Returns:
+        Série com o resultado (nulos permanecem nulos)
+    """
+    codes, uniques = _factorize(series)
+    mapped = [func(value) for value in uniques]
+    return _broadcast(pd.Index(mapped, dtype=object).infer_objects(), codes, series.index, series.name)
+
+
+def clean_text_column(series: pd.Series) -> Tuple[Optional[pd.Series], int]:
+    """
+    Remove espaços nas pontas e troca marcadores de vazio (TEXT_NULL_MARKERS) por nulo
+
+    Só valores str são alterados (números, datas e nulos ficam como estão).
+    Colunas 'str' (Arrow) usam as operações vetorizadas da coluna inteira;
+    colunas object trabalham só nos valores distintos.
+
+    Returns:
+        (série limpa, células alteradas); (None, 0) se nada mudaria
+    """
+    if pd.api.types.is_string_dtype(series.dtype) and series.dtype != object:
+        stripped = series.str.strip()
+        is_marker = stripped.isin(TEXT_NULL_MARKERS)
+        changed = int((((stripped != series) & series.notna()) | is_marker).sum())
+        if not changed:
+            return None, 0
+        return stripped.mask(is_marker), changed
+
+    if series.dtype != object:
+        return None, 0
+    codes, uniques = _factorize(series)
+    values = pd.Series(np.asarray(uniques, dtype=object))
+    try:
+        stripped = values.str.strip()
+    except AttributeError:
+        # Coluna object sem nenhum texto
+        return None, 0
+
+    is_text = stripped.notna().to_numpy()
+    is_marker = stripped.isin(TEXT_NULL_MARKERS).to_numpy()
+    changed = is_text & (is_marker | (stripped.to_numpy() != values.to_numpy()))
+    if not changed.any():
+        return None, 0
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    cleaned = values.to_numpy(copy=True)
+    cleaned[is_text] = stripped.to_numpy()[is_text]
+    cleaned[is_marker] = None
+    return _broadcast(pd.Index(cleaned, dtype=object), codes, series.index, series.name), int(counts[changed].sum())
+
+
+def clean_text_columns(df: pd.DataFrame, inplace: bool = False) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Limpa as colunas de texto e remove linhas totalmente vazias
+
+    Colunas sem nada a limpar não são copiadas; as limpas substituem a coluna
+    (com copy-on-write, o DataFrame de entrada não é alterado se inplace=False).
+
+    Returns:
+        (DataFrame limpo, {'cells_changed', 'rows_dropped', 'columns_changed'})
+    """
+    if not inplace:
+        df = df.copy(deep=False)
+
+    cells_changed = 0
+    columns_changed = 0
+    empty_rows = None
+    for col in df.columns:
+        cleaned, changed = clean_text_column(df[col])
+        if cleaned is not None:
+            df[col] = cleaned
+            cells_changed += changed
+            columns_changed += 1
+        # Linhas vazias: acumula coluna a coluna e para quando nenhuma sobrar
+        if empty_rows is None or empty_rows.any():
+            col_empty = df[col].isna().to_numpy()
+            empty_rows = col_empty if empty_rows is None else empty_rows & col_empty
+
+    rows_dropped = int(empty_rows.sum()) if empty_rows is not None else 0
+    if rows_dropped:
+        if inplace:
+            df.drop(index=df.index[empty_rows], inplace=True)
+        else:
+            df = df[~empty_rows]
+
+    return df, {'cells_changed': cells_changed, 'rows_dropped': rows_dropped, 'columns_changed': columns_changed}
+
+
+def _satisfacao_value(value: Any) -> float:
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in SATISFACAO_MAP:
+            return float(SATISFACAO_MAP[text])
+        try:
+            return float(text.replace(',', '.'))
+        except ValueError:
+            return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def normalize_satisfacao(series: pd.Series) -> pd.Series:
+    """Converte satisfação (texto ou número) para a escala numérica 1-5"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    codes, uniques = _factorize(series)
+    mapped = np.array([_satisfacao_value(value) for value in uniques], dtype=float)
+    return _broadcast(mapped, codes, series.index, series.name)
+
+
+def standardize_status_value(status: Any) -> str:
+    """Padroniza um valor de status (rótulos de STATUS_MAP; desconhecidos em Title Case)"""
+    return status_label(status)
+
+
+def normalize_status(series: pd.Series) -> pd.Series:
+    """Padroniza status por valor distinto (nulos viram 'Indefinido'); retorna série categórica"""
+    codes, uniques = _factorize(series)
+    labels = [standardize_status_value(value) for value in uniques] + [STATUS_INDEFINIDO]
+    label_codes, categories = pd.factorize(np.array(labels, dtype=object))
+    # Código -1 (nulo) aponta para o último rótulo: 'Indefinido'
+    row_codes = label_codes[codes]
+    return pd.Series(
+        pd.Categorical.from_codes(row_codes, categories=categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def _is_unparseable(values: List[str]) -> bool:
+    """True se nenhum dos valores é data em qualquer formato (lixo, dia inexistente)"""
+    if not values:
+        return True
+    return pd.to_datetime(values, errors='coerce', format='mixed', dayfirst=True).isna().all()
+
+
+def detect_date_format(values: Iterable[str]) -> Optional[str]:
+    """
+    Detecta o formato de data de uma amostra de strings
+
+    Valores isolados inválidos (ex.: '31/02/2024', 'sem data') não impedem a
+    detecção: o formato é aceito se o resto da amostra o segue e os que falham
+    não são datas em nenhum formato (viram NaT).
+
+    Returns:
+        Formato strftime para DD/MM/YYYY, 'ISO8601' para datas ISO,
+        'mixed' se a amostra não seguir um formato único, ou None se vazia
+    """
+    stripped = (v.strip() for v in values if isinstance(v, str))
+    sample = list(islice((v for v in stripped if v), _DATE_SAMPLE_SIZE))
+    if not sample:
+        return None
+
+    max_invalid = int(len(sample) * _DATE_MAX_INVALID_SHARE)
+    for fmt in ['ISO8601'] + _DMY_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce')
+        failed = [v for v, ok in zip(sample, parsed.notna()) if not ok]
+        if len(failed) <= max_invalid and (not failed or _is_unparseable(failed)):
+            return fmt
+
+    return 'mixed'
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas, interpretando cada valor distinto uma única vez
+
+    Strings DD/MM/YYYY são lidas como dia/mês (padrão das planilhas); o formato
+    é detectado uma vez por coluna. Valores inválidos viram NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = _factorize(series)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, name=series.name, dtype='datetime64[ns]')
+
+    unique_values = np.asarray(uniques, dtype=object)
+    if all(isinstance(v, str) for v in unique_values):
+        stripped = [v.strip() for v in unique_values]
+        try:
+            fmt = detect_date_format(unique_values)
+            if fmt == 'mixed':
+                parsed = pd.to_datetime(stripped, errors='coerce', format='mixed', dayfirst=True)
+            else:
+                parsed = pd.to_datetime(stripped, errors='coerce', format=fmt)
+        except (ValueError, TypeError):
+            # Fusos diferentes na mesma coluna: só convertem juntos via UTC
+            parsed = pd.to_datetime(stripped, errors='coerce', dayfirst=True, utc=True)
+    else:
+        parsed = pd.to_datetime(unique_values, errors='coerce')
+    if getattr(parsed, 'tz', None) is not None:
+        # Sempre sem fuso (horário UTC), como as demais colunas e fontes: concat não vira object
+        parsed = parsed.tz_convert(None)
+
+    return _broadcast(parsed, codes, series.index, series.name)
+
+
+def _weighted_median(values: np.ndarray, counts: np.ndarray) -> float:
+    """Mediana das linhas a partir dos valores únicos e de quantas vezes aparecem"""
+    valid = ~np.isnan(values) & (counts > 0)
+    values, counts = values[valid], counts[valid]
+    if len(values) == 0:
+        return np.nan
+    order = np.argsort(values)
+    values, cumulative = values[order], np.cumsum(counts[order])
+    total = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return (lower + upper) / 2.0
+
+
+def normalize_duracao(series: pd.Series, detect_minutes: bool = False) -> pd.Series:
+    """
+    Converte tempo de resolução para número (horas)
+
+    Args:
+        series: Coluna de tempo de resolução
+        detect_minutes: Se True e a mediana passar de MINUTES_MEDIAN_THRESHOLD,
+            assume que os valores estão em minutos (TMA) e converte para horas
+    """
+    codes, uniques = _factorize(series)
+    numeric = pd.to_numeric(pd.Series(np.asarray(uniques, dtype=object)), errors='coerce').to_numpy(dtype=float)
+
+    if detect_minutes and len(numeric):
+        counts = np.bincount(codes[codes >= 0], minlength=len(numeric))
+        if _weighted_median(numeric, counts) > MINUTES_MEDIAN_THRESHOLD:
+            print("⚠️ Convertendo tempo_resolucao de minutos para horas")
+            numeric = numeric / 60.0
+
+    return _broadcast(numeric, codes, series.index, series.name)
+
+
+def normalize_chamados(df: pd.DataFrame, date_columns: Iterable[str] = None,
+                       detect_minutes: bool = False) -> pd.DataFrame:
+    """
+    Normaliza as colunas conhecidas de um DataFrame de chamados (já com schema padrão)
+
+    Args:
+        df: DataFrame com colunas no padrão do banco
+        date_columns: Colunas de data a converter (padrão: DATE_COLUMNS)
+        detect_minutes: Repassado para normalize_duracao
+
+    Returns:
+        O mesmo DataFrame com colunas convertidas
+    """
+    for col in (DATE_COLUMNS if date_columns is None else date_columns):
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+
+    if 'satisfacao' in df.columns:
+        df['satisfacao'] = normalize_satisfacao(df['satisfacao'])
+
+    # status fica como veio da fonte (nulo continua nulo): KPIs, cubo e ranking
+    # canonicalizam na leitura (status_map.status_codes/count_status)
+
+    if 'tempo_resolucao' in df.columns:
+        df['tempo_resolucao'] = normalize_duracao(df['tempo_resolucao'], detect_minutes=detect_minutes)
+    elif 'tma_minutos' in df.columns:
+        # TMA em minutos → tempo_resolucao em horas
+        df['tma_minutos'] = normalize_duracao(df['tma_minutos'])
+        df['tempo_resolucao'] = df['tma_minutos'] / 60.0
+
+    return df
@@ -0,0 +1,234 @@
+"""
+Payload do dashboard a partir das linhas cruas do Supabase (Python puro)
+Responsável por:
+ - Contar status (canônico), técnicos e categorias em uma passada
+ - Montar o dicionário servido em /api/chamados pelo caminho simplificado
+ - Seções (?sections=) e campos da tabela (?fields=): calcular só o que foi
+   pedido, a partir só das colunas que cada seção lê (fetch_sections consulta o
+   Supabase pelo cliente supabase-py de app.py e index.py)
+
+Sem pandas: usado no caminho leve de app.py, por index.py e pelo app ASGI (asgi.py).
+"""
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from instrumentation import phase, record_rows
+from status_map import count_status, status_kpis
+
+
+# Seções do payload e as chaves de cada uma
+SECTIONS = {
+    'kpis': ('total_chamados', 'total_abertos', 'total_fechados', 'tempo_medio_resolucao'),
+    'tecnicos': ('chamados_por_tecnico',),
+    'categorias': ('categorias',),
+    'insights': ('insights',),
+    'tabela': ('tabela',),
+}
+# Colunas da tabela chamados lidas por seção (tabela: as de ?fields=, ou todas)
+SECTION_COLUMNS = {
+    'kpis': ('status',),
+    'tecnicos': ('tecnico',),
+    'categorias': ('categoria',),
+    'insights': ('tecnico', 'categoria'),
+    'tabela': (),
+}
+# Chaves presentes em toda resposta, com ou sem seções
+META_KEYS = ('versao', 'ultima_atualizacao', 'fonte', 'debug_mode')
+
+_FIELD_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def parse_sections(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Seções de ?sections=kpis,tabela (None = payload completo)
+
+    Raises:
+        ValueError: seção desconhecida
+    """
+    if value is None:
+        return None
+    sections = list(dict.fromkeys(s.strip() for s in value.split(',') if s.strip()))
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown or not sections:
+        raise ValueError(f"Seção inválida: '{value}' (use {', '.join(SECTIONS)})")
+    return sections
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Colunas das linhas de 'tabela' em ?fields=id_chamado,status (None = todas)"""
+    if value is None:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    invalid = [f for f in fields if not _FIELD_RE.match(f)]
+    if invalid or not fields:
+        raise ValueError(f"Campo inválido: '{value}' (nomes de coluna separados por vírgula)")
+    return fields
+
+
+def section_key(section: str, fields: Optional[List[str]] = None) -> str:
+    """Chave de cache da seção (a tabela varia com os campos)"""
+    if section == 'tabela' and fields:
+        return f"tabela:{','.join(fields)}"
+    return section
+
+
+def section_columns(sections: Iterable[str]) -> List[str]:
+    """Colunas a buscar para calcular as seções agregadas (todas menos tabela)"""
+    return list(dict.fromkeys(c for s in sections for c in SECTION_COLUMNS[s]))
+
+
+def project_rows(rows: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if not fields:
+        return rows
+    return [{f: row[f] for f in fields if f in row} for row in rows]
+
+
+def build_sections(rows: List[Dict[str, Any]], sections: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Seções agregadas pedidas ({seção: {chave: valor}}), sem calcular as demais
+
+    Args:
+        rows: Linhas com (pelo menos) as colunas de section_columns(sections)
+        sections: Seções entre kpis, tecnicos, categorias e insights
+    """
+    sections = set(sections)
+    result: Dict[str, Dict[str, Any]] = {}
+    if 'kpis' in sections:
+        result['kpis'] = dict(
+            total_chamados=len(rows),
+            **status_kpis(count_status(row.get('status') for row in rows)),
+            tempo_medio_resolucao='N/A'
+        )
+    tecnico_counts = categoria_counts = None
+    if sections & {'tecnicos', 'insights'}:
+        tecnico_counts = dict(Counter(row.get('tecnico', 'N/A') for row in rows))
+    if sections & {'categorias', 'insights'}:
+        categoria_counts = dict(Counter(row.get('categoria', 'N/A') for row in rows))
+    if 'tecnicos' in sections:
+        result['tecnicos'] = {'chamados_por_tecnico': tecnico_counts}
+    if 'categorias' in sections:
+        result['categorias'] = {'categorias': categoria_counts}
+    if 'insights' in sections:
+        result['insights'] = {'insights': _insights(tecnico_counts, categoria_counts)}
+    return result
+
+
+def table_section(rows: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Seção tabela a partir das primeiras linhas (já limitadas e com só os campos pedidos)"""
+    return {'tabela': project_rows(rows, fields)}
+
+
+def fetch_sections(client, sections: Iterable[str], fields: Optional[List[str]] = None,
+                   table_limit: int = 50) -> Dict[str, Dict[str, Any]]:
+    """
+    Seções pedidas a partir do Supabase, buscando só o que elas leem
+
+    As agregadas saem de uma consulta só com as colunas de section_columns; a
+    tabela, de uma consulta limitada a table_limit linhas e aos campos de ?fields=.
+
+    Args:
+        client: Cliente supabase-py
+        sections: Seções a calcular
+        fields: Campos da tabela (None = todos)
+        table_limit: Quantidade de registros em 'tabela'
+
+    Raises:
+        ValueError: campo inexistente em ?fields=
+    """
+    aggregates = [s for s in sections if s != 'tabela']
+    computed: Dict[str, Dict[str, Any]] = {}
+    if aggregates:
+        with phase('supabase_fetch'):
+            rows = client.table('chamados').select(','.join(section_columns(aggregates))).execute().data
+        record_rows(len(rows), source='supabase')
+        with phase('compute_metrics'):
+            computed.update(build_sections(rows, aggregates))
+    if 'tabela' in sections:
+        try:
+            with phase('supabase_fetch'):
+                table_rows = (client.table('chamados').select(','.join(fields) if fields else '*')
+                              .limit(table_limit).execute().data)
+        except Exception as e:
+            # 42703: coluna inexistente
+            if getattr(e, 'code', None) == '42703':
+                raise ValueError(f"Campo inválido em fields: {str(e)}")
+            raise
+        computed['tabela'] = table_section(table_rows, fields)
+    return computed
+
+
+def assemble_sections(values: Dict[str, Dict[str, Any]], sections: List[str], fonte: str) -> Dict[str, Any]:
+    """Resposta com as seções pedidas, na ordem pedida, e os metadados"""
+    data: Dict[str, Any] = {'secoes': list(sections)}
+    for section in sections:
+        data.update(values[section])
+    data.update(ultima_atualizacao=datetime.now().strftime('%d/%m/%Y %H:%M'), fonte=fonte, debug_mode=True)
+    return data
+
+
+def project_payload(data: Dict[str, Any], sections: Optional[List[str]],
+                    fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Seções/campos pedidos a partir do payload completo já em cache"""
+    sections = sections or list(SECTIONS)
+    projected: Dict[str, Any] = {'secoes': list(sections)}
+    for section in sections:
+        for key in SECTIONS[section]:
+            if key in data:
+                projected[key] = data[key]
+    if 'tabela' in projected:
+        projected['tabela'] = project_rows(projected['tabela'], fields)
+    projected.update((key, data[key]) for key in META_KEYS if key in data)
+    return projected
+
+
+def build_chamados_payload(rows: List[Dict[str, Any]], fonte: str = 'Supabase (modo simplificado)',
+                           table_limit: int = 50) -> Dict[str, Any]:
+    """
+    KPIs, contagens e amostra da tabela
+
+    Args:
+        rows: Registros da tabela chamados (lista de dicts)
+        fonte: Texto do campo 'fonte'
+        table_limit: Quantidade de registros em 'tabela'
+    """
+    return payload_from_counts(
+        len(rows),
+        count_status(row.get('status') for row in rows),
+        Counter(row.get('tecnico', 'N/A') for row in rows),
+        Counter(row.get('categoria', 'N/A') for row in rows),
+        rows[:table_limit],
+        fonte
+    )
+
+
+def payload_from_counts(total: int, status_counts: List[int], tecnico_counts: Dict[str, int],
+                        categoria_counts: Dict[str, int], tabela: List[Dict[str, Any]],
+                        fonte: str) -> Dict[str, Any]:
+    """Payload a partir de contagens já calculadas (mantidas por deltas em changelog.py)"""
+    status_totals = status_kpis(status_counts)
+    tecnico_counts = dict(tecnico_counts)
+    categoria_counts = dict(categoria_counts)
+
+    return {
+        'total_chamados': total,
+        'total_abertos': status_totals['total_abertos'],
+        'total_fechados': status_totals['total_fechados'],
+        'tempo_medio_resolucao': 'N/A',
+        'chamados_por_tecnico': tecnico_counts,
+        'categorias': categoria_counts,
+        'tabela': tabela,
+        'insights': _insights(tecnico_counts, categoria_counts),
+        'ultima_atualizacao': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        'fonte': fonte,
+        'debug_mode': True
+    }
+
+
+def _insights(tecnico_counts: Dict[str, int], categoria_counts: Dict[str, int]) -> Dict[str, str]:
+    return {
+        'melhor_tecnico': f"🏆 {max(tecnico_counts.items(), key=lambda x: x[1])[0] if tecnico_counts else 'N/A'}",
+        'categoria_predominante': f"📊 {max(categoria_counts.items(), key=lambda x: x[1])[0] if categoria_counts else 'N/A'}",
+        'tendencia_satisfacao': 'Dados sendo processados...'
+    }
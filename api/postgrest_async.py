@@ -0,0 +1,124 @@
+"""
+Cliente PostgREST assíncrono (Supabase REST) para o app ASGI
+Responsável por:
+ - Ler a tabela chamados em páginas (cabeçalho Range) buscadas em paralelo
+ - Contar registros (Prefer: count=exact), consultas filtradas e funções RPC
+ - Reaproveitar conexões (um httpx.AsyncClient por event loop)
+
+A primeira página traz o total (Content-Range); as demais são pedidas ao
+mesmo tempo, limitadas por SUPABASE_PAGE_CONCURRENCY.
+
+Configuração (variáveis de ambiente):
+ - SUPABASE_PAGE_SIZE: registros por página (padrão: 1000, limite padrão do Supabase)
+ - SUPABASE_PAGE_CONCURRENCY: páginas simultâneas (padrão: 4)
+ - SUPABASE_TIMEOUT: timeout das requisições em segundos (padrão: 30)
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+PAGE_SIZE = int(os.getenv('SUPABASE_PAGE_SIZE', 1000))
+PAGE_CONCURRENCY = int(os.getenv('SUPABASE_PAGE_CONCURRENCY', 4))
+TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', 30))
+
+
+class PostgrestError(Exception):
+    """Resposta de erro do PostgREST"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"PostgREST {status_code}: {message}")
+        self.status_code = status_code
+
+
+def _parse_content_range(value: Optional[str]) -> Optional[int]:
+    """Total de 'Content-Range: 0-999/12345' (None se desconhecido)"""
+    if not value or '/' not in value:
+        return None
+    total = value.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+class AsyncPostgrest:
+    """Acesso assíncrono ao PostgREST do Supabase"""
+
+    def __init__(self, url: str, key: str, page_size: int = PAGE_SIZE,
+                 concurrency: int = PAGE_CONCURRENCY, timeout: float = TIMEOUT):
+        self.base_url = url.rstrip('/') + '/rest/v1'
+        self.page_size = max(page_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={'apikey': key, 'Authorization': f'Bearer {key}', 'Accept': 'application/json'},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.concurrency * 4, max_keepalive_connections=self.concurrency * 2)
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _get(self, table: str, params: Dict[str, str], headers: Dict[str, str] = None) -> httpx.Response:
+        response = await self.client.get(f'/{table}', params=params, headers=headers or {})
+        if response.status_code >= 400:
+            raise PostgrestError(response.status_code, response.text[:300])
+        return response
+
+    async def select_page(self, table: str, start: int, end: int, select: str = '*',
+                          order: str = None, count: bool = False) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Linhas start..end (inclusive); com count=True, também o total da tabela"""
+        params = {'select': select}
+        if order:
+            params['order'] = order
+        headers = {'Range-Unit': 'items', 'Range': f'{start}-{end}'}
+        if count:
+            headers['Prefer'] = 'count=exact'
+        response = await self._get(table, params, headers)
+        return response.json(), _parse_content_range(response.headers.get('Content-Range'))
+
+    async def select(self, table: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Linhas com filtros e ordem na sintaxe do PostgREST (ex.: {'seq': 'gt.10', 'order': 'seq.asc'})"""
+        response = await self._get(table, params)
+        return response.json()
+
+    async def count(self, table: str) -> int:
+        """Total de registros da tabela"""
+        rows, total = await self.select_page(table, 0, 0, count=True)
+        return total if total is not None else len(rows)
+
+    async def select_all(self, table: str, select: str = '*', order: str = None) -> List[Dict[str, Any]]:
+        """
+        Todos os registros da tabela, em páginas buscadas em paralelo
+
+        Args:
+            table: Nome da tabela
+            select: Colunas (sintaxe do PostgREST)
+            order: Ordenação estável entre páginas (ex.: 'id_chamado.asc')
+        """
+        first, total = await self.select_page(table, 0, self.page_size - 1, select, order, count=True)
+        if total is None or total <= len(first):
+            return first
+
+        # O servidor pode limitar as páginas (max-rows) abaixo de page_size
+        step = len(first) if 0 < len(first) < self.page_size else self.page_size
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def page(start: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                rows, _ = await self.select_page(table, start, start + step - 1, select, order)
+                return rows
+
+        starts = range(len(first), total, step)
+        pages = await asyncio.gather(*(page(start) for start in starts))
+        rows = list(first)
+        for chunk in pages:
+            rows.extend(chunk)
+        return rows
+
+    async def rpc(self, function: str, params: Dict[str, Any] = None) -> Any:
+        """Chama uma função do banco (POST /rpc/<função>)"""
+        response = await self.client.post(f'/rpc/{function}', json=params or {})
+        if response.status_code >= 400:
+            raise PostgrestError(response.status_code, response.text[:300])
+        return response.json()
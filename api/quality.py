@@ -0,0 +1,203 @@
+"""
+Perfil de qualidade dos dados de chamados para TechHelp Dashboard
+Responsável por:
+ - Contar nulos, vazios, cardinalidade e tipo de cada coluna
+ - Detectar linhas duplicadas (chave de hash por linha) e IDs repetidos
+ - Contar datas que não podem ser interpretadas
+ - Calcular o score de qualidade (0-100)
+
+Cada coluna é fatorada uma única vez (pd.factorize) e todas as contagens saem
+dos códigos: nulos (código -1), vazios e falhas de data (avaliados só nos
+valores distintos) e o hash da linha (combinação dos códigos de todas as colunas).
+
+Em DataFrames muito grandes, `sample_size` perfila uma amostra aleatória e
+informa a margem de erro (95%) das porcentagens estimadas.
+"""
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from normalization import DATE_COLUMNS, parse_dates
+
+
+MISSING_THRESHOLD = 30.0  # % de faltantes que gera alerta
+ID_COLUMN = 'id_chamado'
+Z_95 = 1.96
+
+# Constantes do hash de linha (FNV-1a 64 bits sobre os códigos de cada coluna)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def _factorize_column(series: pd.Series):
+    try:
+        return pd.factorize(series, use_na_sentinel=True)
+    except TypeError:
+        # Valores não hasheáveis (listas/dicts): compara pela representação em texto
+        return pd.factorize(series.astype(str).where(series.notna()), use_na_sentinel=True)
+
+
+def _margin(p: float, n: int, population: int) -> float:
+    """
+    Meia-largura (em pontos percentuais) do intervalo de Wilson a 95%,
+    com correção para população finita
+    """
+    if n <= 0 or n >= population:
+        return 0.0
+    z2 = Z_95 ** 2
+    half = Z_95 * np.sqrt((p * (1 - p) + z2 / (4 * n)) / n) / (1 + z2 / n)
+    fpc = np.sqrt((population - n) / (population - 1))
+    return round(float(half * fpc * 100), 2)
+
+
+def _blank_codes(uniques) -> np.ndarray:
+    """Máscara dos valores distintos que são texto vazio ('' ou só espaços)"""
+    try:
+        stripped = pd.Series(uniques).str.strip()
+    except AttributeError:
+        # Nenhum valor de texto
+        return np.zeros(len(uniques), dtype=bool)
+    return stripped.eq('').fillna(False).to_numpy(dtype=bool)
+
+
+def _date_failures(series: pd.Series, codes: np.ndarray, uniques, counts: np.ndarray, blank: np.ndarray,
+                   parsed: Optional[pd.Series] = None) -> int:
+    """Linhas com valor de data preenchido que não pôde ser interpretado"""
+    if pd.api.types.is_datetime64_any_dtype(series) or len(uniques) == 0:
+        return 0
+    if parsed is not None and pd.api.types.is_datetime64_any_dtype(parsed):
+        # Conversão já feita (ex.: sync): falha = preenchido no original e NaT no convertido
+        filled_rows = (codes >= 0) & ~blank[codes]
+        return int((filled_rows & parsed.isna().to_numpy()).sum())
+    filled = ~blank
+    if not filled.any():
+        return 0
+    candidates = pd.Series(np.asarray(uniques, dtype=object)[filled])
+    failed = parse_dates(candidates).isna().to_numpy()
+    return int(counts[filled][failed].sum())
+
+
+def profile_quality(df: pd.DataFrame, sample_size: Optional[int] = None,
+                    date_columns: Iterable[str] = DATE_COLUMNS, seed: int = 0,
+                    converted: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Gera o relatório de qualidade do DataFrame
+
+    Args:
+        df: DataFrame a avaliar (schema do banco ou original)
+        sample_size: Se definido e menor que o total de linhas, perfila uma amostra
+        date_columns: Colunas de data a validar
+        seed: Semente da amostragem
+        converted: Mesmo DataFrame já normalizado (mesmo índice); se informado,
+            as falhas de data são contadas a partir dele, sem interpretar as datas de novo
+
+    Returns:
+        Relatório com total_rows, columns, missing_data, data_types, cardinality,
+        duplicates, parse_failures, issues e quality_score
+    """
+    start = time.perf_counter()
+    population = len(df)
+    sampled = bool(sample_size) and population > sample_size
+    if sampled:
+        rows = np.sort(np.random.default_rng(seed).choice(population, size=sample_size, replace=False))
+        frame = df.take(rows)
+        if converted is not None:
+            converted = converted.take(rows)
+    else:
+        frame = df
+    n = len(frame)
+    scale = population / n if n else 0.0
+    date_columns = set(date_columns)
+
+    report: Dict[str, Any] = {
+        'total_rows': population,
+        'columns': list(df.columns),
+        'missing_data': {},
+        'data_types': {},
+        'cardinality': {},
+        'duplicates': {},
+        'parse_failures': {},
+        'issues': [],
+        'sampled': sampled,
+        'sample_size': n
+    }
+
+    row_hash = np.full(n, _FNV_OFFSET, dtype=np.uint64)
+    for col in frame.columns:
+        series = frame[col]
+        codes, uniques = _factorize_column(series)
+
+        # Contagem por valor distinto (última posição = nulos)
+        counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+        nulls = int(counts[0])
+        counts = counts[1:]
+        is_text = series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+        blank = _blank_codes(uniques) if is_text else np.zeros(len(uniques), dtype=bool)
+        blanks = int(counts[blank].sum())
+
+        missing = nulls + blanks
+        fraction = missing / n if n else 0.0
+        info = {
+            'count': int(round(missing * scale)),
+            'percentage': round(fraction * 100, 2),
+            'nulls': int(round(nulls * scale)),
+            'blanks': int(round(blanks * scale))
+        }
+        if sampled:
+            info['margin'] = _margin(fraction, n, population)
+        report['missing_data'][col] = info
+        report['data_types'][col] = str(df[col].dtype)
+        report['cardinality'][col] = int(len(uniques) - blank.sum())
+
+        if info['percentage'] > MISSING_THRESHOLD:
+            report['issues'].append(f"Coluna '{col}' tem {info['percentage']:.1f}% de dados faltantes")
+
+        if col in date_columns:
+            parsed = converted[col] if converted is not None and col in converted.columns else None
+            failures = _date_failures(series, codes, uniques, counts, blank, parsed)
+            failure_fraction = failures / n if n else 0.0
+            report['parse_failures'][col] = {
+                'count': int(round(failures * scale)),
+                'percentage': round(failure_fraction * 100, 2)
+            }
+            if sampled:
+                report['parse_failures'][col]['margin'] = _margin(failure_fraction, n, population)
+            if failures:
+                report['issues'].append(
+                    f"Coluna '{col}' tem {report['parse_failures'][col]['count']} datas inválidas"
+                )
+
+        # Hash da linha: combina o código desta coluna
+        row_hash ^= (codes + 1).astype(np.uint64)
+        row_hash *= _FNV_PRIME
+
+    # Linhas duplicadas: na amostra, só pares em que as duas linhas foram sorteadas
+    duplicate_rows = n - len(pd.unique(row_hash)) if n else 0
+    report['duplicates'] = {
+        'count': int(duplicate_rows),
+        'percentage': round(duplicate_rows / n * 100, 2) if n else 0.0,
+        'lower_bound': sampled
+    }
+    if duplicate_rows > 0:
+        report['issues'].append(f"Encontradas {duplicate_rows} linhas duplicadas"
+                                + (" (na amostra)" if sampled else ""))
+
+    # IDs repetidos quebram o upsert: contados sempre no DataFrame inteiro (uma coluna)
+    if ID_COLUMN in df.columns:
+        ids = df[ID_COLUMN]
+        duplicate_ids = int(ids.duplicated(keep='first').sum() - max(ids.isna().sum() - 1, 0))
+        report['duplicates']['ids'] = duplicate_ids
+        if duplicate_ids > 0:
+            report['issues'].append(f"Encontrados {duplicate_ids} valores repetidos em '{ID_COLUMN}'")
+
+    # Score de qualidade (0-100): 10 pontos por problema + média de faltantes
+    issues_penalty = len(report['issues']) * 10
+    missing_penalty = (
+        sum(info['percentage'] for info in report['missing_data'].values()) / len(df.columns)
+        if len(df.columns) else 0
+    )
+    report['quality_score'] = round(max(0, 100 - issues_penalty - missing_penalty), 1)
+    report['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return report
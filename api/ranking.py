@@ -0,0 +1,233 @@
+"""
+Motor de ranking de técnicos para TechHelp Dashboard
+Responsável por:
+ - Calcular, em uma única passada, parciais por (mês, técnico): chamados,
+   soma/quantidade de notas de satisfação e soma/quantidade de tempos de resolução
+ - Derivar estatísticas de qualquer período (total, mês, trimestre) somando parciais
+ - Responder top-k por volume, satisfação e eficiência com seleção parcial (argpartition)
+
+As parciais ficam em um único array (campo × período × técnico); trimestres são
+agregados a partir dos meses, sem reler o DataFrame.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+METRICS = ('volume', 'satisfacao', 'eficiencia')
+GRANULARITIES = ('mes', 'trimestre')
+
+# Índices dos campos no array de parciais
+_COUNT, _SAT_SUM, _SAT_N, _TEMPO_SUM, _TEMPO_N = range(5)
+_N_FIELDS = 5
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def parse_periodo(periodo: str) -> pd.Period:
+    """
+    Interpreta o período pedido na API
+
+    '2024-03' → mês; '2024-Q1' / '2024Q1' → trimestre
+
+    Raises:
+        ValueError: período em formato inválido
+    """
+    text = str(periodo).strip().upper()
+    try:
+        if 'Q' in text:
+            return pd.Period(text.replace('-', ''), freq='Q')
+        return pd.Period(text, freq='M')
+    except Exception:
+        raise ValueError(f"Período inválido: '{periodo}' (use AAAA-MM ou AAAA-QN)")
+
+
+class RankingEngine:
+    """
+    Estatísticas por técnico calculadas uma vez, com rankings por período
+
+    Exemplo:
+        engine = RankingEngine(df)
+        engine.top_k('satisfacao', k=3, periodo='2024-Q1')
+    """
+
+    def __init__(self, df: pd.DataFrame, tecnico_column: str = 'tecnico', date_column: str = 'data_abertura'):
+        if tecnico_column not in df.columns:
+            raise ValueError(f"Coluna '{tecnico_column}' não encontrada")
+
+        codes, tecnicos = pd.factorize(df[tecnico_column], sort=True)
+        self.tecnicos = np.asarray(tecnicos, dtype=object)
+        n_tec = len(self.tecnicos)
+
+        # Mês de abertura de cada chamado (-1 = sem data)
+        if date_column in df.columns:
+            dates = pd.to_datetime(df[date_column], errors='coerce')
+            if getattr(dates.dt, 'tz', None) is not None:
+                dates = dates.dt.tz_localize(None)
+            month_codes, months = pd.factorize(dates.dt.to_period('M'), sort=True)
+        else:
+            month_codes, months = np.full(len(df), -1), pd.PeriodIndex([], freq='M')
+        self.months = pd.PeriodIndex(months, freq='M')
+        n_months = len(self.months)
+
+        # Linha extra (n_months) guarda os chamados sem data: entram só no total
+        valid = codes >= 0
+        slot = np.where(month_codes >= 0, month_codes, n_months)
+        key = (slot * n_tec + codes)[valid]
+        size = (n_months + 1) * n_tec
+
+        satisfacao = _numeric(df, 'satisfacao')[valid]
+        tempo = _numeric(df, 'tempo_resolucao')[valid]
+        sat_ok = ~np.isnan(satisfacao)
+        tempo_ok = ~np.isnan(tempo)
+
+        partials = np.empty((_N_FIELDS, size))
+        partials[_COUNT] = np.bincount(key, minlength=size)
+        partials[_SAT_SUM] = np.bincount(key[sat_ok], weights=satisfacao[sat_ok], minlength=size)
+        partials[_SAT_N] = np.bincount(key[sat_ok], minlength=size)
+        partials[_TEMPO_SUM] = np.bincount(key[tempo_ok], weights=tempo[tempo_ok], minlength=size)
+        partials[_TEMPO_N] = np.bincount(key[tempo_ok], minlength=size)
+        partials = partials.reshape(_N_FIELDS, n_months + 1, n_tec)
+
+        self._month_partials = partials[:, :n_months]
+        self._totals = partials.sum(axis=1)
+
+        # Trimestres: soma das parciais mensais (matriz de pertinência mês → trimestre)
+        quarter_of_month = self.months.asfreq('Q')
+        quarter_codes, quarters = pd.factorize(quarter_of_month, sort=True)
+        self.quarters = pd.PeriodIndex(quarters, freq='Q')
+        membership = np.zeros((len(self.quarters), n_months))
+        membership[quarter_codes, np.arange(n_months)] = 1.0
+        self._quarter_partials = np.einsum('qm,fmt->fqt', membership, self._month_partials)
+
+        self._month_index = {p: i for i, p in enumerate(self.months)}
+        self._quarter_index = {p: i for i, p in enumerate(self.quarters)}
+
+    # ------------------------------------------------------------------ períodos
+    def periods(self, granularidade: str = 'mes') -> List[str]:
+        """Períodos com dados (AAAA-MM ou AAAA-QN)"""
+        if granularidade == 'trimestre':
+            return [f"{p.year}-Q{p.quarter}" for p in self.quarters]
+        return [str(p) for p in self.months]
+
+    def _partials_for(self, periodo: Optional[str]) -> np.ndarray:
+        if not periodo:
+            return self._totals
+        period = parse_periodo(periodo)
+        if period.freqstr.startswith('Q'):
+            index, partials = self._quarter_index.get(period), self._quarter_partials
+        else:
+            index, partials = self._month_index.get(period), self._month_partials
+        if index is None:
+            return np.zeros_like(self._totals)
+        return partials[:, index]
+
+    # --------------------------------------------------------------- estatísticas
+    @staticmethod
+    def _stats(partials: np.ndarray) -> Dict[str, np.ndarray]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total = partials[_COUNT]
+            satisfacao = np.where(partials[_SAT_N] > 0, partials[_SAT_SUM] / partials[_SAT_N], np.nan)
+            tempo_medio = np.where(partials[_TEMPO_N] > 0, partials[_TEMPO_SUM] / partials[_TEMPO_N], np.nan)
+            # Chamados por hora de tempo médio de resolução (sem tempo medido: sem eficiência)
+            eficiencia = np.where(tempo_medio > 0, total / tempo_medio, np.nan)
+        return {
+            'total_chamados': total,
+            'satisfacao_media': satisfacao,
+            'avaliacoes_count': partials[_SAT_N],
+            'tempo_medio': tempo_medio,
+            'eficiencia': eficiencia
+        }
+
+    @staticmethod
+    def _metric_values(stats: Dict[str, np.ndarray], metric: str, min_avaliacoes: int) -> np.ndarray:
+        if metric == 'volume':
+            values = stats['total_chamados'].astype(float)
+            return np.where(values > 0, values, np.nan)
+        if metric == 'satisfacao':
+            return np.where(stats['avaliacoes_count'] >= max(min_avaliacoes, 1), stats['satisfacao_media'], np.nan)
+        if metric == 'eficiencia':
+            return stats['eficiencia']
+        raise ValueError(f"Métrica inválida: '{metric}' (use {', '.join(METRICS)})")
+
+    @staticmethod
+    def _select(values: np.ndarray, tiebreak: np.ndarray, k: Optional[int]) -> np.ndarray:
+        """Índices dos k maiores valores (NaN ignorado), em ordem decrescente"""
+        candidates = np.flatnonzero(~np.isnan(values))
+        if k is not None and k < len(candidates):
+            if k <= 0:
+                return candidates[:0]
+            # Seleção parcial O(n): só os k escolhidos são ordenados
+            chosen = np.argpartition(-values[candidates], k - 1)[:k]
+            candidates = candidates[chosen]
+        order = np.lexsort((-tiebreak[candidates], -values[candidates]))
+        return candidates[order]
+
+    def _row(self, stats: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+        def value(name, digits=2):
+            v = stats[name][index]
+            return None if np.isnan(v) else round(float(v), digits)
+
+        return {
+            'tecnico': self.tecnicos[index],
+            'total_chamados': int(stats['total_chamados'][index]),
+            'satisfacao_media': value('satisfacao_media'),
+            'avaliacoes_count': int(stats['avaliacoes_count'][index]),
+            'tempo_medio': value('tempo_medio'),
+            'eficiencia': value('eficiencia')
+        }
+
+    # ------------------------------------------------------------------ rankings
+    def top_k(self, metric: str = 'volume', k: Optional[int] = 5, periodo: str = None,
+              min_avaliacoes: int = 1) -> List[Dict[str, Any]]:
+        """
+        Top-k técnicos por métrica
+
+        Args:
+            metric: 'volume', 'satisfacao' ou 'eficiencia'
+            k: Quantidade de técnicos (None = todos com valor)
+            periodo: 'AAAA-MM', 'AAAA-QN' ou None (todo o histórico)
+            min_avaliacoes: Notas mínimas para entrar no ranking de satisfação
+
+        Returns:
+            Lista ordenada com posição e estatísticas de cada técnico
+        """
+        stats = self._stats(self._partials_for(periodo))
+        values = self._metric_values(stats, metric, min_avaliacoes)
+        selected = self._select(values, stats['total_chamados'], k)
+        return [dict(posicao=pos, **self._row(stats, i)) for pos, i in enumerate(selected, start=1)]
+
+    def ranking(self, metric: str = 'all', k: Optional[int] = 5, periodo: str = None,
+                min_avaliacoes: int = 1) -> Dict[str, Any]:
+        """Rankings de uma ou de todas as métricas para o período"""
+        metrics = METRICS if metric == 'all' else (metric,)
+        partials = self._partials_for(periodo)
+        return {
+            'periodo': periodo or 'total',
+            'total_chamados': int(partials[_COUNT].sum()),
+            'tecnicos_ativos': int((partials[_COUNT] > 0).sum()),
+            'rankings': {m: self.top_k(m, k, periodo, min_avaliacoes) for m in metrics}
+        }
+
+    def performance_metrics(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Formato de DataProcessor.generate_performance_metrics: técnico → estatísticas,
+        ordenado por métrica; técnicos sem valor na métrica ficam no fim
+        """
+        stats = self._stats(self._totals)
+        result = {}
+        for metric, key in (('volume', 'ranking_volume'), ('satisfacao', 'ranking_satisfacao'),
+                            ('eficiencia', 'ranking_eficiencia')):
+            values = self._metric_values(stats, metric, 1)
+            ranked = self._select(values, stats['total_chamados'], None)
+            missing = np.flatnonzero(np.isnan(values))
+            result[key] = {}
+            for i in np.concatenate([ranked, missing]):
+                row = self._row(stats, i)
+                result[key][row.pop('tecnico')] = row
+        return result
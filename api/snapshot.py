@@ -0,0 +1,242 @@
+"""
+Snapshot colunar dos chamados para TechHelp Dashboard
+Responsável por:
+ - Gravar, após cada reconstrução, o dataset normalizado e o payload calculado
+   em um arquivo Arrow IPC comprimido (com cabeçalho de versão)
+ - Gravar fora do caminho da requisição (write_snapshot_async): as linhas cruas
+   do Supabase são normalizadas na própria thread de gravação
+ - Carregar o snapshot em processos novos (memory-mapped) para servir dados
+   antes da primeira ida ao Supabase, ou quando o Supabase estiver fora do ar
+
+O payload fica nos metadados do schema: ler o payload não lê o dataset.
+pyarrow é opcional; sem ele o snapshot fica desativado.
+
+Configuração (variáveis de ambiente):
+ - SNAPSHOT_PATH: caminho do arquivo (padrão: <tmp>/techhelp_chamados.arrow)
+ - SNAPSHOT_MAX_AGE: idade máxima em segundos para o snapshot ser usado (padrão: 86400)
+ - SNAPSHOT_COMPRESSION: zstd, lz4 ou none (none permite leitura zero-copy via mmap)
+ - SNAPSHOT_ENABLED: 'false' desativa leitura e escrita
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from formats import import_pyarrow, json_default, to_arrow_table
+
+
+# Versão do formato do arquivo (incrementar ao mudar a estrutura)
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', os.path.join(tempfile.gettempdir(), 'techhelp_chamados.arrow'))
+SNAPSHOT_MAX_AGE = int(os.getenv('SNAPSHOT_MAX_AGE', 86400))
+SNAPSHOT_COMPRESSION = os.getenv('SNAPSHOT_COMPRESSION', 'zstd').lower()
+SNAPSHOT_ENABLED = os.getenv('SNAPSHOT_ENABLED', 'true').lower() != 'false'
+
+_META_VERSION = b'techhelp.snapshot_version'
+_META_CREATED_AT = b'techhelp.created_at'
+_META_PAYLOAD = b'techhelp.payload'
+_META_FINGERPRINT = b'techhelp.fingerprint'
+# Dataset gravado já normalizado (sem a marca: linhas cruas, normalizadas na leitura)
+_META_NORMALIZED = b'techhelp.normalized'
+
+# Gravações em segundo plano: uma por vez, e só a mais recente pedida
+_write_lock = threading.Lock()
+_write_state = {'lock': threading.Lock(), 'seq': 0}
+
+
+class Snapshot:
+    """Snapshot carregado: payload já decodificado e dataset lido sob demanda (mmap)"""
+
+    def __init__(self, path: str, payload: Dict[str, Any], created_at: float, fingerprint: Optional[str] = None,
+                 normalized: bool = False):
+        self.path = path
+        self.payload = payload
+        self.created_at = created_at
+        # Impressão do dataset gravado (fingerprint.py): revalida o snapshot sem recarregar
+        self.fingerprint = fingerprint
+        self.normalized = normalized
+        self._table = None
+
+    @property
+    def age(self) -> float:
+        """Idade do snapshot em segundos"""
+        return time.time() - self.created_at
+
+    @property
+    def created_at_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at)
+
+    def table(self):
+        """Dataset como tabela Arrow (memory-mapped; zero-copy se gravado sem compressão)"""
+        if self._table is None:
+            pa = import_pyarrow()
+            source = pa.memory_map(self.path, 'r')
+            self._table = pa.ipc.open_file(source).read_all()
+        return self._table
+
+    def dataframe(self):
+        """Dataset normalizado como DataFrame pandas (snapshot com linhas cruas é normalizado aqui)"""
+        df = self.table().to_pandas()
+        return df if self.normalized else normalize_dataset(df)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Dataset como lista de dicts (formato das respostas do Supabase)"""
+        return self.table().to_pylist()
+
+
+def normalize_dataset(dataset: Union[List[Dict[str, Any]], Any]):
+    """Linhas do Supabase (lista de dicts ou DataFrame cru) → DataFrame normalizado"""
+    import pandas as pd
+    from column_schema import apply_column_schema
+    from normalization import normalize_chamados
+
+    df = pd.DataFrame(dataset) if isinstance(dataset, list) else dataset
+    return normalize_chamados(apply_column_schema(df))
+
+
+def write_snapshot(payload: Dict[str, Any], dataset: Union[List[Dict[str, Any]], Any] = None,
+                   path: str = None, fingerprint: Optional[str] = None) -> bool:
+    """
+    Grava o snapshot de forma atômica (arquivo temporário + rename)
+
+    Args:
+        payload: Payload calculado (resposta de /api/chamados)
+        dataset: DataFrame normalizado ou lista de registros crus (opcional)
+        path: Caminho do arquivo (padrão: SNAPSHOT_PATH)
+        fingerprint: Impressão do dataset (opcional)
+
+    Returns:
+        True se o snapshot foi gravado
+    """
+    if not SNAPSHOT_ENABLED:
+        return False
+
+    pa = import_pyarrow()
+    if pa is None:
+        return False
+
+    path = path or SNAPSHOT_PATH
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        table = to_arrow_table(pa, dataset)
+        metadata = dict(table.schema.metadata or {})
+        metadata.update({
+            _META_VERSION: str(SNAPSHOT_VERSION).encode(),
+            _META_CREATED_AT: repr(time.time()).encode(),
+            _META_PAYLOAD: json.dumps(payload, default=json_default, ensure_ascii=False).encode('utf-8')
+        })
+        if fingerprint is not None:
+            metadata[_META_FINGERPRINT] = fingerprint.encode('utf-8')
+        if dataset is not None and not isinstance(dataset, list):
+            metadata[_META_NORMALIZED] = b'1'
+        table = table.replace_schema_metadata(metadata)
+
+        compression = None if SNAPSHOT_COMPRESSION in ('', 'none') else SNAPSHOT_COMPRESSION
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        return True
+
+    except Exception as e:
+        print(f"⚠️ Não foi possível gravar o snapshot: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def write_snapshot_async(payload: Dict[str, Any], dataset: Union[List[Dict[str, Any]], Any] = None,
+                         fingerprint: Optional[str] = None) -> Optional[threading.Thread]:
+    """
+    Grava o snapshot numa thread à parte, sem segurar a requisição
+
+    Linhas cruas são normalizadas na thread (sem pandas, vão cruas e a leitura
+    normaliza). Se outra gravação for pedida antes desta começar, só a mais
+    recente é gravada.
+
+    Returns:
+        Thread da gravação (None com o snapshot desativado)
+    """
+    if not SNAPSHOT_ENABLED:
+        return None
+
+    with _write_state['lock']:
+        _write_state['seq'] += 1
+        seq = _write_state['seq']
+
+    def run():
+        with _write_lock:
+            if seq != _write_state['seq']:
+                return
+            rows = dataset
+            if isinstance(rows, list) and rows:
+                try:
+                    rows = normalize_dataset(rows)
+                except ImportError:
+                    pass
+                except Exception as e:
+                    print(f"⚠️ Snapshot com linhas cruas (normalização falhou: {str(e)})")
+            write_snapshot(payload, rows, fingerprint=fingerprint)
+
+    thread = threading.Thread(target=run, name='techhelp-snapshot', daemon=True)
+    thread.start()
+    return thread
+
+
+def load_snapshot(path: str = None, max_age: Optional[int] = None) -> Optional[Snapshot]:
+    """
+    Carrega o snapshot se existir, tiver a versão atual e estiver dentro da idade máxima
+
+    Apenas o cabeçalho do arquivo é lido aqui; o dataset é lido sob demanda
+    por Snapshot.table().
+
+    Args:
+        path: Caminho do arquivo (padrão: SNAPSHOT_PATH)
+        max_age: Idade máxima em segundos (padrão: SNAPSHOT_MAX_AGE)
+
+    Returns:
+        Snapshot ou None
+    """
+    if not SNAPSHOT_ENABLED:
+        return None
+
+    path = path or SNAPSHOT_PATH
+    max_age = SNAPSHOT_MAX_AGE if max_age is None else max_age
+    if not os.path.exists(path):
+        return None
+
+    pa = import_pyarrow()
+    if pa is None:
+        return None
+
+    try:
+        with pa.memory_map(path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+
+        version = int(metadata.get(_META_VERSION, b'0'))
+        if version != SNAPSHOT_VERSION:
+            print(f"⚠️ Snapshot ignorado: versão {version} (esperada {SNAPSHOT_VERSION})")
+            return None
+
+        created_at = float(metadata[_META_CREATED_AT])
+        if time.time() - created_at > max_age:
+            print(f"⚠️ Snapshot ignorado: mais antigo que {max_age}s")
+            return None
+
+        payload = json.loads(metadata[_META_PAYLOAD].decode('utf-8'))
+        fingerprint = metadata.get(_META_FINGERPRINT)
+        return Snapshot(path, payload, created_at, fingerprint.decode('utf-8') if fingerprint else None,
+                        normalized=metadata.get(_META_NORMALIZED) == b'1')
+
+    except Exception as e:
+        print(f"⚠️ Não foi possível ler o snapshot: {str(e)}")
+        return None
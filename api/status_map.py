@@ -0,0 +1,152 @@
+"""
+Status canônico dos chamados para TechHelp Dashboard
+Responsável por:
+ - Mapear sinônimos de status (aberto, resolvido, concluído, em_andamento...)
+   para quatro códigos fixos: Aberto, Em Andamento, Fechado, Indefinido
+ - Contar chamados por status (uma contagem por código) para todos os KPIs
+ - Padronizar o texto gravado (status_label): desconhecidos ficam como estão,
+   em Title Case, e só contam como Indefinido nos KPIs
+
+A tabela de consulta é montada uma vez, no import; cada valor distinto da
+coluna é consultado uma vez e as linhas recebem o código. Sem pandas/numpy no
+import: app.py e index.py contam status em listas de dicts (caminho leve);
+as funções de Series importam numpy/pandas sob demanda.
+"""
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+
+STATUS_ABERTO = 'Aberto'
+STATUS_EM_ANDAMENTO = 'Em Andamento'
+STATUS_FECHADO = 'Fechado'
+STATUS_INDEFINIDO = 'Indefinido'
+
+# Ordem = código (categorias fixas)
+STATUS_CATEGORIES = (STATUS_ABERTO, STATUS_EM_ANDAMENTO, STATUS_FECHADO, STATUS_INDEFINIDO)
+ABERTO, EM_ANDAMENTO, FECHADO, INDEFINIDO = range(len(STATUS_CATEGORIES))
+
+# Códigos contados como "abertos" nos KPIs (tudo que ainda não foi fechado)
+OPEN_CODES = (ABERTO, EM_ANDAMENTO)
+CLOSED_CODES = (FECHADO,)
+
+# Sinônimos de status → rótulo padronizado (chaves sem acento, em minúsculas)
+STATUS_MAP = {
+    'aberto': STATUS_ABERTO,
+    'open': STATUS_ABERTO,
+    'novo': STATUS_ABERTO,
+    'pendente': STATUS_ABERTO,
+    'aguardando': STATUS_ABERTO,
+    'reaberto': STATUS_ABERTO,
+    'fechado': STATUS_FECHADO,
+    'closed': STATUS_FECHADO,
+    'resolvido': STATUS_FECHADO,
+    'resolved': STATUS_FECHADO,
+    'concluido': STATUS_FECHADO,
+    'finalizado': STATUS_FECHADO,
+    'encerrado': STATUS_FECHADO,
+    'em andamento': STATUS_EM_ANDAMENTO,
+    'andamento': STATUS_EM_ANDAMENTO,
+    'em progresso': STATUS_EM_ANDAMENTO,
+    'progress': STATUS_EM_ANDAMENTO,
+    'in progress': STATUS_EM_ANDAMENTO,
+    'processando': STATUS_EM_ANDAMENTO,
+    'trabalhando': STATUS_EM_ANDAMENTO
+}
+
+
+def _status_key(text: str) -> str:
+    """Chave de consulta: minúsculas, sem acento, '_'/'-' como espaço, espaços únicos"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.replace('_', ' ').replace('-', ' ').split())
+
+
+# Tabela de consulta pré-calculada: chave → código
+_LOOKUP: Dict[str, int] = {
+    _status_key(key): STATUS_CATEGORIES.index(label) for key, label in STATUS_MAP.items()
+}
+_LOOKUP.update({_status_key(label): code for code, label in enumerate(STATUS_CATEGORIES)})
+
+# Memória dos textos originais já vistos (poucos valores distintos por coluna)
+_SEEN: Dict[str, int] = {}
+_SEEN_LIMIT = 10000
+
+
+def status_code(value: Any) -> int:
+    """Código canônico de um valor de status (nulo/desconhecido → INDEFINIDO)"""
+    if not isinstance(value, str):
+        # None, NaN, pd.NA e números não são status
+        return INDEFINIDO
+    code = _SEEN.get(value)
+    if code is None:
+        code = _LOOKUP.get(_status_key(value), INDEFINIDO)
+        if len(_SEEN) < _SEEN_LIMIT:
+            _SEEN[value] = code
+    return code
+
+
+def canonical_status(value: Any) -> str:
+    """Rótulo canônico (Aberto, Em Andamento, Fechado ou Indefinido)"""
+    return STATUS_CATEGORIES[status_code(value)]
+
+
+def status_label(value: Any) -> str:
+    """
+    Rótulo gravado na coluna status: sinônimos viram o rótulo padronizado,
+    valores desconhecidos são mantidos em Title Case (ex.: 'Cancelado')
+
+    Só os KPIs agrupam desconhecidos em Indefinido (status_code/count_status).
+    """
+    if not isinstance(value, str):
+        return STATUS_INDEFINIDO
+    code = status_code(value)
+    if code != INDEFINIDO:
+        return STATUS_CATEGORIES[code]
+    text = value.lower().strip()
+    if not text or text in ('nan', 'none', 'null'):
+        return STATUS_INDEFINIDO
+    return text.title()
+
+
+def count_status(values: Iterable[Any]) -> List[int]:
+    """
+    Contagem por código a partir de valores crus (ex.: status das linhas do Supabase)
+
+    Conta os valores distintos primeiro; cada distinto é canonicalizado uma vez.
+    """
+    counts = [0] * len(STATUS_CATEGORIES)
+    for value, n in Counter(values).items():
+        counts[status_code(value)] += n
+    return counts
+
+
+def status_codes(series):
+    """Código canônico (int8) de cada linha de uma Series (numpy.ndarray)"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Já categórica (ex.: após normalize_status): consulta só as categorias
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    # Última posição = nulos (código -1)
+    table = np.array([status_code(value) for value in uniques] + [INDEFINIDO], dtype=np.int8)
+    return table[codes]
+
+
+def status_counts(series) -> List[int]:
+    """Contagem por código de uma Series (um bincount sobre os códigos)"""
+    import numpy as np
+
+    return np.bincount(status_codes(series), minlength=len(STATUS_CATEGORIES)).tolist()
+
+
+def status_kpis(counts: List[int]) -> Dict[str, int]:
+    """KPIs de status do dashboard a partir da contagem por código"""
+    return {
+        'total_abertos': int(sum(counts[code] for code in OPEN_CODES)),
+        'total_fechados': int(sum(counts[code] for code in CLOSED_CODES))
+    }
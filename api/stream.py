@@ -0,0 +1,119 @@
+"""
+Transmissão do payload do dashboard por Server-Sent Events (SSE)
+Responsável por:
+ - Guardar a versão atual do payload e publicar uma nova só quando o
+   conteúdo muda (delta.payload_fingerprint, sem o horário de atualização)
+ - Entregar a versão atual a todos os assinantes de um processo a partir de
+   um único produtor (as conexões só aguardam; ninguém consulta o Supabase)
+ - Enviar heartbeats em conexões ociosas e retomar pelo Last-Event-ID
+ - Montar a resposta de uma conexão curta (index.py, serverless): versão
+   atual e 'retry', com o navegador reconectando sozinho
+
+O id de cada evento é a impressão digital do payload: um navegador que
+reconecta (em qualquer processo) com o id da versão atual não recebe o
+payload de novo.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from delta import payload_fingerprint
+
+
+# Reconexão sugerida ao navegador (ms)
+RETRY_MS = 5000
+
+
+def format_event(data: str, event: str = None, event_id: str = None, retry: int = None) -> bytes:
+    """Monta um evento SSE (data com várias linhas vira várias linhas 'data:')"""
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.split('\n'))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def snapshot_events(payload: Optional[Dict[str, Any]], last_event_id: str = None, retry: int = RETRY_MS) -> bytes:
+    """
+    Eventos de uma conexão curta: 'retry' e a versão atual do payload (omitida se
+    last_event_id já for ela); o navegador reconecta após `retry` ms com o id recebido
+    """
+    events = [format_event('', event='ping', retry=retry)]
+    if payload is not None:
+        fingerprint = payload_fingerprint(payload)
+        if fingerprint != last_event_id:
+            data = json.dumps(payload, default=str, ensure_ascii=False)
+            events.append(format_event(data, event='payload', event_id=fingerprint))
+    return b''.join(events)
+
+
+class PayloadBroadcaster:
+    """
+    Versão atual do payload compartilhada pelos assinantes de um processo
+
+    Exemplo:
+        broadcaster.publish(payload)          # após cada reconstrução
+        async for chunk in broadcaster.subscribe(last_event_id):
+            ...                                # bytes SSE
+    """
+
+    def __init__(self, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self.version = 0
+        self.fingerprint: Optional[str] = None
+        self._event: Optional[bytes] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self.subscribers = 0
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Criada no event loop em uso (primeira assinatura/publicação)
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def publish(self, payload: Dict[str, Any]) -> bool:
+        """Publica o payload se o conteúdo mudou; retorna True se houve nova versão"""
+        fingerprint = payload_fingerprint(payload)
+        if fingerprint == self.fingerprint:
+            return False
+        data = json.dumps(payload, default=str, ensure_ascii=False)
+        condition = self._get_condition()
+        async with condition:
+            self.version += 1
+            self.fingerprint = fingerprint
+            self._event = format_event(data, event='payload', event_id=fingerprint)
+            condition.notify_all()
+        return True
+
+    async def subscribe(self, last_event_id: str = None) -> AsyncIterator[bytes]:
+        """
+        Eventos SSE de um assinante: versão atual (se diferente de last_event_id),
+        depois cada nova versão, com heartbeat quando não há novidades
+        """
+        condition = self._get_condition()
+        self.subscribers += 1
+        try:
+            yield format_event('', event='ping', retry=RETRY_MS)
+            seen = 0
+            if self._event is not None:
+                seen = self.version
+                if last_event_id != self.fingerprint:
+                    yield self._event
+
+            while True:
+                async with condition:
+                    try:
+                        await asyncio.wait_for(condition.wait_for(lambda: self.version > seen), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        event = None
+                    else:
+                        seen = self.version
+                        event = self._event
+                # Comentário SSE mantém proxies e o navegador com a conexão aberta
+                yield event if event is not None else b': heartbeat\n\n'
+        finally:
+            self.subscribers -= 1
@@ -9,7 +9,10 @@ import os
 from typing import Dict, Any, List
 from datetime import datetime
 import pandas as pd
-from supabase import create_client, Client
+from column_schema import apply_column_schema
+from normalization import normalize_chamados
+from instrumentation import phase, record_rows
+from status_map import status_counts, status_kpis
 
 
 class SupabaseIntegration:
@@ -25,12 +28,16 @@ class SupabaseIntegration:
         """
         self.url = url
         self.key = key
-        self.client: Client = None
+        self.client = None
+        # Último DataFrame normalizado (usado para o snapshot em disco)
+        self.last_dataframe: pd.DataFrame = None
         self._connect()
     
     def _connect(self):
         """Conecta ao Supabase"""
         try:
+            # Importado sob demanda: o cliente HTTP do Supabase só carrega quando há conexão
+            from supabase import create_client
             self.client = create_client(self.url, self.key)
             print("✅ Conexão com Supabase estabelecida")
         except Exception as e:
@@ -46,13 +53,16 @@ class SupabaseIntegration:
         """
         try:
             # Query na tabela chamados (ajuste o nome se necessário)
-            response = self.client.table('chamados').select('*').execute()
+            with phase('supabase_fetch'):
+                response = self.client.table('chamados').select('*').execute()
             
             if not response.data:
                 raise Exception("Nenhum dado encontrado na tabela chamados")
+            record_rows(len(response.data), source='supabase')
             
             # Converte para DataFrame
-            df = pd.DataFrame(response.data)
+            with phase('dataframe_convert'):
+                df = pd.DataFrame(response.data)
             
             print(f"✅ Dados do Supabase carregados: {len(df)} registros")
             return df
@@ -61,25 +71,38 @@ class SupabaseIntegration:
             print(f"❌ Erro ao buscar dados do Supabase: {str(e)}")
             raise
     
-    def process_chamados_data(self) -> Dict[str, Any]:
+    def get_normalized_dataframe(self) -> pd.DataFrame:
         """
-        Processa os dados e retorna métricas calculadas
+        Busca os chamados e normaliza colunas e tipos (schema do banco)
         
         Returns:
-            Dicionário com KPIs e dados processados
+            DataFrame normalizado (também guardado em last_dataframe)
         """
-        try:
-            # Carrega dados do Supabase
-            df = self.get_chamados_data()
-            
+        df = self.get_chamados_data()
+        
+        with phase('normalize'):
             # Normaliza nomes das colunas (caso venham diferentes)
-            df.columns = [col.lower().strip() for col in df.columns]
+            df = apply_column_schema(df)
             
             # Converte tipos de dados
             df = self._convert_data_types(df)
+        self.last_dataframe = df
+        return df
+    
+    def process_chamados_data(self) -> Dict[str, Any]:
+        """
+        Processa os dados e retorna métricas calculadas
+        
+        Returns:
+            Dicionário com KPIs e dados processados
+        """
+        try:
+            # Carrega e normaliza dados do Supabase
+            df = self.get_normalized_dataframe()
             
             # Calcula métricas
-            metrics = self._calculate_metrics(df)
+            with phase('compute_metrics'):
+                metrics = self._calculate_metrics(df)
             
             return metrics
             
@@ -90,29 +113,8 @@ class SupabaseIntegration:
     def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Converte colunas para tipos de dados apropriados"""
         try:
-            # Converte datas
-            date_columns = ['data_abertura', 'data_fechamento', 'created_at', 'updated_at']
-            for col in date_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-            
-            # Converte satisfação para numérico
-            if 'satisfacao' in df.columns:
-                # Mapeia textuais para numéricos
-                satisf_map = {
-                    'ruim': 1, 'regular': 2, 'medio': 3, 'médio': 3,
-                    'bom': 4, 'otimo': 5, 'ótimo': 5, 'excelente': 5
-                }
-                df['satisfacao'] = df['satisfacao'].apply(
-                    lambda x: satisf_map.get(str(x).strip().lower(), x) if pd.notna(x) else x
-                )
-                df['satisfacao'] = pd.to_numeric(df['satisfacao'], errors='coerce')
-            
-            # Converte tempo de resolução para numérico (em horas)
-            if 'tempo_resolucao' in df.columns:
-                df['tempo_resolucao'] = pd.to_numeric(df['tempo_resolucao'], errors='coerce')
-            
-            return df
+            # Datas, satisfação, status e tempo de resolução (normalizados por valor distinto)
+            return normalize_chamados(df)
             
         except Exception as e:
             print(f"⚠️ Aviso na conversão de tipos: {str(e)}")
@@ -124,11 +126,11 @@ class SupabaseIntegration:
             # KPIs básicos
             total_chamados = len(df)
             
-            # Filtra por status
+            # Abertos/fechados: contagem por código de status canônico
             if 'status' in df.columns:
-                df['status'] = df['status'].astype(str).str.lower().str.strip()
-                total_abertos = len(df[df['status'].isin(['aberto', 'em andamento', 'pendente'])])
-                total_fechados = len(df[df['status'].isin(['fechado', 'resolvido', 'concluido', 'concluído'])])
+                status_totals = status_kpis(status_counts(df['status']))
+                total_abertos = status_totals['total_abertos']
+                total_fechados = status_totals['total_fechados']
             else:
                 total_abertos = 0
                 total_fechados = total_chamados
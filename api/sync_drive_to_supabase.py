@@ -7,17 +7,32 @@ Responsável por:
  
 Uso:
  - Executar manualmente: python sync_drive_to_supabase.py
+ - Várias planilhas (uma por unidade): python sync_drive_to_supabase.py --sources config/sync_sources.json
+   (ou SYNC_SOURCES no .env); as fontes são lidas e gravadas em paralelo
  - Agendar via cron/Task Scheduler para sync automático
+
+Cada registro leva a coluna `fonte` (nome da fonte); a chave no banco é
+(fonte, id_chamado), então ids repetidos entre unidades não colidem.
+Os ids novos/alterados entram no change log (chamados_changelog) pelos
+triggers da tabela (migration 20250107), como os de qualquer outro escritor.
 """
+import argparse
+import json
 import os
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 from google_sheets import GoogleSheetsIntegration
 from supabase_client import create_supabase_client
+from column_schema import apply_column_schema
+from normalization import normalize_chamados
+from quality import profile_quality
 import pandas as pd
-import unicodedata
-import re
 
 
 # Carrega variáveis de ambiente
@@ -25,85 +40,92 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'config', '.env'))
 load_dotenv(dotenv_path=ENV_PATH, override=True)
 
+# Acima deste número de linhas o relatório de qualidade usa amostragem
+QUALITY_SAMPLE_SIZE = int(os.getenv('QUALITY_SAMPLE_SIZE', 200000))
+
+# Identidade da fonte em cada registro e chave de conflito do upsert
+SOURCE_COLUMN = 'fonte'
+DEFAULT_SOURCE = os.getenv('SYNC_SOURCE_NAME', 'principal')
+ON_CONFLICT = f'{SOURCE_COLUMN},id_chamado'
+# Fontes sincronizadas ao mesmo tempo no modo multi-fonte
+SYNC_MAX_WORKERS = int(os.getenv('SYNC_MAX_WORKERS', 4))
+# Várias abas por planilha (ex.: '*' ou '2024-*'); vazio = só a primeira aba
+SYNC_WORKSHEETS = os.getenv('SYNC_WORKSHEETS', '').strip() or None
+# Trava entre processos: execuções manuais e do agendador nunca se sobrepõem
+SYNC_LOCK_PATH = os.getenv('SYNC_LOCK_PATH', os.path.join(tempfile.gettempdir(), 'techhelp_sync.lock'))
+
 
-def normalize_column_name(text: str) -> str:
-    """Normaliza nomes de colunas para padrão do banco"""
-    if not isinstance(text, str):
-        text = str(text)
-    nfkd = unicodedata.normalize('NFKD', text)
-    no_accents = ''.join([c for c in nfkd if not unicodedata.category(c) == 'Mn'])
-    base = no_accents.strip().lower().replace('ç', 'c')
-    cleaned = re.sub(r'[^a-z0-9]+', '_', base)
-    cleaned = re.sub(r'_+', '_', cleaned).strip('_')
-    return cleaned
+@contextmanager
+def sync_lock(path: str = SYNC_LOCK_PATH):
+    """
+    Trava exclusiva (não bloqueante) em um arquivo; produz True se obtida
+
+    flock no Linux/macOS, msvcrt no Windows. O sistema libera a trava se o
+    processo morrer, então não há trava "presa" após uma queda.
+    """
+    handle = open(path, 'a+')
+    try:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{os.getpid()} {datetime.now().isoformat()}\n")
+        handle.flush()
+        try:
+            yield True
+        finally:
+            if os.name == 'nt':
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        handle.close()
 
 
 def map_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Mapeia colunas da planilha para padrão do banco"""
-    # Normaliza nomes
-    df.columns = [normalize_column_name(col) for col in df.columns]
-    
-    # Mapeamento de variações para nomes padrão
-    column_mapping = {
-        'id_chamado': ['id_chamado', 'id', 'chamado_id', 'numero', 'id_do_chamado'],
-        'data_abertura': ['data_abertura', 'abertura', 'data_inicio', 'data_de_abertura'],
-        'data_fechamento': ['data_fechamento', 'fechamento', 'data_fim', 'data_de_fechamento'],
-        'tecnico': ['tecnico', 'responsavel', 'atendente', 'agente_responsavel'],
-        'categoria': ['categoria', 'tipo', 'classificacao', 'motivo'],
-        'status': ['status', 'situacao', 'estado'],
-        'tempo_resolucao': ['tempo_resolucao', 'tempo', 'duracao', 'tma_minutos'],
-        'satisfacao': ['satisfacao', 'nota', 'avaliacao', 'satisfacao_do_cliente'],
-        'solicitante': ['solicitante', 'cliente', 'usuario'],
-        'departamento': ['departamento', 'area', 'setor'],
-        'prioridade': ['prioridade', 'urgencia'],
-        'solucao': ['solucao', 'resolucao', 'descricao_solucao']
-    }
-    
-    # Renomeia
-    for standard, variations in column_mapping.items():
-        for var in variations:
-            if var in df.columns:
-                df = df.rename(columns={var: standard})
-                break
-    
-    return df
+    """Mapeia colunas da planilha para padrão do banco (schema compartilhado)"""
+    return apply_column_schema(df)
 
 
 def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
-    """Converte tipos de dados"""
-    # Datas
-    date_cols = ['data_abertura', 'data_fechamento']
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-    
-    # Satisfação textual → numérica
-    if 'satisfacao' in df.columns:
-        satisf_map = {
-            'ruim': 1, 'regular': 2, 'medio': 3, 'médio': 3,
-            'bom': 4, 'otimo': 5, 'ótimo': 5, 'excelente': 5
-        }
-        df['satisfacao'] = df['satisfacao'].apply(
-            lambda x: satisf_map.get(str(x).strip().lower(), x) if pd.notna(x) else x
-        )
-        df['satisfacao'] = pd.to_numeric(df['satisfacao'], errors='coerce')
-    
-    # Tempo de resolução: se vier em minutos (TMA), converte para horas
-    if 'tempo_resolucao' in df.columns:
-        df['tempo_resolucao'] = pd.to_numeric(df['tempo_resolucao'], errors='coerce')
-        # Se valores muito altos, provavelmente são minutos
-        if df['tempo_resolucao'].median() > 100:
-            print("⚠️ Convertendo tempo_resolucao de minutos para horas")
-            df['tempo_resolucao'] = df['tempo_resolucao'] / 60.0
-    
-    return df
+    """Converte tipos de dados (datas, satisfação textual→numérica, TMA minutos→horas); status fica como veio"""
+    return normalize_chamados(
+        df,
+        date_columns=['data_abertura', 'data_fechamento'],
+        detect_minutes=True
+    )
 
 
-def sync_to_supabase(df: pd.DataFrame, supabase_client):
-    """Sincroniza DataFrame com Supabase (upsert)"""
-    print(f"📤 Sincronizando {len(df)} registros para o Supabase...")
-    
-    # Converte para lista de dicts
+def report_quality(df: pd.DataFrame, converted: pd.DataFrame = None, label: str = None) -> dict:
+    """
+    Perfila a qualidade dos dados lidos (amostrado em planilhas muito grandes)
+    Com `converted`, as datas já interpretadas na conversão são reaproveitadas.
+    `label` identifica a fonte nas mensagens (modo multi-fonte).
+    """
+    report = profile_quality(df, sample_size=QUALITY_SAMPLE_SIZE, converted=converted)
+    sampled = f", amostra de {report['sample_size']}" if report['sampled'] else ''
+    prefix = f"[{label}] " if label else ''
+    print(f"🧪 {prefix}Qualidade dos dados: {report['quality_score']}/100 ({report['elapsed_ms']:.0f} ms{sampled})")
+    for issue in report['issues']:
+        print(f"   ⚠️ {prefix}{issue}")
+    return report
+
+
+def prepare_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Converte o DataFrame em registros JSON (NaN → None, Timestamp → ISO)"""
     records = df.to_dict('records')
     
     # Limpa valores NaN/None para evitar erros no Supabase
@@ -114,16 +136,28 @@ def sync_to_supabase(df: pd.DataFrame, supabase_client):
             # Converte timestamps para string ISO
             elif isinstance(value, pd.Timestamp):
                 record[key] = value.isoformat() if pd.notna(value) else None
+    return records
+
+
+def upsert_records(records: List[Dict[str, Any]], supabase_client) -> int:
+    """Upsert em lote pela chave (fonte, id_chamado); retorna registros processados"""
+    # Se (fonte, id_chamado) existir, atualiza; senão, insere
+    response = supabase_client.client.table('chamados').upsert(
+        records,
+        on_conflict=ON_CONFLICT
+    ).execute()
+    return len(response.data)
+
+
+def sync_to_supabase(df: pd.DataFrame, supabase_client):
+    """Sincroniza DataFrame com Supabase (upsert)"""
+    print(f"📤 Sincronizando {len(df)} registros para o Supabase...")
+    
+    records = prepare_records(df)
     
     try:
-        # Upsert por lote (Supabase permite inserção em massa)
-        # Se id_chamado existir, atualiza; senão, insere
-        response = supabase_client.client.table('chamados').upsert(
-            records,
-            on_conflict='id_chamado'
-        ).execute()
-        
-        print(f"✅ Sincronização concluída: {len(response.data)} registros processados")
+        processed = upsert_records(records, supabase_client)
+        print(f"✅ Sincronização concluída: {processed} registros processados")
         return True
         
     except Exception as e:
@@ -131,6 +165,163 @@ def sync_to_supabase(df: pd.DataFrame, supabase_client):
         return False
 
 
+def read_normalized(google_client: GoogleSheetsIntegration, file_id: str = None,
+                    worksheet_name: str = None, worksheets: str = None):
+    """
+    Lê e normaliza uma planilha; retorna (DataFrame mapeado, DataFrame convertido)
+
+    Com `worksheets` (padrão de abas), todas as abas correspondentes são lidas e
+    normalizadas no pool de processos (get_workbook_data); nesse caso os dois
+    DataFrames são o mesmo.
+    """
+    if worksheets:
+        df = google_client.get_workbook_data(worksheets, file_id=file_id)
+        return df, df
+    df = map_columns(google_client.get_spreadsheet_data(worksheet_name=worksheet_name, file_id=file_id))
+    raw_df = df.copy(deep=False)
+    return raw_df, convert_data_types(df)
+
+
+def with_source(df: pd.DataFrame, fonte: str) -> pd.DataFrame:
+    """Marca os registros com o nome da fonte (parte da chave no banco)"""
+    return df.assign(**{SOURCE_COLUMN: fonte})
+
+
+def load_sources(spec: str) -> List[Dict[str, str]]:
+    """
+    Lista de fontes do sync multi-fonte
+
+    Args:
+        spec: Caminho de um JSON ([{"fonte": "sede", "sheets_id": "...", "aba": "opcional"}],
+              ou "abas": "2024-*" para várias abas) ou lista inline 'sede=ID;filial=ID2:Aba'
+
+    Returns:
+        Lista de {'fonte', 'sheets_id', 'aba', 'abas'}
+    """
+    if spec.strip().endswith('.json'):
+        path = spec.strip()
+        if not os.path.isabs(path) and not os.path.exists(path):
+            path = os.path.normpath(os.path.join(BASE_DIR, '..', path))
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+    else:
+        entries = []
+        for item in filter(None, (part.strip() for part in spec.split(';'))):
+            fonte, _, target = item.partition('=')
+            sheets_id, _, aba = target.partition(':')
+            entries.append({'fonte': fonte, 'sheets_id': sheets_id, 'aba': aba})
+
+    sources = []
+    for entry in entries:
+        fonte = (entry.get('fonte') or '').strip()
+        sheets_id = (entry.get('sheets_id') or '').strip()
+        if not fonte or not sheets_id:
+            raise Exception(f"Fonte inválida (fonte e sheets_id são obrigatórios): {entry}")
+        sources.append({
+            'fonte': fonte,
+            'sheets_id': sheets_id,
+            'aba': (entry.get('aba') or '').strip() or None,
+            'abas': (entry.get('abas') or '').strip() or None
+        })
+
+    names = [source['fonte'] for source in sources]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise Exception(f"Fontes com nome repetido: {', '.join(duplicated)}")
+    if not sources:
+        raise Exception("Nenhuma fonte configurada")
+    return sources
+
+
+def sync_source(source: Dict[str, str], google_client: GoogleSheetsIntegration, supabase_client) -> Dict[str, Any]:
+    """
+    Lê, normaliza e grava uma fonte; erros ficam no resultado (não afetam as demais)
+
+    Returns:
+        {'fonte', 'status' ('ok'/'erro'), 'registros', 'etapa', 'tempos_ms', 'erro'}
+    """
+    fonte = source['fonte']
+    state = {'fonte': fonte, 'status': 'ok', 'registros': 0, 'etapa': 'leitura', 'tempos_ms': {}, 'erro': None}
+    start = time.perf_counter()
+
+    def lap(step: str):
+        nonlocal start
+        now = time.perf_counter()
+        state['tempos_ms'][step] = round((now - start) * 1000, 1)
+        start = now
+
+    try:
+        raw_df, df = read_normalized(google_client, source['sheets_id'], source['aba'], source['abas'])
+        lap('leitura')
+
+        state['etapa'] = 'normalizacao'
+        df = with_source(df, fonte)
+        state['qualidade'] = report_quality(raw_df, converted=df, label=fonte)['quality_score']
+        records = prepare_records(df)
+        lap('normalizacao')
+
+        state['etapa'] = 'upsert'
+        state['registros'] = upsert_records(records, supabase_client)
+        lap('upsert')
+        state['etapa'] = 'concluido'
+        print(f"✅ [{fonte}] {state['registros']} registros sincronizados")
+    except Exception as e:
+        lap(state['etapa'])
+        state['status'] = 'erro'
+        state['erro'] = str(e)
+        print(f"❌ [{fonte}] Erro na etapa {state['etapa']}: {str(e)}")
+    return state
+
+
+def sync_sources(sources: List[Dict[str, str]], google_client: GoogleSheetsIntegration, supabase_client,
+                 max_workers: int = SYNC_MAX_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Sincroniza as fontes em paralelo (pool limitado a max_workers)
+
+    A sessão Google (credenciais e clientes) e o cliente Supabase são
+    compartilhados; o tempo dominante (download e upsert) é de rede.
+    """
+    workers = max(1, min(max_workers, len(sources)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sync') as pool:
+        return list(pool.map(lambda source: sync_source(source, google_client, supabase_client), sources))
+
+
+def main_multi(spec: str, max_workers: int = SYNC_MAX_WORKERS) -> int:
+    """Sincronização multi-fonte; retorna 0 só se todas as fontes foram gravadas"""
+    print("=" * 60)
+    print("🔄 SYNC DRIVE → SUPABASE (MULTI-FONTE)")
+    print("=" * 60)
+    print(f"Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+
+    try:
+        sources = load_sources(spec)
+        print(f"📋 {len(sources)} fontes: {', '.join(source['fonte'] for source in sources)}\n")
+
+        # Uma autenticação para todas as fontes
+        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'config/service-account.json')
+        google_client = GoogleSheetsIntegration(sources[0]['sheets_id'], credentials_path)
+        supabase_client = create_supabase_client()
+
+        start = time.perf_counter()
+        results = sync_sources(sources, google_client, supabase_client, max_workers)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"\n❌ ERRO FATAL: {str(e)}")
+        print("=" * 60)
+        return 1
+
+    print("\n" + "=" * 60)
+    for result in results:
+        icon = '✅' if result['status'] == 'ok' else '❌'
+        timings = ', '.join(f"{step} {ms:.0f} ms" for step, ms in result['tempos_ms'].items())
+        detail = result['erro'] if result['erro'] else f"{result['registros']} registros"
+        print(f"{icon} {result['fonte']}: {detail} ({timings})")
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"⏱️ {len(results)} fontes em {elapsed:.1f}s, {len(failed)} com erro")
+    print("=" * 60)
+    return 1 if failed else 0
+
+
 def main():
     """Função principal de sincronização"""
     print("=" * 60)
@@ -148,14 +339,14 @@ def main():
             raise Exception("GOOGLE_SHEETS_ID não configurado no .env")
         
         google_client = GoogleSheetsIntegration(sheets_id, credentials_path)
-        df = google_client.get_spreadsheet_data()
-        print(f"✅ Lidos {len(df)} registros do Drive\n")
         
-        # 2. Normaliza e mapeia colunas
+        # 2. Normaliza e mapeia colunas (várias abas: em paralelo, já na leitura)
+        raw_df, df = read_normalized(google_client, worksheets=SYNC_WORKSHEETS)
+        print(f"✅ Lidos {len(df)} registros do Drive\n")
         print("🔧 Normalizando dados...")
-        df = map_columns(df)
-        df = convert_data_types(df)
+        df = with_source(df, DEFAULT_SOURCE)
         print(f"✅ Colunas mapeadas: {', '.join(df.columns)}\n")
+        report_quality(raw_df, converted=df)
         
         # 3. Conecta ao Supabase
         print("🔗 Conectando ao Supabase...")
@@ -183,5 +374,15 @@ def main():
 
 
 if __name__ == '__main__':
-    exit_code = main()
+    parser = argparse.ArgumentParser(description='Sincroniza planilhas do Drive com a tabela chamados')
+    parser.add_argument('--sources', default=os.getenv('SYNC_SOURCES'),
+                        help="JSON de fontes ou 'fonte=ID;fonte2=ID2' (padrão: SYNC_SOURCES; vazio = GOOGLE_SHEETS_ID)")
+    parser.add_argument('--workers', type=int, default=SYNC_MAX_WORKERS, help='Fontes em paralelo')
+    args = parser.parse_args()
+
+    with sync_lock() as acquired:
+        if not acquired:
+            print(f"⏳ Outra sincronização em andamento (trava {SYNC_LOCK_PATH}); nada a fazer")
+            sys.exit(0)
+        exit_code = main_multi(args.sources, args.workers) if args.sources else main()
     sys.exit(exit_code)
@@ -0,0 +1,284 @@
+"""
+Agendador adaptativo da sincronização Drive → Supabase
+Responsável por:
+ - Consultar só a versão das planilhas no Drive (md5Checksum/modifiedTime) a cada
+   ciclo e sincronizar apenas as fontes que mudaram
+ - Adaptar o intervalo: volta ao mínimo depois de uma edição, cresce
+   (SYNC_BACKOFF_FACTOR) enquanto nada muda, até metade do intervalo típico
+   entre edições observado no histórico (limitado a SYNC_MAX_INTERVAL)
+ - Aplicar jitter ao intervalo (várias instâncias não consultam juntas)
+ - Usar a mesma trava de sync_drive_to_supabase.py: execuções nunca se sobrepõem
+ - Gravar cada ciclo (resultado, duração, próximo intervalo) em SYNC_HISTORY_PATH (JSONL)
+
+Uso:
+ - python sync_scheduler.py           # laço contínuo
+ - python sync_scheduler.py --once    # um ciclo, se já venceu o intervalo (ex.: cron a cada minuto)
+ - python sync_scheduler.py --history # últimos ciclos gravados
+
+Com o agendador ativo, desative o job do pg_cron (cron.unschedule('sync-drive-data-job')).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sync_drive_to_supabase import (
+    DEFAULT_SOURCE, SYNC_LOCK_PATH, SYNC_MAX_WORKERS, SYNC_WORKSHEETS,
+    load_sources, sync_lock, sync_sources
+)
+
+
+SYNC_MIN_INTERVAL = float(os.getenv('SYNC_MIN_INTERVAL', 60))
+SYNC_MAX_INTERVAL = float(os.getenv('SYNC_MAX_INTERVAL', 1800))
+SYNC_BACKOFF_FACTOR = float(os.getenv('SYNC_BACKOFF_FACTOR', 1.5))
+SYNC_JITTER = float(os.getenv('SYNC_JITTER', 0.1))
+SYNC_HISTORY_PATH = os.getenv('SYNC_HISTORY_PATH', os.path.join(tempfile.gettempdir(), 'techhelp_sync_history.jsonl'))
+# Ciclos mantidos no histórico (o arquivo é compactado ao passar do dobro)
+SYNC_HISTORY_MAX = int(os.getenv('SYNC_HISTORY_MAX', 500))
+
+# Resultados de um ciclo
+SYNCED, UNCHANGED, BUSY, FAILED = 'sincronizado', 'sem_alteracao', 'ocupado', 'erro'
+
+
+# ------------------------------------------------------------------- histórico
+def read_history(path: str = SYNC_HISTORY_PATH, limit: int = SYNC_HISTORY_MAX) -> List[Dict[str, Any]]:
+    """Últimos ciclos gravados (linhas inválidas são ignoradas)"""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records[-limit:]
+
+
+def append_history(record: Dict[str, Any], path: str = SYNC_HISTORY_PATH, max_records: int = SYNC_HISTORY_MAX):
+    """Acrescenta um ciclo; ao passar de 2 × max_records, reescreve só os últimos"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    with open(path, encoding='utf-8') as f:
+        total = sum(1 for _ in f)
+    if total > 2 * max_records:
+        records = read_history(path, max_records)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+        os.replace(tmp_path, path)
+
+
+# ------------------------------------------------------------------- intervalo
+def typical_change_gap(history: List[Dict[str, Any]]) -> Optional[float]:
+    """Mediana (segundos) do tempo entre ciclos que encontraram alterações"""
+    times = [datetime.fromisoformat(r['inicio']).timestamp() for r in history if r.get('resultado') == SYNCED]
+    gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+    return statistics.median(gaps) if gaps else None
+
+
+def next_interval(current: float, outcome: str, history: List[Dict[str, Any]],
+                  min_interval: float = SYNC_MIN_INTERVAL, max_interval: float = SYNC_MAX_INTERVAL,
+                  factor: float = SYNC_BACKOFF_FACTOR) -> float:
+    """
+    Próximo intervalo (sem jitter)
+
+    - sincronizado: volta ao mínimo (edições costumam vir em sequência)
+    - sem alteração / erro: multiplica por `factor`; sem alteração, o teto é metade
+      do intervalo típico entre edições (consulta ao menos 2× por edição)
+    - ocupado (outra execução com a trava): mantém
+    """
+    if outcome == SYNCED:
+        return min_interval
+    if outcome == BUSY:
+        return current
+    ceiling = max_interval
+    gap = typical_change_gap(history) if outcome == UNCHANGED else None
+    if gap is not None:
+        ceiling = min(max(gap / 2, min_interval), max_interval)
+    return min(max(current * factor, min_interval), ceiling)
+
+
+def with_jitter(interval: float, jitter: float = SYNC_JITTER) -> float:
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+
+# ---------------------------------------------------------------------- ciclos
+class SyncScheduler:
+    """
+    Estado do agendador: fontes, versões já sincronizadas e intervalo atual
+
+    Exemplo:
+        scheduler = SyncScheduler(sources)
+        record = scheduler.run_cycle()   # {'resultado': 'sincronizado', 'duracao_ms': ...}
+    """
+
+    def __init__(self, sources: List[Dict[str, str]], max_workers: int = SYNC_MAX_WORKERS,
+                 history_path: str = SYNC_HISTORY_PATH):
+        self.sources = sources
+        self.max_workers = max_workers
+        self.history_path = history_path
+        self.history = read_history(history_path)
+        # Versões sincronizadas com sucesso (retomadas do último ciclo gravado)
+        last = self.history[-1] if self.history else {}
+        self.versions: Dict[str, Optional[str]] = dict(last.get('versoes') or {})
+        self.interval = float(last.get('intervalo_s') or SYNC_MIN_INTERVAL)
+        self._google = None
+        self._supabase = None
+
+    def _google_client(self):
+        # Criados no primeiro ciclo que precisa deles (sessão Google compartilhada pelo processo)
+        if self._google is None:
+            from google_sheets import GoogleSheetsIntegration
+            credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'config/service-account.json')
+            self._google = GoogleSheetsIntegration(self.sources[0]['sheets_id'], credentials_path)
+        return self._google
+
+    def _supabase_client(self):
+        if self._supabase is None:
+            from supabase_client import create_supabase_client
+            self._supabase = create_supabase_client()
+        return self._supabase
+
+    def changed_sources(self) -> Dict[str, Optional[str]]:
+        """{fonte: versão atual} das fontes cuja versão difere da última sincronizada"""
+        google = self._google_client()
+        changed = {}
+        for source in self.sources:
+            version = google.get_file_version(source['sheets_id'])
+            # Sem versão no Drive: sincroniza (não há como saber se mudou)
+            if version is None or self.versions.get(source['fonte']) != version:
+                changed[source['fonte']] = version
+        return changed
+
+    def seconds_until_due(self) -> float:
+        """Segundos até o próximo ciclo (inicio + intervalo_s do último gravado); <= 0 = vencido"""
+        if not self.history:
+            return 0.0
+        last = self.history[-1]
+        try:
+            started = datetime.fromisoformat(last['inicio']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+        return started + float(last.get('intervalo_s') or 0) - time.time()
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Ciclo do --once: só executa se o intervalo do último ciclo já venceu
+
+        Antes disso devolve 'sem_alteracao' sem consultar o Drive nem gravar o
+        histórico - o cron a cada minuto respeita o backoff do agendador.
+        """
+        remaining = self.seconds_until_due()
+        if remaining > 0:
+            return {
+                'inicio': datetime.now().isoformat(), 'resultado': UNCHANGED, 'pulado': True,
+                'proximo_em_s': round(remaining, 1), 'intervalo_s': round(self.interval, 1)
+            }
+        return self.run_cycle()
+
+    def run_cycle(self) -> Dict[str, Any]:
+        """Um ciclo: trava, verifica versões, sincroniza o que mudou, grava o histórico"""
+        start = time.perf_counter()
+        record: Dict[str, Any] = {'inicio': datetime.now().isoformat(), 'fontes': []}
+
+        with sync_lock() as acquired:
+            if not acquired:
+                record['resultado'] = BUSY
+            else:
+                try:
+                    changed = self.changed_sources()
+                    if not changed:
+                        record['resultado'] = UNCHANGED
+                    else:
+                        targets = [s for s in self.sources if s['fonte'] in changed]
+                        results = sync_sources(targets, self._google_client(), self._supabase_client(), self.max_workers)
+                        for result in results:
+                            if result['status'] == 'ok':
+                                self.versions[result['fonte']] = changed[result['fonte']]
+                        record['fontes'] = [
+                            {k: r[k] for k in ('fonte', 'status', 'registros', 'tempos_ms', 'erro')} for r in results
+                        ]
+                        failed = [r for r in results if r['status'] != 'ok']
+                        record['resultado'] = FAILED if len(failed) == len(results) else SYNCED
+                        if failed:
+                            record['erro'] = '; '.join(f"{r['fonte']}: {r['erro']}" for r in failed)
+                except Exception as e:
+                    record['resultado'] = FAILED
+                    record['erro'] = str(e)
+
+        record['duracao_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self.history.append(record)
+        self.interval = next_interval(self.interval, record['resultado'], self.history)
+        record['intervalo_s'] = round(self.interval, 1)
+        record['versoes'] = self.versions
+        append_history(record, self.history_path)
+        self.history = self.history[-SYNC_HISTORY_MAX:]
+        return record
+
+    def run_forever(self):
+        """Laço contínuo até Ctrl+C"""
+        while True:
+            record = self.run_cycle()
+            delay = with_jitter(self.interval)
+            icon = {SYNCED: '✅', UNCHANGED: '💤', BUSY: '⏳', FAILED: '❌'}[record['resultado']]
+            detail = f" - {record['erro']}" if record.get('erro') else ''
+            print(f"{icon} {record['resultado']} em {record['duracao_ms']:.0f} ms{detail}; "
+                  f"próximo ciclo em {delay:.0f}s")
+            time.sleep(delay)
+
+
+def configured_sources(spec: str = None) -> List[Dict[str, str]]:
+    """Fontes de SYNC_SOURCES ou, sem elas, a planilha única GOOGLE_SHEETS_ID"""
+    if spec:
+        return load_sources(spec)
+    sheets_id = os.getenv('GOOGLE_SHEETS_ID')
+    if not sheets_id:
+        raise Exception("GOOGLE_SHEETS_ID não configurado no .env")
+    return [{'fonte': DEFAULT_SOURCE, 'sheets_id': sheets_id, 'aba': None, 'abas': SYNC_WORKSHEETS}]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Agendador adaptativo da sincronização Drive → Supabase')
+    parser.add_argument('--sources', default=os.getenv('SYNC_SOURCES'), help='Mesmo formato de sync_drive_to_supabase.py')
+    parser.add_argument('--workers', type=int, default=SYNC_MAX_WORKERS, help='Fontes em paralelo')
+    parser.add_argument('--once', action='store_true', help='Executa um único ciclo (se o intervalo já venceu)')
+    parser.add_argument('--history', type=int, nargs='?', const=20, help='Mostra os últimos N ciclos e sai')
+    args = parser.parse_args()
+
+    if args.history:
+        for record in read_history(limit=args.history):
+            print(f"{record['inicio']}  {record['resultado']:<14} {record['duracao_ms']:>9.0f} ms  "
+                  f"próximo: {record.get('intervalo_s', 0):.0f}s  {record.get('erro') or ''}")
+        return 0
+
+    try:
+        scheduler = SyncScheduler(configured_sources(args.sources), args.workers)
+    except Exception as e:
+        print(f"❌ ERRO FATAL: {str(e)}")
+        return 1
+
+    print(f"🕒 Agendador: {len(scheduler.sources)} fontes, intervalo {SYNC_MIN_INTERVAL:.0f}-{SYNC_MAX_INTERVAL:.0f}s, "
+          f"trava {SYNC_LOCK_PATH}, histórico {SYNC_HISTORY_PATH}")
+    if args.once:
+        record = scheduler.run_once()
+        if record.get('pulado'):
+            print(f"💤 Ciclo ainda não venceu: próximo em {record['proximo_em_s']:.0f}s")
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+        return 1 if record['resultado'] == FAILED else 0
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Agendador encerrado")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark da normalização por valores únicos (api/normalization.py)
+Compara com a implementação anterior (apply por linha / to_datetime sem formato)
+
+Uso:
+ - python benchmarks/bench_normalization.py
+ - python benchmarks/bench_normalization.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from normalization import normalize_duracao, normalize_satisfacao, normalize_status, parse_dates  # noqa: E402
+
+
+LEGACY_SATISF_MAP = {
+    'ruim': 1, 'regular': 2, 'medio': 3, 'médio': 3,
+    'bom': 4, 'otimo': 5, 'ótimo': 5, 'excelente': 5
+}
+
+
+def legacy_satisfacao(series: pd.Series) -> pd.Series:
+    """Implementação anterior: apply por linha + to_numeric"""
+    result = series.apply(
+        lambda x: LEGACY_SATISF_MAP.get(str(x).strip().lower(), x) if pd.notna(x) else x
+    )
+    return pd.to_numeric(result, errors='coerce')
+
+
+def legacy_status(series: pd.Series) -> pd.Series:
+    """Implementação anterior: lower/strip por linha"""
+    return series.astype(str).str.lower().str.strip()
+
+
+def legacy_dates(series: pd.Series) -> pd.Series:
+    """Implementação anterior: to_datetime sem formato"""
+    return pd.to_datetime(series, errors='coerce')
+
+
+def legacy_duracao(series: pd.Series) -> pd.Series:
+    """Implementação anterior: to_numeric + median() na série inteira"""
+    result = pd.to_numeric(series, errors='coerce')
+    if result.median() > 100:
+        result = result / 60.0
+    return result
+
+
+def make_columns(n_rows: int, seed: int = 42) -> dict:
+    """Colunas sintéticas com a cardinalidade típica de uma planilha de chamados"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2024-01-01', periods=365, freq='D').strftime('%d/%m/%Y').to_numpy()
+    return {
+        'satisfacao': pd.Series(rng.choice(['Ótimo', 'Bom', 'Regular', 'Ruim', 'Excelente', None], n_rows)),
+        'status': pd.Series(rng.choice(['Concluído', 'Em andamento', 'Aberto', 'Pendente', 'Resolvido'], n_rows)),
+        'data_abertura': pd.Series(rng.choice(days, n_rows)),
+        'tempo_resolucao': pd.Series(rng.integers(5, 600, n_rows).astype(str)),
+    }
+
+
+def timeit(func, series: pd.Series, repeat: int) -> float:
+    """Melhor tempo (ms) entre `repeat` execuções"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(series)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+CASES = [
+    ('satisfacao', legacy_satisfacao, normalize_satisfacao),
+    ('status', legacy_status, normalize_status),
+    ('data_abertura', legacy_dates, parse_dates),
+    ('tempo_resolucao', legacy_duracao, lambda s: normalize_duracao(s, detect_minutes=True)),
+]
+
+
+def run(n_rows: int, repeat: int = 3) -> list:
+    columns = make_columns(n_rows)
+    results = []
+    for column, legacy, kernel in CASES:
+        series = columns[column]
+        legacy_ms = timeit(legacy, series, repeat)
+        kernel_ms = timeit(kernel, series, repeat)
+        results.append({
+            'column': column,
+            'rows': n_rows,
+            'legacy_ms': round(legacy_ms, 2),
+            'kernel_ms': round(kernel_ms, 2),
+            'speedup': round(legacy_ms / kernel_ms, 1) if kernel_ms else None
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da normalização por valores únicos')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🧪 Normalização - {args.rows:,} linhas (melhor de {args.repeat})")
+    print(f"{'coluna':<18}{'anterior (ms)':>15}{'kernel (ms)':>14}{'speedup':>10}")
+    for result in run(args.rows, args.repeat):
+        print(f"{result['column']:<18}{result['legacy_ms']:>15.2f}{result['kernel_ms']:>14.2f}{result['speedup']:>9}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Suíte de microbenchmarks dos caminhos quentes do processamento de chamados
+Cobre:
+ - utils.data_processor.DataProcessor: clean_dataframe, detect_trends,
+   validate_data_quality, generate_performance_metrics
+ - _convert_data_types / _calculate_metrics de GoogleSheetsIntegration e SupabaseIntegration
+ - sync_drive_to_supabase: map_columns e convert_data_types
+
+Cada caso roda em 1k, 100k e 1M linhas (dados de benchmarks/synthetic.py).
+Os resultados são gravados em JSON (benchmarks/results/) para comparar execuções.
+
+Uso:
+ - python benchmarks/bench_pipelines.py
+ - python benchmarks/bench_pipelines.py --sizes 1000 100000 --case supabase
+ - python benchmarks/bench_pipelines.py --compare benchmarks/results/anterior.json
+ - python benchmarks/bench_pipelines.py --case clean_dataframe --memory
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.normpath(os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'api'))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import make_chamados, make_raw_chamados  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+class Case:
+    """
+    Caso de benchmark
+
+    setup(dados) prepara o argumento de cada execução (fora da medição),
+    pois vários métodos alteram o DataFrame recebido.
+    """
+
+    def __init__(self, name: str, func: Callable, dataset: str, setup: Callable = None):
+        self.name = name
+        self.func = func
+        self.dataset = dataset
+        self.setup = setup or (lambda df: df.copy())
+
+
+def _google_integration():
+    """GoogleSheetsIntegration sem autenticação (apenas os métodos de processamento)"""
+    from google_sheets import GoogleSheetsIntegration
+    return GoogleSheetsIntegration.__new__(GoogleSheetsIntegration)
+
+
+def _supabase_integration():
+    """SupabaseIntegration sem conexão (apenas os métodos de processamento)"""
+    from supabase_client import SupabaseIntegration
+    return SupabaseIntegration.__new__(SupabaseIntegration)
+
+
+def _schema_mapped(df: pd.DataFrame) -> pd.DataFrame:
+    from column_schema import apply_column_schema
+    return apply_column_schema(df.copy())
+
+
+def build_cases() -> List[Case]:
+    """Casos da suíte (datasets: 'raw' = planilha, 'normalized' = tabela do banco)"""
+    from utils.data_processor import DataProcessor
+    import sync_drive_to_supabase as sync
+
+    google = _google_integration()
+    supabase = _supabase_integration()
+
+    return [
+        Case('data_processor.clean_dataframe', DataProcessor.clean_dataframe, 'raw'),
+        Case('data_processor.detect_trends', DataProcessor.detect_trends, 'normalized'),
+        Case('data_processor.validate_data_quality', DataProcessor.validate_data_quality, 'normalized',
+             setup=lambda df: df),
+        Case('data_processor.generate_performance_metrics', DataProcessor.generate_performance_metrics,
+             'normalized', setup=lambda df: df),
+        Case('google_sheets._convert_data_types', google._convert_data_types, 'raw', setup=_schema_mapped),
+        Case('google_sheets._calculate_metrics', google._calculate_metrics, 'normalized'),
+        Case('supabase_client._convert_data_types', supabase._convert_data_types, 'raw', setup=_schema_mapped),
+        Case('supabase_client._calculate_metrics', supabase._calculate_metrics, 'normalized'),
+        Case('sync.map_columns', sync.map_columns, 'raw'),
+        Case('sync.convert_data_types', sync.convert_data_types, 'raw', setup=_schema_mapped),
+    ]
+
+
+def _proc_status_mb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) // 1024
+    raise KeyError(field)
+
+
+def _release_memory():
+    """Devolve ao sistema a memória livre retida (senão o pico não sobe ao reaproveitá-la)"""
+    gc.collect()
+    try:
+        import pyarrow as pa
+        pa.default_memory_pool().release_unused()
+    except ImportError:
+        pass
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def peak_memory_mb(case: Case, data: pd.DataFrame) -> Optional[float]:
+    """
+    Pico de memória residente (MB) acima do início da execução
+
+    Zera o pico do processo (VmHWM, Linux) antes da chamada; mede também a
+    memória do Arrow, que o tracemalloc não enxerga. None fora do Linux.
+    """
+    if not os.path.exists('/proc/self/clear_refs'):
+        return None
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        arg = case.setup(data)
+        _release_memory()
+        try:
+            baseline = _proc_status_mb('VmRSS')
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            return None
+        case.func(arg)
+        return float(_proc_status_mb('VmHWM') - baseline)
+
+
+def time_case(case: Case, data: pd.DataFrame, repeat: int) -> Dict[str, float]:
+    """Executa o caso `repeat` vezes; retorna melhor e mediana (ms)"""
+    samples = []
+    # Os prints dos métodos medidos vão para /dev/null
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            arg = case.setup(data)
+            start = time.perf_counter()
+            case.func(arg)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {'best_ms': round(samples[0], 3), 'median_ms': round(samples[len(samples) // 2], 3)}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(sizes: List[int], repeat: int, selected: List[str] = None, memory: bool = False) -> Dict:
+    """Roda os casos selecionados em todos os tamanhos"""
+    cases = [c for c in build_cases() if not selected or any(s in c.name for s in selected)]
+    results = []
+    for n_rows in sizes:
+        datasets = {'raw': make_raw_chamados(n_rows), 'normalized': make_chamados(n_rows)}
+        # 1M linhas: uma execução basta (cada caso leva segundos)
+        runs = repeat if n_rows < 1_000_000 else 1
+        for case in cases:
+            timing = time_case(case, datasets[case.dataset], runs)
+            peak = ''
+            if memory:
+                timing['peak_mb'] = peak_memory_mb(case, datasets[case.dataset])
+                if timing['peak_mb'] is not None:
+                    peak = f"{timing['peak_mb']:>10.0f} MB"
+            results.append({'case': case.name, 'rows': n_rows, 'runs': runs, **timing})
+            print(f"  {case.name:<48}{n_rows:>10,}{timing['best_ms']:>12.2f} ms{peak}")
+
+    return {
+        'suite': 'pipelines',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': results
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> List[Dict]:
+    """Compara melhor tempo de cada (caso, linhas) com uma execução anterior"""
+    previous = {(r['case'], r['rows']): r['best_ms'] for r in baseline.get('results', [])}
+    rows = []
+    for r in current['results']:
+        before = previous.get((r['case'], r['rows']))
+        if before:
+            rows.append({'case': r['case'], 'rows': r['rows'], 'before_ms': before,
+                         'after_ms': r['best_ms'], 'ratio': round(r['best_ms'] / before, 2)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks do processamento de chamados')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--case', action='append', help='Filtra casos por trecho do nome')
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: benchmarks/results/pipelines-<data>.json)')
+    parser.add_argument('--memory', action='store_true', help='Mede também o pico de memória de cada caso')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparação')
+    args = parser.parse_args()
+
+    print(f"🧪 Benchmarks do pipeline ({', '.join(f'{n:,}' for n in args.sizes)} linhas)")
+    report = run_suite(args.sizes, args.repeat, args.case, args.memory)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"pipelines-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados gravados em {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"📊 Comparação com {args.compare} (razão < 1 = mais rápido)")
+        for row in compare(report, baseline):
+            flag = '⚠️' if row['ratio'] > 1.1 else '✅'
+            print(f"  {row['case']:<48}{row['rows']:>10,}{row['before_ms']:>12.2f}{row['after_ms']:>12.2f}"
+                  f"{row['ratio']:>8.2f}x {flag}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Relatório de tempo de import (python -X importtime) por pacote
+Mostra quanto cada pacote custa no carregamento de um módulo da API
+
+Uso:
+ - python benchmarks/import_time.py                 # api/index.py
+ - python benchmarks/import_time.py --module app     # api/app.py
+ - python benchmarks/import_time.py --top 15 --json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+API_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+# "import time:       123 |        456 |     package.module"
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)')
+
+
+def collect_import_times(module: str, statement: str = None) -> List[Dict]:
+    """
+    Executa `import <module>` em um processo novo com -X importtime
+
+    Returns:
+        Lista de entradas {'name', 'self_us', 'cumulative_us', 'depth'}
+    """
+    code = statement or f'import {module}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            entries.append({
+                'name': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': (len(match.group(3)) - 1) // 2
+            })
+    return entries
+
+
+def summarize_by_package(entries: List[Dict]) -> List[Dict]:
+    """Soma o tempo próprio (self) de todos os módulos de cada pacote de topo"""
+    totals = defaultdict(lambda: {'self_us': 0, 'modules': 0})
+    for entry in entries:
+        package = entry['name'].split('.')[0]
+        totals[package]['self_us'] += entry['self_us']
+        totals[package]['modules'] += 1
+
+    summary = [
+        {'package': package, 'self_ms': round(info['self_us'] / 1000, 2), 'modules': info['modules']}
+        for package, info in totals.items()
+    ]
+    return sorted(summary, key=lambda item: item['self_ms'], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de import por pacote (python -X importtime)')
+    parser.add_argument('--module', default='index', help='Módulo em api/ (padrão: index)')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    args = parser.parse_args()
+
+    entries = collect_import_times(args.module)
+    summary = summarize_by_package(entries)
+    total_ms = round(sum(entry['self_us'] for entry in entries) / 1000, 2)
+
+    if args.json:
+        print(json.dumps({'module': args.module, 'total_ms': total_ms, 'packages': summary}, indent=2))
+        return
+
+    print(f"📦 import {args.module}: {total_ms} ms em {len(entries)} módulos")
+    print(f"{'pacote':<28}{'self (ms)':>12}{'módulos':>10}")
+    for item in summary[:args.top]:
+        print(f"{item['package']:<28}{item['self_ms']:>12.2f}{item['modules']:>10}")
+
+
+if __name__ == '__main__':
+    main()
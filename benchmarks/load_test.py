@@ -0,0 +1,245 @@
+"""
+Teste de carga HTTP da API contra o PostgREST fictício (sem tocar no Supabase real)
+Sobe benchmarks/fake_postgrest.py, inicia api/app.py, api/index.py e/ou
+api/asgi.py (uvicorn) em processos separados apontando para ele e dispara
+clientes concorrentes.
+
+Relata, por alvo e modo de cache: throughput, latência p50/p95/p99,
+status HTTP e quantas consultas chegaram ao "Supabase".
+
+Uso:
+ - python benchmarks/load_test.py
+ - python benchmarks/load_test.py --target index --cache off --clients 20 --requests 500
+ - python benchmarks/load_test.py --target app asgi --cache off --clients 50 --rows 20000
+ - python benchmarks/load_test.py --rows 20000 --latency-ms 120 --jitter-ms 40 --error-rate 0.05 --json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.normpath(os.path.join(BENCH_DIR, '..', 'api'))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_postgrest import FAKE_SUPABASE_KEY, start_server  # noqa: E402
+
+# Executado no processo filho: servidor de desenvolvimento com threads
+_SERVE = r'''
+import sys
+module = __import__(sys.argv[1])
+module.app.run(host='127.0.0.1', port=int(sys.argv[2]), threaded=True, use_reloader=False)
+'''
+
+# App ASGI: um worker uvicorn (um event loop)
+_SERVE_ASGI = r'''
+import sys
+import uvicorn
+uvicorn.run(sys.argv[1] + ':app', host='127.0.0.1', port=int(sys.argv[2]), log_level='warning')
+'''
+
+TARGETS = ['app', 'index', 'asgi']
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _fake_stats(url: str) -> Dict:
+    with urllib.request.urlopen(f'{url}/__fake/stats') as response:
+        return json.loads(response.read())
+
+
+class ApiProcess:
+    """Processo da API (app.py, index.py ou asgi.py) apontando para o PostgREST fictício"""
+
+    def __init__(self, module: str, supabase_url: str, cache: bool, workdir: str):
+        self.module = module
+        self.port = _free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.stderr = open(os.path.join(workdir, f'{module}-{self.port}.log'), 'w+')
+        env = dict(
+            os.environ,
+            SUPABASE_URL=supabase_url,
+            SUPABASE_KEY=FAKE_SUPABASE_KEY,
+            CACHE_TIMEOUT='300' if cache else '0',
+            SNAPSHOT_PATH=os.path.join(workdir, f'{module}-{self.port}.arrow'),
+            PYTHONDONTWRITEBYTECODE='1'
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', _SERVE_ASGI if module == 'asgi' else _SERVE, module, str(self.port)],
+            cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=self.stderr
+        )
+
+    def wait_ready(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(f'{self.base_url}/api/health', timeout=1):
+                    return
+            except urllib.error.HTTPError:
+                # Servidor no ar (o health de app.py pode falhar se o Supabase falhar)
+                return
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.1)
+        self.stderr.seek(0)
+        raise RuntimeError(f'{self.module} não iniciou:\n{self.stderr.read()[-2000:]}')
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.stderr.close()
+
+
+def drive(url: str, clients: int, total_requests: int, timeout: float = 60.0) -> Dict:
+    """Dispara `total_requests` GETs divididos entre `clients` threads"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    sizes: List[int] = []
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    body = response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                body = e.read()
+                status = e.code
+            except Exception:
+                body = b''
+                status = 'falha'
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+                sizes.append(len(body))
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+        'p99_ms': round(_percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        'status': {str(k): v for k, v in statuses.items()},
+        'avg_bytes': int(sum(sizes) / len(sizes)) if sizes else 0
+    }
+
+
+def run(targets: List[str], cache_modes: List[bool], args) -> List[Dict]:
+    server = start_server(
+        rows=args.rows, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status
+    )
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for module in targets:
+                for cache in cache_modes:
+                    api = ApiProcess(module, server.url, cache, workdir)
+                    try:
+                        api.wait_ready()
+                        url = f'{api.base_url}{args.path}'
+                        # Aquecimento: imports preguiçosos e (com cache) primeira carga
+                        drive(url, 1, args.warmup)
+                        before = _fake_stats(server.url)['requests']
+                        result = drive(url, args.clients, args.requests)
+                        result['upstream_requests'] = _fake_stats(server.url)['requests'] - before
+                    finally:
+                        api.stop()
+                    result.update({'target': module, 'cache': 'on' if cache else 'off', 'path': args.path,
+                                   'clients': args.clients})
+                    results.append(result)
+                    if not args.json:
+                        _print_row(result)
+    finally:
+        server.shutdown()
+    return results
+
+
+def _print_header(args):
+    print(f"🚀 Teste de carga: {args.clients} clientes, {args.requests} requisições, {args.rows:,} chamados, "
+          f"latência Supabase {args.latency_ms}±{args.jitter_ms} ms, erros {args.error_rate:.0%}")
+    print(f"{'alvo':<8}{'cache':<7}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'supabase':>10}  status")
+
+
+def _print_row(r: Dict):
+    status = ', '.join(f'{k}×{v}' for k, v in sorted(r['status'].items()))
+    print(f"{r['target']:<8}{r['cache']:<7}{r['throughput_rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+          f"{r['p99_ms']:>10}{r['upstream_requests']:>10}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga da API com PostgREST fictício')
+    parser.add_argument('--target', nargs='+', choices=TARGETS + ['both', 'all'], default=['both'],
+                        help="Alvos; 'both' = app e index, 'all' = todos")
+    parser.add_argument('--cache', choices=['on', 'off', 'both'], default='both')
+    parser.add_argument('--path', default='/api/chamados')
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    args = parser.parse_args()
+
+    targets = []
+    for target in args.target:
+        expanded = {'both': ['app', 'index'], 'all': TARGETS}.get(target, [target])
+        targets.extend(t for t in expanded if t not in targets)
+    cache_modes = [True, False] if args.cache == 'both' else [args.cache == 'on']
+
+    if not args.json:
+        _print_header(args)
+    results = run(targets, cache_modes, args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
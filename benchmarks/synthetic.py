@@ -0,0 +1,98 @@
+"""
+Dados sintéticos de chamados para benchmarks e testes de carga
+Gera tabelas com a cardinalidade típica da planilha da TechHelp
+(poucos técnicos/categorias/status, datas em um ano, notas textuais e numéricas)
+
+ - make_raw_chamados: formato da planilha (cabeçalhos originais, tudo texto)
+ - make_chamados: formato normalizado da tabela chamados (nomes do banco, tipos convertidos)
+ - make_chamados_records: lista de dicts como as respostas do Supabase/PostgREST
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+TECNICOS = ['João Silva', 'Maria Santos', 'Carlos Oliveira', 'Ana Costa', 'Pedro Ferreira',
+            'Juliana Lima', 'Rafael Souza', 'Beatriz Rocha']
+CATEGORIAS = ['Hardware', 'Software', 'Rede', 'Sistema', 'Usuario', 'Impressora', 'Acesso']
+STATUS = ['Concluído', 'Resolvido', 'Fechado', 'Em andamento', 'Aberto', 'Pendente']
+STATUS_WEIGHTS = [0.35, 0.15, 0.1, 0.15, 0.15, 0.1]
+SATISFACAO_TEXTO = ['Ótimo', 'Bom', 'Regular', 'Ruim', 'Excelente', '']
+PRIORIDADES = ['Baixa', 'Média', 'Alta', 'Crítica']
+
+# Cabeçalhos como aparecem na planilha exportada
+RAW_HEADERS = {
+    'id_chamado': 'ID Chamado',
+    'data_abertura': 'Data de Abertura',
+    'data_fechamento': 'Data de Fechamento',
+    'tecnico': 'Agente Responsável',
+    'categoria': 'Categoria',
+    'status': 'Status',
+    'prioridade': 'Prioridade',
+    'tempo_resolucao': 'TMA (minutos)',
+    'satisfacao': 'Satisfação do Cliente',
+}
+
+
+def _base_columns(n_rows: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    abertura = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n_rows), unit='m')
+    minutos = rng.gamma(2.0, 180.0, n_rows).round().astype(np.int64) + 5
+    status = rng.choice(STATUS, n_rows, p=STATUS_WEIGHTS)
+    fechado = np.isin(status, ['Concluído', 'Resolvido', 'Fechado'])
+    fechamento = abertura + pd.to_timedelta(minutos, unit='m')
+    return {
+        'id_chamado': np.char.add('TH', np.char.zfill(np.arange(1, n_rows + 1).astype(str), 7)),
+        'data_abertura': abertura,
+        'data_fechamento': pd.Series(fechamento).where(fechado),
+        'tecnico': rng.choice(TECNICOS, n_rows),
+        'categoria': rng.choice(CATEGORIAS, n_rows),
+        'status': status,
+        'prioridade': rng.choice(PRIORIDADES, n_rows),
+        'minutos': minutos,
+        'satisfacao_texto': rng.choice(SATISFACAO_TEXTO, n_rows),
+        'satisfacao_nota': rng.choice([1, 2, 3, 4, 5, np.nan], n_rows, p=[0.05, 0.1, 0.15, 0.35, 0.25, 0.1]),
+    }
+
+
+def make_raw_chamados(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Chamados no formato da planilha: cabeçalhos originais e valores em texto"""
+    base = _base_columns(n_rows, seed)
+    fechamento = pd.Series(base['data_fechamento'])
+    return pd.DataFrame({
+        RAW_HEADERS['id_chamado']: base['id_chamado'],
+        RAW_HEADERS['data_abertura']: pd.Series(base['data_abertura']).dt.strftime('%d/%m/%Y %H:%M'),
+        RAW_HEADERS['data_fechamento']: fechamento.dt.strftime('%d/%m/%Y %H:%M').fillna(''),
+        RAW_HEADERS['tecnico']: base['tecnico'],
+        RAW_HEADERS['categoria']: base['categoria'],
+        RAW_HEADERS['status']: base['status'],
+        RAW_HEADERS['prioridade']: base['prioridade'],
+        RAW_HEADERS['tempo_resolucao']: base['minutos'].astype(str),
+        RAW_HEADERS['satisfacao']: base['satisfacao_texto'],
+    })
+
+
+def make_chamados(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Chamados no formato da tabela do banco (datas convertidas, tempo em horas)"""
+    base = _base_columns(n_rows, seed)
+    return pd.DataFrame({
+        'id_chamado': base['id_chamado'],
+        'data_abertura': base['data_abertura'],
+        'data_fechamento': base['data_fechamento'],
+        'tecnico': base['tecnico'],
+        'categoria': base['categoria'],
+        'status': base['status'],
+        'prioridade': base['prioridade'],
+        'tempo_resolucao': (base['minutos'] / 60.0).round(2),
+        'satisfacao': base['satisfacao_nota'],
+    })
+
+
+def make_chamados_records(n_rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Chamados como lista de dicts (formato JSON das respostas do Supabase)"""
+    df = make_chamados(n_rows, seed)
+    for col in ('data_abertura', 'data_fechamento'):
+        df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
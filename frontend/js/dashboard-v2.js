@@ -18,6 +18,14 @@ class TechHelpDashboard {
         
         this.data = null;
         this.charts = {};
+        this.eventSource = null;
+        this.pollTimer = null;
+        // Stream SSE (api/index.py na Vercel, api/asgi.py em servidor próprio); desative com
+        // <meta name="techhelp-stream" content="off"> para usar só o polling
+        const streamMeta = document.querySelector('meta[name="techhelp-stream"]');
+        this.streamEnabled = !streamMeta || streamMeta.content !== 'off';
+        this.streamRetryDelay = 60 * 1000;
+        this.streamRetryTimer = null;
         this.filters = {
             tecnicoPeriod: 'all',
             categoriaType: 'doughnut'  // Chart.js v4 usa 'doughnut' não 'donut'
@@ -37,8 +45,67 @@ class TechHelpDashboard {
         // Carregar dados iniciais
         await this.loadData();
         
+        // Atualizações ao vivo (SSE); sem stream, polling de 5 minutos
+        this.startLiveUpdates();
+    }
+
+    // ===== Atualizações ao vivo =====
+    startLiveUpdates() {
+        this.streamRetryTimer = null;
+        if (!this.streamEnabled || !window.EventSource) {
+            this.startPolling();
+            return;
+        }
+
+        const source = new EventSource(`${this.apiUrl}/chamados/stream`);
+        this.eventSource = source;
+
+        // O servidor só envia 'payload' quando os dados mudam
+        source.addEventListener('payload', (event) => {
+            try {
+                this.applyData(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Erro ao processar atualização ao vivo:', error);
+            }
+        });
+
+        source.addEventListener('open', () => {
+            console.log('📡 Atualizações ao vivo conectadas');
+            this.streamRetryDelay = 60 * 1000;
+            this.stopPolling();
+        });
+
+        source.addEventListener('error', () => {
+            // CLOSED = servidor sem stream (ex.: 404, reinício); CONNECTING = o navegador reconecta sozinho
+            if (source.readyState === EventSource.CLOSED) {
+                source.close();
+                this.eventSource = null;
+                this.startPolling();
+                this.scheduleStreamRetry();
+            }
+        });
+    }
+
+    scheduleStreamRetry() {
+        // Polling enquanto isso; nova tentativa com espera dobrando até 15 minutos
+        if (this.streamRetryTimer) return;
+        const delay = this.streamRetryDelay;
+        console.warn(`📡 Stream indisponível, usando polling (nova tentativa em ${Math.round(delay / 1000)}s)`);
+        this.streamRetryDelay = Math.min(delay * 2, 15 * 60 * 1000);
+        this.streamRetryTimer = setTimeout(() => this.startLiveUpdates(), delay);
+    }
+
+    startPolling() {
+        if (this.pollTimer) return;
         // Auto-refresh a cada 5 minutos
-        setInterval(() => this.loadData(true), 5 * 60 * 1000);
+        this.pollTimer = setInterval(() => this.loadData(true), 5 * 60 * 1000);
+    }
+
+    stopPolling() {
+        if (this.pollTimer) {
+            clearInterval(this.pollTimer);
+            this.pollTimer = null;
+        }
     }
 
     // ===== Tema e Utilidades =====
@@ -120,21 +187,27 @@ class TechHelpDashboard {
             
             console.log('Carregando dados da API...');
             
-            const response = await fetch(`${this.apiUrl}/chamados`);
+            // Atualização silenciosa: pede só o que mudou desde a versão que já temos
+            const versao = silent && this.data ? this.data.versao : undefined;
+            const url = versao ? `${this.apiUrl}/chamados?since=${versao}` : `${this.apiUrl}/chamados`;
+            const response = await fetch(url);
             
             if (!response.ok) {
                 throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
             }
             
-            this.data = await response.json();
-            
-            console.log('Dados carregados:', this.data);
-            
-            // Atualizar UI
-            this.updateKPIs();
-            this.createCharts();
-            this.updateLastUpdate();
-            this.hideError();
+            const body = await response.json();
+            if (!body.delta) {
+                this.applyData(body);
+            } else if (body.unchanged) {
+                console.log('Dados sem alterações (versão', body.versao, ')');
+            } else if (this.data && body.base === this.data.versao) {
+                this.applyData(this.mergeDelta(body));
+            } else {
+                // Delta sobre outra versão: busca o payload completo
+                this.data = null;
+                await this.loadData(silent);
+            }
             
         } catch (error) {
             console.error('Erro ao carregar dados:', error);
@@ -144,6 +217,47 @@ class TechHelpDashboard {
         }
     }
 
+    applyData(data) {
+        this.data = data;
+        
+        console.log('Dados carregados:', this.data);
+        
+        // Atualizar UI
+        this.updateKPIs();
+        this.createCharts();
+        this.updateLastUpdate();
+        this.hideError();
+    }
+
+    // Aplica a resposta incremental (?since=) sobre o payload atual
+    mergeDelta(delta) {
+        const data = { ...this.data, ...(delta.kpis || {}) };
+        (delta.removed_fields || []).forEach(field => delete data[field]);
+
+        Object.entries(delta.counts || {}).forEach(([field, diff]) => {
+            const counts = { ...(data[field] || {}) };
+            diff.removed.forEach(key => delete counts[key]);
+            data[field] = Object.assign(counts, diff.set);
+        });
+
+        if (delta.tabela) {
+            const rowKey = row => {
+                const id = row.id_chamado ?? row.id;
+                return id == null ? JSON.stringify(row) : (row.fonte ? `${row.fonte}/${id}` : String(id));
+            };
+            const removed = new Set(delta.tabela.removed.map(String));
+            let rows = (data.tabela || []).filter(row => !removed.has(rowKey(row))).concat(delta.tabela.inserted);
+            if (delta.tabela.order) {
+                const byKey = new Map(rows.map(row => [rowKey(row), row]));
+                rows = delta.tabela.order.map(key => byKey.get(String(key))).filter(Boolean);
+            }
+            data.tabela = rows;
+        }
+
+        data.versao = delta.versao;
+        return data;
+    }
+
     // ========= Helpers de formatação =========
     formatNumber(value) {
         try { return Number(value || 0).toLocaleString('pt-BR'); } catch { return String(value); }
@@ -161,6 +275,7 @@ class TechHelpDashboard {
             btn.disabled = true;
         }
         
+        await this.runRefreshJob();
         await this.loadData();
         
         if (btn) {
@@ -169,6 +284,28 @@ class TechHelpDashboard {
         }
     }
 
+    // Pede a atualização no servidor (job em segundo plano) e espera terminar.
+    // Sem a rota (Vercel) ou com erro, só recarrega os dados.
+    async runRefreshJob(timeoutMs = 60000) {
+        try {
+            const response = await fetch(`${this.apiUrl}/chamados/refresh`, { method: 'POST' });
+            if (response.status !== 202) return;
+            const { job_id: jobId } = await response.json();
+
+            const deadline = Date.now() + timeoutMs;
+            while (Date.now() < deadline) {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                const job = await (await fetch(`${this.apiUrl}/chamados/refresh/${jobId}`)).json();
+                if (job.status === 'concluido' || job.status === 'erro') {
+                    console.log('Atualização', job.status, job.fases_ms || {}, job.erro || '');
+                    return;
+                }
+            }
+        } catch (error) {
+            console.warn('Atualização no servidor indisponível:', error);
+        }
+    }
+
     updateKPIs() {
         if (!this.data) return;
 
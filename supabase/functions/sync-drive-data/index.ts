@@ -6,7 +6,12 @@ import { createClient } from "https://esm.sh/@supabase/supabase-js@2.39.3";
 
 const GOOGLE_SHEETS_API = "https://sheets.googleapis.com/v4/spreadsheets";
 
+// Fonte dos registros: a chave primária é (fonte, id_chamado) - migração 20250106.
+// Mesmo padrão de SYNC_SOURCE_NAME no sync de planilha única (api/sync_drive_to_supabase.py)
+const SOURCE_NAME = Deno.env.get("SYNC_SOURCE_NAME") || "principal";
+
 interface ChamadoRow {
+  fonte: string;
   id_chamado: string;
   data_abertura: string | null;
   data_fechamento: string | null;
@@ -22,53 +27,67 @@ interface ChamadoRow {
   satisfacao: number | null;
 }
 
-// Função para normalizar nomes de colunas
+// Variações (já normalizadas) → nome padrão do banco.
+// Mesma tabela de api/column_schema.py (COLUMN_ALIASES) - mantenha as duas sincronizadas.
+// A ordem das variações define a prioridade quando mais de uma está presente.
+const COLUMN_ALIASES: Record<string, string[]> = {
+  id_chamado: ["id_chamado", "id", "chamado_id", "numero", "id_do_chamado"],
+  data_abertura: ["data_abertura", "abertura", "data_inicio", "data_de_abertura"],
+  data_fechamento: ["data_fechamento", "fechamento", "data_fim", "data_de_fechamento"],
+  tecnico: ["tecnico", "responsavel", "atendente", "agente_responsavel", "agente"],
+  categoria: ["categoria", "tipo", "classificacao", "motivo", "motivo_categoria"],
+  status: ["status", "situacao", "estado"],
+  tempo_resolucao: ["tempo_resolucao", "tempo", "duracao", "tma_minutos"],
+  frt_minutos: ["frt_minutos"],
+  satisfacao: ["satisfacao", "nota", "avaliacao", "satisfacao_do_cliente"],
+  solicitante: ["solicitante", "cliente", "usuario"],
+  departamento: ["departamento", "area", "setor"],
+  prioridade: ["prioridade", "urgencia"],
+  solucao: ["solucao", "resolucao", "descricao_solucao"],
+};
+
+const DIACRITICS_RE = /[\u0300-\u036f]/g;
+const NON_ALNUM_RE = /[^a-z0-9]+/g;
+const EDGE_UNDERSCORES_RE = /^_+|_+$/g;
+
+// Função para normalizar nomes de colunas (mesma regra de normalize_column_name no Python)
 function normalizeColumnName(text: string): string {
-  return text
+  return String(text)
+    .normalize("NFKD")
+    .replace(DIACRITICS_RE, "") // Remove acentos
+    .trim()
     .toLowerCase()
-    .normalize("NFD")
-    .replace(/[\u0300-\u036f]/g, "") // Remove acentos
-    .replace(/[^a-z0-9]+/g, "_")
-    .replace(/^_+|_+$/g, "");
+    .replace(NON_ALNUM_RE, "_")
+    .replace(EDGE_UNDERSCORES_RE, "");
 }
 
+// Planos já resolvidos, por sequência de cabeçalhos
+const columnPlanCache = new Map<string, Record<string, number>>();
+
 // Mapear colunas do Google Sheets para schema do banco
 function mapColumns(headers: string[]): Record<string, number> {
-  const mapping: Record<string, number> = {};
-  
+  const cacheKey = headers.join("\u0000");
+  const cached = columnPlanCache.get(cacheKey);
+  if (cached) return cached;
+
+  const positions = new Map<string, number>();
   headers.forEach((header, index) => {
     const normalized = normalizeColumnName(header);
-    
-    // Mapeamento de variações de nomes
-    if (normalized.includes("id") && normalized.includes("chamado")) {
-      mapping["id_chamado"] = index;
-    } else if (normalized.includes("data") && normalized.includes("abertura")) {
-      mapping["data_abertura"] = index;
-    } else if (normalized.includes("data") && normalized.includes("fechamento")) {
-      mapping["data_fechamento"] = index;
-    } else if (normalized === "status") {
-      mapping["status"] = index;
-    } else if (normalized === "prioridade") {
-      mapping["prioridade"] = index;
-    } else if (normalized.includes("motivo") || normalized === "categoria") {
-      mapping["categoria"] = index;
-    } else if (normalized.includes("solucao")) {
-      mapping["solucao"] = index;
-    } else if (normalized.includes("solicitante")) {
-      mapping["solicitante"] = index;
-    } else if (normalized.includes("agente") || normalized.includes("responsavel") || normalized === "tecnico") {
-      mapping["tecnico"] = index;
-    } else if (normalized.includes("departamento")) {
-      mapping["departamento"] = index;
-    } else if (normalized.includes("tma") && normalized.includes("minutos")) {
-      mapping["tempo_resolucao"] = index;
-    } else if (normalized.includes("frt") && normalized.includes("minutos")) {
-      mapping["frt_minutos"] = index;
-    } else if (normalized.includes("satisfacao")) {
-      mapping["satisfacao"] = index;
-    }
+    if (!positions.has(normalized)) positions.set(normalized, index);
   });
-  
+
+  const mapping: Record<string, number> = {};
+  for (const [standard, variations] of Object.entries(COLUMN_ALIASES)) {
+    for (const variation of variations) {
+      const index = positions.get(variation);
+      if (index !== undefined) {
+        mapping[standard] = index;
+        break;
+      }
+    }
+  }
+
+  columnPlanCache.set(cacheKey, mapping);
   return mapping;
 }
 
@@ -124,8 +143,50 @@ function parseDate(value: string | null): string | null {
   }
 }
 
+// Normaliza cada valor distinto uma única vez (colunas de chamados repetem poucos valores)
+function memoize<T>(fn: (value: any) => T): (value: any) => T {
+  const cache = new Map<any, T>();
+  return (value: any) => {
+    if (cache.has(value)) return cache.get(value)!;
+    const result = fn(value);
+    cache.set(value, result);
+    return result;
+  };
+}
+
+// Mediana da coluna acima de 100 indica TMA em minutos (mesma regra de normalize_duracao no Python)
+function detectMinutes(rows: any[][], index: number | undefined): boolean {
+  if (index === undefined) return false;
+  const values = rows
+    .map((row) => parseFloat(row[index]))
+    .filter((value) => !isNaN(value))
+    .sort((a, b) => a - b);
+  if (values.length === 0) return false;
+  const middle = Math.floor(values.length / 2);
+  const median = values.length % 2 ? values[middle] : (values[middle - 1] + values[middle]) / 2;
+  return median > 100;
+}
+
+interface RowNormalizers {
+  satisfacao: (value: any) => number | null;
+  date: (value: any) => string | null;
+  tempoEmMinutos: boolean;
+}
+
+function createNormalizers(rows: any[][], columnMap: Record<string, number>): RowNormalizers {
+  return {
+    satisfacao: memoize(convertSatisfacao),
+    date: memoize(parseDate),
+    tempoEmMinutos: detectMinutes(rows, columnMap["tempo_resolucao"]),
+  };
+}
+
 // Processar linha de dados
-function processRow(row: any[], columnMap: Record<string, number>): ChamadoRow | null {
+function processRow(
+  row: any[],
+  columnMap: Record<string, number>,
+  normalizers: RowNormalizers,
+): ChamadoRow | null {
   const idChamado = row[columnMap["id_chamado"]]?.toString().trim();
   
   if (!idChamado) return null; // Ignora linhas sem ID
@@ -135,16 +196,17 @@ function processRow(row: any[], columnMap: Record<string, number>): ChamadoRow |
   if (columnMap["tempo_resolucao"] !== undefined) {
     const tmaValue = parseFloat(row[columnMap["tempo_resolucao"]]);
     if (!isNaN(tmaValue)) {
-      // Se o valor médio é maior que 100, assume que está em minutos
-      tempoResolucao = tmaValue > 100 ? tmaValue / 60 : tmaValue;
+      // Coluna em minutos (mediana > 100) é convertida para horas
+      tempoResolucao = normalizers.tempoEmMinutos ? tmaValue / 60 : tmaValue;
     }
   }
   
   return {
+    fonte: SOURCE_NAME,
     id_chamado: idChamado,
-    data_abertura: parseDate(row[columnMap["data_abertura"]]),
-    data_fechamento: parseDate(row[columnMap["data_fechamento"]]),
-    status: row[columnMap["status"]]?.toString().trim() || null,
+    data_abertura: normalizers.date(row[columnMap["data_abertura"]]),
+    data_fechamento: normalizers.date(row[columnMap["data_fechamento"]]),
+    status: row[columnMap["status"]]?.toString().trim() || null,  // canonicalizado só nos KPIs (api/status_map.py)
     prioridade: row[columnMap["prioridade"]]?.toString().trim() || null,
     categoria: row[columnMap["categoria"]]?.toString().trim() || null,
     solucao: row[columnMap["solucao"]]?.toString().trim() || null,
@@ -156,7 +218,7 @@ function processRow(row: any[], columnMap: Record<string, number>): ChamadoRow |
       ? parseFloat(row[columnMap["frt_minutos"]]) || null 
       : null,
     satisfacao: columnMap["satisfacao"] !== undefined 
-      ? convertSatisfacao(row[columnMap["satisfacao"]]) 
+      ? normalizers.satisfacao(row[columnMap["satisfacao"]]) 
       : null,
   };
 }
@@ -229,10 +291,11 @@ serve(async (req) => {
     console.log(`📋 Headers mapeados: ${JSON.stringify(columnMap)}`);
 
     // Processar linhas de dados (pula header)
+    const normalizers = createNormalizers(rows.slice(1), columnMap);
     const chamados: ChamadoRow[] = [];
     for (let i = 1; i < rows.length; i++) {
       const row = rows[i];
-      const chamado = processRow(row, columnMap);
+      const chamado = processRow(row, columnMap, normalizers);
       if (chamado) {
         chamados.push(chamado);
       }
@@ -245,7 +308,7 @@ serve(async (req) => {
       const { data: upsertData, error: upsertError } = await supabase
         .from("chamados")
         .upsert(chamados, {
-          onConflict: "id_chamado",
+          onConflict: "fonte,id_chamado",
           ignoreDuplicates: false // Atualiza se já existe
         });
 
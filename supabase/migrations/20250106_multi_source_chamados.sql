@@ -0,0 +1,35 @@
+-- Migration: Chamados de várias planilhas (uma por unidade) na mesma tabela
+-- Executar este SQL no SQL Editor do Supabase Dashboard
+--
+-- Cada registro passa a guardar a fonte (nome configurado no sync multi-fonte)
+-- e a chave primária vira (fonte, id_chamado): ids repetidos entre unidades
+-- não se sobrescrevem no upsert. Registros existentes ficam na fonte 'principal'
+-- (mesmo padrão de SYNC_SOURCE_NAME no sync de planilha única).
+
+-- 1. Coluna de origem do registro
+ALTER TABLE public.chamados
+    ADD COLUMN IF NOT EXISTS fonte TEXT NOT NULL DEFAULT 'principal';
+
+-- 2. Chave primária composta (o upsert usa on_conflict=fonte,id_chamado)
+ALTER TABLE public.chamados DROP CONSTRAINT IF EXISTS chamados_pkey;
+ALTER TABLE public.chamados ADD CONSTRAINT chamados_pkey PRIMARY KEY (fonte, id_chamado);
+
+-- 3. Buscas só por id_chamado continuam indexadas
+CREATE INDEX IF NOT EXISTS idx_chamados_id_chamado ON public.chamados(id_chamado);
+
+-- 4. Verificar a nova chave
+SELECT
+    tc.constraint_name,
+    kcu.column_name,
+    kcu.ordinal_position
+FROM information_schema.table_constraints tc
+JOIN information_schema.key_column_usage kcu
+    ON tc.constraint_name = kcu.constraint_name
+WHERE tc.table_name = 'chamados' AND tc.constraint_type = 'PRIMARY KEY'
+ORDER BY kcu.ordinal_position;
+
+-- 5. Registros por fonte
+SELECT fonte, COUNT(*) AS registros
+FROM public.chamados
+GROUP BY fonte
+ORDER BY fonte;
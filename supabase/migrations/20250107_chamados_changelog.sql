@@ -0,0 +1,89 @@
+-- Migration: Change log da tabela chamados (gravado pelo banco, lido pela API ASGI)
+-- Executar este SQL no SQL Editor do Supabase Dashboard
+--
+-- Triggers AFTER INSERT/UPDATE/DELETE na tabela chamados gravam, por comando, uma
+-- entrada por fonte e operação com os id_chamado novos (insert), com conteúdo
+-- alterado (update) ou removidos (delete). Todo escritor entra no log: sync Python,
+-- Edge Function do pg_cron e edições manuais. Upsert de linha idêntica não gera
+-- entrada. A API ASGI lê as entradas com seq maior que o último aplicado, busca só
+-- essas linhas e ajusta os dados em memória, sem recarregar a tabela inteira.
+
+-- 1. Tabela do log (seq: ordem das entradas e cursor da API)
+CREATE TABLE IF NOT EXISTS public.chamados_changelog (
+    seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    execucao TEXT NOT NULL,
+    fonte TEXT NOT NULL DEFAULT 'principal',
+    operacao TEXT NOT NULL CHECK (operacao IN ('insert', 'update', 'delete')),
+    ids TEXT[] NOT NULL,
+    registros INTEGER NOT NULL,
+    criado_em TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_chamados_changelog_criado_em ON public.chamados_changelog(criado_em);
+
+-- 2. Leitura pública, como a tabela chamados; sem policy de escrita: só os
+--    triggers abaixo (SECURITY DEFINER) gravam no log
+ALTER TABLE public.chamados_changelog ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Permitir leitura pública do changelog"
+    ON public.chamados_changelog
+    FOR SELECT
+    USING (true);
+
+-- 3. Captura no banco: triggers por comando com tabelas de transição
+--    (execucao = transação; upsert dispara o trigger de INSERT e o de UPDATE)
+CREATE OR REPLACE FUNCTION log_chamados_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO public.chamados_changelog (execucao, fonte, operacao, ids, registros)
+        SELECT txid_current()::TEXT, n.fonte, 'insert', array_agg(n.id_chamado), COUNT(*)
+        FROM novas n
+        GROUP BY n.fonte;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Só linhas com conteúdo diferente (updated_at é carimbado pelo outro trigger)
+        INSERT INTO public.chamados_changelog (execucao, fonte, operacao, ids, registros)
+        SELECT txid_current()::TEXT, n.fonte, 'update', array_agg(n.id_chamado), COUNT(*)
+        FROM novas n
+        JOIN antigas o ON o.fonte = n.fonte AND o.id_chamado = n.id_chamado
+        WHERE to_jsonb(n) - 'updated_at' IS DISTINCT FROM to_jsonb(o) - 'updated_at'
+        GROUP BY n.fonte;
+    ELSE
+        INSERT INTO public.chamados_changelog (execucao, fonte, operacao, ids, registros)
+        SELECT txid_current()::TEXT, o.fonte, 'delete', array_agg(o.id_chamado), COUNT(*)
+        FROM antigas o
+        GROUP BY o.fonte;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS log_chamados_insert ON public.chamados;
+CREATE TRIGGER log_chamados_insert
+    AFTER INSERT ON public.chamados
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION log_chamados_changes();
+
+DROP TRIGGER IF EXISTS log_chamados_update ON public.chamados;
+CREATE TRIGGER log_chamados_update
+    AFTER UPDATE ON public.chamados
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION log_chamados_changes();
+
+DROP TRIGGER IF EXISTS log_chamados_delete ON public.chamados;
+CREATE TRIGGER log_chamados_delete
+    AFTER DELETE ON public.chamados
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION log_chamados_changes();
+
+-- 4. Limpeza: a API só precisa das entradas recentes (executar periodicamente ou via pg_cron)
+-- DELETE FROM public.chamados_changelog WHERE criado_em < NOW() - INTERVAL '30 days';
+
+-- 5. Últimas entradas
+SELECT seq, execucao, fonte, operacao, registros, criado_em
+FROM public.chamados_changelog
+ORDER BY seq DESC
+LIMIT 20;
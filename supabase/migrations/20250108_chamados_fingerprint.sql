@@ -0,0 +1,32 @@
+-- Migration: Impressão do dataset chamados (total + max(updated_at))
+-- Executar este SQL no SQL Editor do Supabase Dashboard
+--
+-- A API confere a versão dos dados com uma consulta de uma linha
+-- (select=updated_at&order=updated_at.desc.nullslast&limit=1, Prefer: count=exact);
+-- com o cache vencido e a impressão igual, nada é recarregado nem recalculado.
+-- O sync faz upsert de todas as linhas a cada execução: o trigger passa a
+-- carimbar updated_at só quando o conteúdo da linha muda, senão a impressão
+-- mudaria a cada sync mesmo sem alterações.
+
+-- 1. Índice para max(updated_at) sem varrer a tabela
+CREATE INDEX IF NOT EXISTS idx_chamados_updated_at ON public.chamados(updated_at DESC NULLS LAST);
+
+-- 2. Trigger: updated_at só muda quando a linha muda (função própria da tabela chamados)
+CREATE OR REPLACE FUNCTION update_chamados_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW IS DISTINCT FROM OLD THEN
+        NEW.updated_at = NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_chamados_updated_at ON public.chamados;
+CREATE TRIGGER update_chamados_updated_at
+    BEFORE UPDATE ON public.chamados
+    FOR EACH ROW
+    EXECUTE FUNCTION update_chamados_updated_at_column();
+
+-- 3. Linhas antigas sem updated_at (a impressão fica desativada enquanto houver)
+UPDATE public.chamados SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL;
@@ -2,26 +2,51 @@
 Utilitários para processamento de dados do TechHelp Dashboard
 Funções auxiliares para limpeza, transformação e análise de dados
 """
+import importlib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
 
+def _api_module(name: str):
+    """
+    Kernel vetorizado de api/ (normalization, status_map, quality, ranking)
+
+    Importado sob demanda, só se api/ já estiver no path (sync, benchmarks,
+    servidor); fora dele os métodos usam o código pandas deste módulo.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 class DataProcessor:
     """Classe para processamento e análise de dados de chamados"""
     
     @staticmethod
-    def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    def clean_dataframe(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Limpa e padroniza um DataFrame
         
+        Remove espaços extras em textos, troca marcadores de vazio por nulo e
+        remove linhas completamente vazias. Com api/normalization.py disponível,
+        só valores de texto são tocados e as contagens ficam em df.attrs['cleaning'].
+        
         Args:
             df: DataFrame original
+            inplace: Se True, altera o próprio DataFrame (só com o kernel de api/)
             
         Returns:
             DataFrame limpo e padronizado
         """
+        normalization = _api_module('normalization')
+        if normalization is not None:
+            df, stats = normalization.clean_text_columns(df, inplace=inplace)
+            df.attrs['cleaning'] = stats
+            return df
+        
         # Remove espaços extras em strings
         string_columns = df.select_dtypes(include=['object']).columns
         for col in string_columns:
@@ -44,8 +69,12 @@ class DataProcessor:
             status: Status original
             
         Returns:
-            Status padronizado
+            Status padronizado (desconhecidos em Title Case)
         """
+        status_map = _api_module('status_map')
+        if status_map is not None:
+            return status_map.status_label(status)
+        
         if not status or pd.isna(status):
             return 'Indefinido'
         
@@ -151,6 +180,12 @@ class DataProcessor:
         if 'tecnico' not in df.columns:
             return metrics
         
+        ranking = _api_module('ranking')
+        if ranking is not None:
+            # Estatísticas por técnico calculadas uma vez (ranking_volume,
+            # ranking_satisfacao, ranking_eficiencia); sem tempo medido, eficiência = None
+            return ranking.RankingEngine(df).performance_metrics()
+        
         # Performance por técnico
         technician_stats = df.groupby('tecnico').agg({
             'id_chamado': 'count',
@@ -230,16 +265,23 @@ class DataProcessor:
         return trends
     
     @staticmethod
-    def validate_data_quality(df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_data_quality(df: pd.DataFrame, sample_size: Optional[int] = None) -> Dict[str, Any]:
         """
         Valida qualidade dos dados
         
         Args:
             df: DataFrame para validar
+            sample_size: Perfila uma amostra deste tamanho em DataFrames maiores
+                (as porcentagens trazem margem de erro; só com o kernel de api/)
             
         Returns:
             Relatório de qualidade dos dados
         """
+        quality = _api_module('quality')
+        if quality is not None:
+            # Nulos/vazios, tipos, cardinalidade, duplicatas e datas inválidas em uma passada
+            return quality.profile_quality(df, sample_size=sample_size)
+        
         quality_report = {
             'total_rows': len(df),
             'columns': list(df.columns),